@@ -2,6 +2,7 @@
 Start the FastAPI server
 """
 import os
+import sys
 import uvicorn
 from dotenv import load_dotenv
 
@@ -11,6 +12,7 @@ load_dotenv()
 if __name__ == "__main__":
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", "8000"))
+    reload = os.getenv("API_RELOAD", "false").lower() == "true"
     
     print(f"Starting Executive Analytics API on {host}:{port}")
     print(f"API Docs: http://{host if host != '0.0.0.0' else 'localhost'}:{port}/docs")
@@ -20,6 +22,12 @@ if __name__ == "__main__":
         "src.api.main:app",
         host=host,
         port=port,
-        reload=True,
+        # C-accelerated event loop and HTTP parser (uvloop is unavailable on Windows)
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        reload=reload,
+        # Opt in to more processes with API_WORKERS; each has its own DB pool
+        # and in-memory state. The autoreloader only supports a single worker
+        workers=1 if reload else int(os.getenv("API_WORKERS", "1")),
         log_level="info"
     )
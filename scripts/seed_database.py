@@ -6,15 +6,26 @@ import sys
 from pathlib import Path
 import pandas as pd
 from datetime import datetime
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, Integer, Numeric, Date, DateTime
 from tqdm import tqdm
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.database.models import Base
+from src.database.models import Base, Loan
 from dotenv import load_dotenv
 
+# ADBC PostgreSQL driver for COPY BINARY (graceful fallback if not installed)
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+try:
+    import adbc_driver_postgresql.dbapi as adbc_pg
+    ADBC_AVAILABLE = pa is not None
+except ImportError:
+    ADBC_AVAILABLE = False
+
 load_dotenv()
 
 
@@ -50,18 +61,99 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     if 'int_rate' in df.columns and df['int_rate'].dtype == 'object':
         df['int_rate'] = df['int_rate'].str.rstrip('%').astype('float')
     
-    # Fill NaN values
-    df = df.fillna({
+    # Fill NaN values (only the target columns are touched)
+    fill_values = {
         'emp_length': 'Unknown',
         'emp_title': 'Not Provided',
         'dti': 0.0,
         'annual_inc': 0.0
-    })
+    }
+    fill_columns = [col for col in fill_values if col in df.columns]
+    df[fill_columns] = df[fill_columns].fillna(
+        {col: fill_values[col] for col in fill_columns}
+    )
     
     print(f"OK Data cleaned: {len(df)} rows")
     return df
 
 
+def _arrow_type(column) -> "pa.DataType":
+    """Map a loans column to the Arrow type whose binary COPY format it accepts"""
+    if isinstance(column.type, Integer):
+        return pa.int32()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision, column.type.scale)
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def to_loans_arrow(df: pd.DataFrame) -> "pa.Table":
+    """
+    Convert the mapped DataFrame to an Arrow table typed like the loans table.
+
+    Binary COPY has no server-side text parsing, so every column must match
+    the exact wire format of its target type (e.g. NUMERIC, INTEGER, DATE).
+    Casts are checked: a value that overflows its NUMERIC precision or a
+    fractional value in an INTEGER column fails the load instead of being
+    stored wrong.
+
+    Raises:
+        ValueError: If a column has values its target type cannot hold
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    loan_columns = Loan.__table__.columns
+
+    arrays = []
+    for name in table.column_names:
+        try:
+            arrays.append(table[name].cast(_arrow_type(loan_columns[name]), safe=True))
+        except pa.ArrowInvalid as e:
+            raise ValueError(f"Column '{name}' does not fit the loans table: {e}") from e
+    return pa.Table.from_arrays(arrays, names=table.column_names)
+
+
+def insert_with_copy_binary(df_db: pd.DataFrame, database_url: str, batch_size: int) -> int:
+    """
+    Bulk load rows with COPY ... FROM STDIN (FORMAT BINARY) through ADBC.
+
+    Returns:
+        Number of rows inserted
+    """
+    table = to_loans_arrow(df_db)
+    total_inserted = 0
+
+    with adbc_pg.connect(database_url) as conn:
+        with conn.cursor() as cur, tqdm(total=table.num_rows, desc="Inserting (COPY)") as pbar:
+            for batch in table.to_batches(max_chunksize=batch_size):
+                cur.adbc_ingest('loans', batch, mode='append')
+                total_inserted += batch.num_rows
+                pbar.update(batch.num_rows)
+        conn.commit()
+
+    return total_inserted
+
+
+def insert_with_to_sql(df_db: pd.DataFrame, engine, batch_size: int) -> int:
+    """
+    Insert rows with batched INSERT statements (fallback without ADBC).
+
+    Returns:
+        Number of rows inserted
+    """
+    total_inserted = 0
+    with tqdm(total=len(df_db), desc="Inserting") as pbar:
+        for i in range(0, len(df_db), batch_size):
+            batch = df_db.iloc[i:i + batch_size]
+            batch.to_sql('loans', engine, if_exists='append', index=False)
+            total_inserted += len(batch)
+            pbar.update(len(batch))
+
+    return total_inserted
+
+
 def load_data_to_db(csv_path: Path, batch_size: int = 10000):
     """
     Load CSV data into PostgreSQL database
@@ -154,13 +246,11 @@ def load_data_to_db(csv_path: Path, batch_size: int = 10000):
     # Insert data in batches
     print(f"\nInserting {len(df_db):,} rows in batches of {batch_size}...")
     
-    total_inserted = 0
-    with tqdm(total=len(df_db), desc="Inserting") as pbar:
-        for i in range(0, len(df_db), batch_size):
-            batch = df_db.iloc[i:i + batch_size]
-            batch.to_sql('loans', engine, if_exists='append', index=False)
-            total_inserted += len(batch)
-            pbar.update(len(batch))
+    if ADBC_AVAILABLE:
+        total_inserted = insert_with_copy_binary(df_db, database_url, batch_size)
+    else:
+        print("adbc-driver-postgresql not installed, falling back to INSERT batches")
+        total_inserted = insert_with_to_sql(df_db, engine, batch_size)
     
     print(f"\nOK Successfully inserted {total_inserted:,} rows")
     
@@ -2,8 +2,10 @@
 Viewer for Local JSON Traces
 """
 import json
+import os
 from pathlib import Path
 from datetime import datetime
+from typing import List, Tuple
 import sys
 
 
@@ -93,6 +95,24 @@ def format_trace(trace_file: Path) -> str:
     return "\n".join(output)
 
 
+def scan_trace_files(traces_dir: Path) -> List[Tuple[Path, os.stat_result]]:
+    """
+    List trace files with their stat info, newest first
+
+    Uses os.scandir so each file is stat'ed once and the result reused
+    for sorting and display.
+    """
+    with os.scandir(traces_dir) as it:
+        entries = [
+            (Path(entry.path), entry.stat())
+            for entry in it
+            if entry.name.startswith("trace_") and entry.name.endswith(".json")
+        ]
+
+    entries.sort(key=lambda item: item[1].st_mtime, reverse=True)
+    return entries
+
+
 def view_latest_traces(n: int = 5):
     """View the latest n traces"""
     traces_dir = Path("traces")
@@ -101,7 +121,7 @@ def view_latest_traces(n: int = 5):
         print("No traces directory found. Run some queries first!")
         return
     
-    trace_files = sorted(traces_dir.glob("trace_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+    trace_files = scan_trace_files(traces_dir)
     
     if not trace_files:
         print("No trace files found. Run some queries first!")
@@ -111,7 +131,7 @@ def view_latest_traces(n: int = 5):
     print(f"SHOWING LATEST {min(n, len(trace_files))} TRACES (out of {len(trace_files)} total)")
     print(f"{'='*80}\n")
     
-    for trace_file in trace_files[:n]:
+    for trace_file, _ in trace_files[:n]:
         print(format_trace(trace_file))
 
 
@@ -123,7 +143,7 @@ def view_all_traces():
         print("No traces directory found. Run some queries first!")
         return
     
-    trace_files = sorted(traces_dir.glob("trace_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+    trace_files = scan_trace_files(traces_dir)
     
     if not trace_files:
         print("No trace files found. Run some queries first!")
@@ -133,7 +153,7 @@ def view_all_traces():
     print(f"SHOWING ALL {len(trace_files)} TRACES")
     print(f"{'='*80}\n")
     
-    for trace_file in trace_files:
+    for trace_file, _ in trace_files:
         print(format_trace(trace_file))
 
 
@@ -145,7 +165,7 @@ def list_traces():
         print("No traces directory found. Run some queries first!")
         return
     
-    trace_files = sorted(traces_dir.glob("trace_*.json"), key=lambda x: x.stat().st_mtime, reverse=True)
+    trace_files = scan_trace_files(traces_dir)
     
     if not trace_files:
         print("No trace files found. Run some queries first!")
@@ -153,9 +173,9 @@ def list_traces():
     
     print(f"\nFound {len(trace_files)} trace files:\n")
     
-    for i, trace_file in enumerate(trace_files, 1):
-        mtime = datetime.fromtimestamp(trace_file.stat().st_mtime)
-        size = trace_file.stat().st_size / 1024  # KB
+    for i, (trace_file, stat) in enumerate(trace_files, 1):
+        mtime = datetime.fromtimestamp(stat.st_mtime)
+        size = stat.st_size / 1024  # KB
         print(f"{i:3d}. {trace_file.name:50s} | {mtime.strftime('%Y-%m-%d %H:%M:%S')} | {size:6.1f} KB")
 
 
@@ -1,10 +1,12 @@
 """
 Analyst Agent - Executes queries and analyzes results
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import asyncio
 from datetime import datetime
 
+import pandas as pd
+
 from .base_agent import BaseAgent
 from ..tools.sql_executor import get_sql_executor
 from ..tools.metric_calculator import MetricCalculator
@@ -43,11 +45,10 @@ class AnalystAgent(BaseAgent):
             # Execute query (async)
             results, metadata = await self.sql_executor.execute_query(sql_query)
             
-            # Validate results
-            quality_issues = self._validate_data_quality(results)
-            
-            # Calculate derived metrics
-            derived_metrics = self._calculate_derived_metrics(results, state)
+            # Validate results and calculate derived metrics off the event loop
+            quality_issues, derived_metrics = await asyncio.to_thread(
+                self._analyze_results, results, state
+            )
             
             # Prepare response
             return {
@@ -66,46 +67,51 @@ class AnalystAgent(BaseAgent):
                 "current_step": "analyst_error"
             }
     
-    def _validate_data_quality(self, results: List[Dict[str, Any]]) -> List[str]:
+    def _analyze_results(
+        self,
+        results: pd.DataFrame,
+        state: Dict[str, Any]
+    ) -> Tuple[List[str], Dict[str, Any]]:
+        """Run the pandas-heavy quality checks and metric calculations"""
+        return (
+            self._validate_data_quality(results),
+            self._calculate_derived_metrics(results, state)
+        )
+    
+    def _validate_data_quality(self, results: pd.DataFrame) -> List[str]:
         """Check for data quality issues"""
         issues = []
         
-        if not results:
+        if results.empty:
             issues.append("Query returned no results")
             return issues
         
         # Check for null values in each column
-        first_row = results[0]
-        for column in first_row.keys():
-            null_count = sum(1 for row in results if row.get(column) is None)
-            if null_count > 0:
-                pct = (null_count / len(results)) * 100
-                issues.append(f"{column}: {null_count} null values ({pct:.1f}%)")
+        null_counts = results.isna().sum()
+        for column, null_count in null_counts[null_counts > 0].items():
+            pct = (null_count / len(results)) * 100
+            issues.append(f"{column}: {null_count} null values ({pct:.1f}%)")
         
         # Check for duplicate rows
-        unique_rows = len(set(tuple(row.items()) for row in results))
-        if unique_rows < len(results):
-            issues.append(f"{len(results) - unique_rows} duplicate rows detected")
+        duplicate_count = int(results.duplicated().sum())
+        if duplicate_count:
+            issues.append(f"{duplicate_count} duplicate rows detected")
         
         return issues
     
     def _calculate_derived_metrics(
         self, 
-        results: List[Dict[str, Any]],
+        results: pd.DataFrame,
         state: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Calculate relevant metrics based on query results"""
-        if not results:
+        if results.empty:
             return {}
         
         metrics = {}
-        first_row = results[0]
         
         # Identify numeric columns
-        numeric_columns = [
-            col for col in first_row.keys()
-            if isinstance(first_row[col], (int, float))
-        ]
+        numeric_columns = results.select_dtypes(include='number').columns
         
         # Calculate financial metrics for amount-like columns
         amount_columns = [
@@ -113,13 +119,14 @@ class AnalystAgent(BaseAgent):
             if any(keyword in col.lower() for keyword in ['amount', 'amnt', 'balance', 'income', 'rate'])
         ]
         
-        for col in amount_columns:
-            col_metrics = self.metric_calculator.calculate_financial_metrics(results, col)
-            if col_metrics:
-                metrics[f"{col}_metrics"] = col_metrics
+        batch_metrics = self.metric_calculator.calculate_financial_metrics_batch(
+            results, amount_columns
+        )
+        for col, col_metrics in batch_metrics.items():
+            metrics[f"{col}_metrics"] = col_metrics
         
         # Calculate default rate if loan_status column exists
-        if 'loan_status' in first_row:
+        if 'loan_status' in results.columns:
             default_rate = self.metric_calculator.calculate_rate(
                 results,
                 'loan_status',
@@ -132,7 +139,7 @@ class AnalystAgent(BaseAgent):
     def _generate_warnings(
         self,
         metadata: Dict[str, Any],
-        results: List[Dict[str, Any]]
+        results: pd.DataFrame
     ) -> List[str]:
         """Generate warnings based on query execution"""
         warnings = []
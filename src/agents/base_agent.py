@@ -2,14 +2,17 @@
 Base agent class with common functionality
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+import asyncio
 import os
 import yaml
 from pathlib import Path
 
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
+
+from .llm_batcher import get_prefix_batcher
 
 # Configure LangSmith tracing
 os.environ.setdefault("LANGSMITH_TRACING", "true")
@@ -33,6 +36,13 @@ class BaseAgent(ABC):
         self.config = self._load_config(config_path)
         self.llm = self._initialize_llm()
         
+        # Shared batcher for prefixed prompts (opt-in per agent via config)
+        self.batcher = None
+        if self.config.get('batch_requests', False):
+            self.batcher = get_prefix_batcher(
+                agent_name, self.config.get('model', 'gpt-4o-mini'), self.llm
+            )
+        
     def _load_config(self, config_path: Optional[str] = None) -> Dict[str, Any]:
         """Load agent configuration from YAML"""
         if config_path is None:
@@ -86,7 +96,8 @@ class BaseAgent(ABC):
     def invoke_llm(
         self,
         user_message: str,
-        system_message: Optional[str] = None
+        system_message: Optional[str] = None,
+        prefix: Optional[str] = None
     ) -> str:
         """
         Invoke the LLM with a user message and optional system message
@@ -94,10 +105,53 @@ class BaseAgent(ABC):
         Args:
             user_message: The user's prompt
             system_message: Optional system prompt (uses config default if not provided)
+            prefix: Optional static context sent ahead of the user message as its
+                own content block, so identical prefixes hit the provider's prompt cache
             
         Returns:
             The LLM's response as a string
         """
+        messages = self._build_messages(user_message, system_message, prefix)
+        
+        # Invoke LLM (batched with concurrent calls sharing the prefix, if enabled)
+        if prefix and self.batcher is not None:
+            response = self.batcher.submit(prefix, messages).result()
+        else:
+            response = self.llm.invoke(messages)
+        return response.content
+    
+    async def ainvoke_llm(
+        self,
+        user_message: str,
+        system_message: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> str:
+        """
+        Async variant of invoke_llm that does not block the event loop
+        
+        Args:
+            user_message: The user's prompt
+            system_message: Optional system prompt (uses config default if not provided)
+            prefix: Optional static context sent ahead of the user message
+            
+        Returns:
+            The LLM's response as a string
+        """
+        messages = self._build_messages(user_message, system_message, prefix)
+        
+        if prefix and self.batcher is not None:
+            response = await asyncio.wrap_future(self.batcher.submit(prefix, messages))
+        else:
+            response = await self.llm.ainvoke(messages)
+        return response.content
+    
+    def _build_messages(
+        self,
+        user_message: str,
+        system_message: Optional[str] = None,
+        prefix: Optional[str] = None
+    ) -> List[BaseMessage]:
+        """Build the chat messages for an LLM call"""
         messages = []
         
         # Add system message
@@ -105,12 +159,20 @@ class BaseAgent(ABC):
         if sys_msg:
             messages.append(SystemMessage(content=sys_msg))
         
-        # Add user message
-        messages.append(HumanMessage(content=user_message))
+        # Add user message (static prefix first, dynamic part last)
+        if prefix:
+            prefix_block = {"type": "text", "text": prefix}
+            if isinstance(self.llm, ChatAnthropic):
+                # Explicit cache breakpoint; OpenAI caches identical prefixes automatically
+                prefix_block["cache_control"] = {"type": "ephemeral"}
+            messages.append(HumanMessage(content=[
+                prefix_block,
+                {"type": "text", "text": user_message}
+            ]))
+        else:
+            messages.append(HumanMessage(content=user_message))
         
-        # Invoke LLM
-        response = self.llm.invoke(messages)
-        return response.content
+        return messages
     
     @abstractmethod
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -3,6 +3,8 @@ Insight Agent - Generates business insights
 """
 from typing import Dict, Any, List
 
+import pandas as pd
+
 from .base_agent import BaseAgent
 
 
@@ -15,7 +17,7 @@ class InsightAgent(BaseAgent):
     def __init__(self):
         super().__init__(agent_name='insight_agent')
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate business insights from results
         
@@ -25,11 +27,11 @@ class InsightAgent(BaseAgent):
         Returns:
             State updates with insights and recommendations
         """
-        results = state.get('query_results', [])
+        results = state.get('query_results')
         metrics = state.get('derived_metrics', {})
         user_query = state.get('user_query', '')
         
-        if not results:
+        if results is None or results.empty:
             return {
                 "insights": [],
                 "recommendations": [],
@@ -41,7 +43,7 @@ class InsightAgent(BaseAgent):
             context = self._build_insight_context(results, metrics, user_query)
             
             # Get insights from LLM
-            insights_response = self.invoke_llm(context)
+            insights_response = await self.ainvoke_llm(context)
             
             # Parse insights and recommendations
             insights, recommendations = self._parse_insights(insights_response)
@@ -60,7 +62,7 @@ class InsightAgent(BaseAgent):
     
     def _build_insight_context(
         self,
-        results: List[Dict[str, Any]],
+        results: pd.DataFrame,
         metrics: Dict[str, Any],
         query: str
     ) -> str:
@@ -81,9 +83,9 @@ class InsightAgent(BaseAgent):
                 else:
                     metrics_text += f"- {key}: {value}\n"
         
-        # Sample data
+        # Sample data (only these rows are materialized as dicts)
         sample_size = min(5, len(results))
-        sample_data = results[:sample_size]
+        sample_data = results.head(sample_size).to_dict(orient='records')
         
         return f"""
         You are a senior business analyst presenting insights to executives.
@@ -136,11 +138,12 @@ class InsightAgent(BaseAgent):
         
         for line in lines:
             line = line.strip()
+            line_upper = line.upper()
             
-            if 'INSIGHTS:' in line.upper():
+            if 'INSIGHTS:' in line_upper:
                 current_section = 'insights'
                 continue
-            elif 'RECOMMENDATIONS:' in line.upper():
+            elif 'RECOMMENDATIONS:' in line_upper:
                 current_section = 'recommendations'
                 continue
             
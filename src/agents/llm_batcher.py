@@ -0,0 +1,135 @@
+"""
+LLM request batcher - groups concurrent calls that share a prompt prefix
+"""
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+import queue
+import threading
+import time
+
+from langchain_core.messages import BaseMessage
+
+# Collect up to MAX_BATCH requests, waiting at most MAX_WAIT_SECONDS after the first
+MAX_BATCH = 8
+MAX_WAIT_SECONDS = 0.02
+# How long a prefix is assumed to stay in the provider's prompt cache
+PREFIX_WARM_SECONDS = 300
+MAX_WARM_PREFIXES = 1024
+
+
+class PrefixBatcher:
+    """
+    Coalesces concurrent LLM calls and dispatches them grouped by prefix.
+
+    Requests arriving within MAX_WAIT_SECONDS of each other are collected into
+    one batch. Within a batch, requests with the same prefix (e.g. the schema
+    block of one connection) are sent together. For a prefix not sent in the
+    last PREFIX_WARM_SECONDS, the first request goes alone so the provider
+    caches it and the rest follow concurrently; once warm, the whole group is
+    sent at once.
+    """
+
+    def __init__(self, llm: Any, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT_SECONDS):
+        self.llm = llm
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue[Tuple[str, List[BaseMessage], Future]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_batch, thread_name_prefix="llm-batch")
+        # prefix -> monotonic time it was last sent
+        self._warm: Dict[str, float] = {}
+        self._warm_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="llm-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, prefix: str, messages: List[BaseMessage]) -> Future:
+        """
+        Queue a request for the next batch.
+
+        Args:
+            prefix: Static prompt prefix used to group requests
+            messages: Full message list for the LLM
+
+        Returns:
+            Future resolving to the LLM response message
+        """
+        future: Future = Future()
+        self._queue.put((prefix, messages, future))
+        return future
+
+    def _run(self):
+        """Worker loop: collect a batch, then dispatch one task per prefix group"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            try:
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                pass
+
+            groups: Dict[str, List[Tuple[List[BaseMessage], Future]]] = defaultdict(list)
+            for prefix, messages, future in batch:
+                groups[prefix].append((messages, future))
+
+            for prefix, group in groups.items():
+                self._executor.submit(self._run_group, prefix, group)
+
+    def _is_warm(self, prefix: str) -> bool:
+        """Record that a prefix is being sent; return whether it was sent recently"""
+        now = time.monotonic()
+        with self._warm_lock:
+            sent_at = self._warm.pop(prefix, None)
+            if len(self._warm) >= MAX_WARM_PREFIXES:
+                del self._warm[next(iter(self._warm))]
+            self._warm[prefix] = now
+        return sent_at is not None and now - sent_at < PREFIX_WARM_SECONDS
+
+    def _run_group(self, prefix: str, group: List[Tuple[List[BaseMessage], Future]]):
+        """Send a prefix group, leader first if the prefix is not cached yet"""
+        # Drop requests whose caller cancelled; the rest can no longer be cancelled
+        group = [(messages, future) for messages, future in group if future.set_running_or_notify_cancel()]
+        if not group:
+            return
+
+        if self._is_warm(prefix) or len(group) == 1:
+            self._send(group)
+        else:
+            self._send(group[:1])
+            self._send(group[1:])
+
+    def _send(self, group: List[Tuple[List[BaseMessage], Future]]):
+        """Send requests concurrently and resolve every future"""
+        try:
+            if len(group) == 1:
+                responses = [self.llm.invoke(group[0][0])]
+            else:
+                responses = self.llm.batch(
+                    [messages for messages, _ in group],
+                    return_exceptions=True
+                )
+        except Exception as e:
+            responses = [e] * len(group)
+
+        for (_, future), response in zip(group, responses):
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
+# Global batchers, one per LLM configuration
+_batchers: Dict[Tuple[str, str], PrefixBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_prefix_batcher(agent_name: str, model: str, llm: Any) -> PrefixBatcher:
+    """Get or create the shared batcher for an agent/model pair"""
+    key = (agent_name, model)
+    with _batchers_lock:
+        if key not in _batchers:
+            _batchers[key] = PrefixBatcher(llm)
+        return _batchers[key]
@@ -1,12 +1,106 @@
 """
 SQL Agent - Converts natural language to SQL queries
 """
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from functools import lru_cache
 import re
+import time
 from uuid import UUID
 
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from sqlalchemy import select, and_
+
+from src.database.models import TableConfig
+from src.database.connection import db
 from .base_agent import BaseAgent
 
+# Precompiled patterns (reused across requests)
+_RE_MD_SQL = re.compile(r'```sql\n?')
+_RE_MD_FENCE = re.compile(r'```\n?')
+_RE_SELECT_START = re.compile(r'SELECT\s', re.IGNORECASE)
+# Where a query can start inside prose: a CTE, a SELECT, or a parenthesized SELECT
+_RE_QUERY_START = re.compile(r'\bWITH\s|\bSELECT\s|\(\s*SELECT\s', re.IGNORECASE)
+
+# AST nodes that modify data, schema or session state, by operation name
+_WRITE_NODES = {
+    exp.Insert: 'INSERT',
+    exp.Update: 'UPDATE',
+    exp.Delete: 'DELETE',
+    exp.Merge: 'MERGE',
+    exp.Drop: 'DROP',
+    exp.Alter: 'ALTER',
+    exp.TruncateTable: 'TRUNCATE',
+    exp.Create: 'CREATE',
+    exp.Grant: 'GRANT',
+    exp.Copy: 'COPY',
+    exp.Set: 'SET',
+    exp.Into: 'INTO',  # SELECT ... INTO creates a table
+    exp.Lock: 'LOCK',  # SELECT ... FOR UPDATE / FOR SHARE
+    exp.Command: 'COMMAND',  # Statements sqlglot does not model (VACUUM, ...)
+}
+
+# Customer schema cache (entries are also invalidated when table configs change)
+SCHEMA_CACHE_TTL_SECONDS = 300
+SCHEMA_CACHE_MAX_ENTRIES = 256
+
+# Prompt budget for customer schemas; larger schemas keep the tables most relevant to the question
+MAX_SCHEMA_TOKENS = 2000
+CHARS_PER_TOKEN = 4  # Rough estimate, independent of the configured model's tokenizer
+MAX_COLUMNS_PER_TABLE = 20
+_RE_WORD = re.compile(r'[a-z0-9]+')
+
+# (table name, ((column name, column type), ...))
+TableSchema = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Generated SQL cache for repeated questions, keyed by (connection_id, normalized question)
+QUERY_CACHE_TTL_SECONDS = 3600
+QUERY_CACHE_MAX_ENTRIES = 10000
+
+
+@lru_cache(maxsize=512)
+def _parse_sql(sql: str) -> Tuple[exp.Expression, ...]:
+    """Parse SQL into statement ASTs (cached: identical LLM outputs are parsed once)"""
+    return tuple(
+        statement for statement in sqlglot.parse(sql, read='postgres')
+        if statement is not None
+    )
+
+
+def _is_single_query(sql: str) -> bool:
+    """Whether sql parses as exactly one query (SELECT, CTE or set operation)"""
+    try:
+        statements = _parse_sql(sql)
+    except SqlglotError:
+        return False
+    queries = [s for s in statements if not isinstance(s, exp.Semicolon)]
+    return len(queries) == 1 and isinstance(queries[0], exp.Query)
+
+
+def _render_table(name: str, columns: Tuple[Tuple[str, str], ...]) -> str:
+    """Render one table definition for the prompt"""
+    lines = [f"\n\nTable: {name}", "Columns:"]
+    lines.extend(f"  - {col_name}: {col_type}" for col_name, col_type in columns)
+    return "\n".join(lines)
+
+
+# Invariant part of the SQL prompt, appended to the schema; the user question comes after it
+_PROMPT_REQUIREMENTS = """
+
+        Generate a {db_type} SELECT query that answers the user question below.
+        Requirements:
+        - Use only SELECT statements
+        - Include LIMIT clause (default 1000 for safety)
+        - Use proper column names from schema
+        - Handle NULL values appropriately
+        - Format numbers and dates correctly
+
+        Return ONLY the SQL query, no explanations or markdown.
+        """
+_POSTGRES_REQUIREMENTS = _PROMPT_REQUIREMENTS.format(db_type="PostgreSQL")
+_GENERIC_REQUIREMENTS = _PROMPT_REQUIREMENTS.format(db_type="SQL")  # Customer DBs
+
 
 class SQLAgent(BaseAgent):
     """
@@ -14,12 +108,56 @@ class SQLAgent(BaseAgent):
     Only allows SELECT statements to prevent data modification.
     """
     
+    # Default hardcoded schema for Lending Club demo
+    _DEFAULT_SCHEMA = """
+        Available table: loans
+
+        Key columns:
+        - loan_amnt: Loan amount in dollars (NUMERIC)
+        - int_rate: Interest rate as percentage (NUMERIC)
+        - grade: Loan grade A-G (VARCHAR)
+        - sub_grade: Detailed grade like A1, B2 (VARCHAR)
+        - loan_status: Current, Fully Paid, Charged Off, Default, etc. (VARCHAR)
+        - annual_inc: Borrower's annual income (NUMERIC)
+        - purpose: Loan purpose like debt_consolidation, credit_card (VARCHAR)
+        - addr_state: US state code (VARCHAR)
+        - term: Loan term like '36 months' or '60 months' (VARCHAR)
+        - issue_d: Loan issue date (DATE)
+        - dti: Debt-to-income ratio (NUMERIC)
+        - home_ownership: RENT, OWN, MORTGAGE, etc. (VARCHAR)
+        - emp_length: Employment length (VARCHAR)
+
+        Common loan_status values:
+        - 'Current' - Active and up to date
+        - 'Fully Paid' - Successfully completed
+        - 'Charged Off' - Defaulted
+        - 'Default' - In default
+        - 'Late (31-120 days)' - Delinquent
+
+        Example queries:
+        1. "Top 10 loan amounts" → SELECT loan_amnt, grade FROM loans ORDER BY loan_amnt DESC LIMIT 10
+        2. "Default rate by grade" → SELECT grade, COUNT(*) as total,
+           COUNT(CASE WHEN loan_status IN ('Charged Off', 'Default') THEN 1 END) as defaults
+           FROM loans GROUP BY grade ORDER BY grade
+        """
+    
+    _DEFAULT_PROMPT_PREFIX = _DEFAULT_SCHEMA + _POSTGRES_REQUIREMENTS
+    
+    # connection_id -> (loaded_at, tables), shared by all instances
+    _schema_cache: Dict[str, Tuple[float, List[TableSchema]]] = {}
+    
+    # (connection_id, question) -> (stored_at, sql_query, sql_explanation)
+    _query_cache: Dict[Tuple[str, str], Tuple[float, str, str]] = {}
+    
     def __init__(self):
         super().__init__(agent_name='sql_agent')
         self.allowed_operations = self.config.get('allowed_operations', ['SELECT'])
-        self.forbidden_operations = self.config.get('forbidden_operations', [])
+        # Normalized once; operation names from the AST are uppercase
+        self.forbidden_operations = frozenset(
+            op.upper() for op in self.config.get('forbidden_operations', [])
+        )
     
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generate SQL query from user's natural language question
 
@@ -32,17 +170,33 @@ class SQLAgent(BaseAgent):
         user_query = state['user_query']
         connection_id = state.get('connection_id')  # Optional customer connection
 
+        # Repeated questions reuse the previously validated SQL
+        cache_key = (str(connection_id or ''), ' '.join(user_query.lower().split()))
+        cached = self._query_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < QUERY_CACHE_TTL_SECONDS:
+            return {
+                "sql_query": cached[1],
+                "sql_explanation": cached[2],
+                "current_step": "sql_generated"
+            }
+
         # Build prompt with schema context (dynamic or default)
-        prompt = self._build_prompt(user_query, connection_id=connection_id)
+        prefix, question = await self._build_prompt(user_query, connection_id=connection_id)
 
         try:
             # Get SQL from LLM
-            response = self.invoke_llm(prompt)
+            response = await self.ainvoke_llm(question, prefix=prefix)
 
             # Extract and validate SQL
             sql_query = self._extract_sql(response)
             validated_sql = self._validate_sql(sql_query)
 
+            cache = SQLAgent._query_cache
+            cache.pop(cache_key, None)
+            if len(cache) >= QUERY_CACHE_MAX_ENTRIES:
+                del cache[next(iter(cache))]  # Evict the oldest entry
+            cache[cache_key] = (time.monotonic(), validated_sql, response)
+
             return {
                 "sql_query": validated_sql,
                 "sql_explanation": response,
@@ -56,149 +210,199 @@ class SQLAgent(BaseAgent):
                 "current_step": "sql_error"
             }
     
-    def _build_prompt(self, user_query: str, connection_id: Optional[str] = None) -> str:
+    async def _build_prompt(self, user_query: str, connection_id: Optional[str] = None) -> Tuple[str, str]:
         """
         Build the prompt with schema information.
 
+        The prompt is split into a static prefix (schema + requirements) and
+        a dynamic suffix (the user question). The prefix is byte-identical
+        across requests for the same connection (and, on schemas over the
+        token budget, the same selected tables) so provider-side prompt
+        caching can reuse it.
+
         Args:
             user_query: User's natural language question
             connection_id: Optional customer connection ID for dynamic schema
 
         Returns:
-            Formatted prompt string
+            Tuple of (prompt_prefix, prompt_suffix)
         """
         if connection_id:
-            # Dynamic schema from customer connection
-            schema_info = self._get_dynamic_schema(connection_id)
-            db_type = "SQL"  # Generic for customer DBs
+            # Dynamic schema from customer connection (cached, so stable between calls)
+            schema_info = await self._get_dynamic_schema(connection_id, user_query)
+            prefix = "".join((schema_info, _GENERIC_REQUIREMENTS))
         else:
             # Default hardcoded schema for demo (Lending Club)
-            schema_info = self._get_default_schema()
-            db_type = "PostgreSQL"
+            prefix = self._DEFAULT_PROMPT_PREFIX
 
-        return f"""{schema_info}
+        return prefix, "".join(("User Question: ", user_query))
 
-        User Question: {user_query}
+    async def _get_dynamic_schema(self, connection_id: str, user_query: str = '') -> str:
+        """
+        Get dynamic schema from customer connection's enabled tables.
 
-        Generate a {db_type} SELECT query that answers this question.
-        Requirements:
-        - Use only SELECT statements
-        - Include LIMIT clause (default 1000 for safety)
-        - Use proper column names from schema
-        - Handle NULL values appropriately
-        - Format numbers and dates correctly
+        Table definitions are cached per connection for SCHEMA_CACHE_TTL_SECONDS;
+        load errors are not cached. Schemas over MAX_SCHEMA_TOKENS are cut down
+        to the tables most relevant to the question.
 
-        Return ONLY the SQL query, no explanations or markdown.
+        Args:
+            connection_id: Customer connection UUID
+            user_query: User's question, used to rank tables on large schemas
+
+        Returns:
+            Formatted schema information string
         """
+        connection_id = str(connection_id)
+        cached = self._schema_cache.get(connection_id)
+        if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL_SECONDS:
+            return self._format_schema(cached[1], user_query)
 
-    def _get_default_schema(self) -> str:
-        """Get default hardcoded schema for Lending Club demo."""
-        return """
-        Available table: loans
+        try:
+            tables = await self._load_dynamic_schema(connection_id)
+        except Exception as e:
+            return f"Error loading schema: {str(e)}\nFalling back to demo mode."
 
-        Key columns:
-        - loan_amnt: Loan amount in dollars (NUMERIC)
-        - int_rate: Interest rate as percentage (NUMERIC)
-        - grade: Loan grade A-G (VARCHAR)
-        - sub_grade: Detailed grade like A1, B2 (VARCHAR)
-        - loan_status: Current, Fully Paid, Charged Off, Default, etc. (VARCHAR)
-        - annual_inc: Borrower's annual income (NUMERIC)
-        - purpose: Loan purpose like debt_consolidation, credit_card (VARCHAR)
-        - addr_state: US state code (VARCHAR)
-        - term: Loan term like '36 months' or '60 months' (VARCHAR)
-        - issue_d: Loan issue date (DATE)
-        - dti: Debt-to-income ratio (NUMERIC)
-        - home_ownership: RENT, OWN, MORTGAGE, etc. (VARCHAR)
-        - emp_length: Employment length (VARCHAR)
+        cache = SQLAgent._schema_cache
+        cache.pop(connection_id, None)
+        if len(cache) >= SCHEMA_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]  # Evict the oldest entry
+        cache[connection_id] = (time.monotonic(), tables)
 
-        Common loan_status values:
-        - 'Current' - Active and up to date
-        - 'Fully Paid' - Successfully completed
-        - 'Charged Off' - Defaulted
-        - 'Default' - In default
-        - 'Late (31-120 days)' - Delinquent
+        return self._format_schema(tables, user_query)
 
-        Example queries:
-        1. "Top 10 loan amounts" → SELECT loan_amnt, grade FROM loans ORDER BY loan_amnt DESC LIMIT 10
-        2. "Default rate by grade" → SELECT grade, COUNT(*) as total,
-           COUNT(CASE WHEN loan_status IN ('Charged Off', 'Default') THEN 1 END) as defaults
-           FROM loans GROUP BY grade ORDER BY grade
+    @staticmethod
+    def _format_schema(tables: List[TableSchema], user_query: str = '') -> str:
         """
+        Format table definitions for the prompt within the schema token budget.
 
-    def _get_dynamic_schema(self, connection_id: str) -> str:
-        """
-        Get dynamic schema from customer connection's enabled tables.
+        Small schemas are rendered in full, so the prompt prefix does not depend
+        on the question. Larger ones keep the best-matching tables (by words
+        shared between the question and table/column names) until the budget is
+        used, each with at most MAX_COLUMNS_PER_TABLE columns.
 
         Args:
-            connection_id: Customer connection UUID
+            tables: Cached table definitions
+            user_query: User's natural language question
 
         Returns:
             Formatted schema information string
         """
-        try:
-            # Import here to avoid circular dependency
-            from src.database.models import TableConfig, CustomerConnection
-            from src.database.connection import db
-            from sqlalchemy import select, and_
-            import asyncio
-
-            # Run async query in sync context (for now)
-            # TODO: Make this fully async when agent workflow supports it
-            async def fetch_tables():
-                async with db.session() as session:
-                    # Get enabled tables for this connection
-                    result = await session.execute(
-                        select(TableConfig).where(
-                            and_(
-                                TableConfig.connection_id == UUID(connection_id),
-                                TableConfig.is_enabled == True
-                            )
-                        )
-                    )
-                    return result.scalars().all()
+        if not tables:
+            return "No tables enabled for this connection. Please enable tables first."
 
-            # Execute async function
-            tables = asyncio.run(fetch_tables())
+        budget = MAX_SCHEMA_TOKENS * CHARS_PER_TOKEN
+        blocks = [_render_table(name, columns) for name, columns in tables]
+        if sum(len(block) for block in blocks) <= budget:
+            return f"Available tables ({len(tables)}):" + "".join(blocks)
 
-            if not tables:
-                return "No tables enabled for this connection. Please enable tables first."
+        terms = set(_RE_WORD.findall(user_query.lower()))
 
-            # Build schema info from enabled tables
-            schema_parts = [f"Available tables ({len(tables)}):"]
+        def matches(name: str) -> int:
+            return len(terms.intersection(_RE_WORD.findall(name.lower())))
 
-            for table in tables:
-                full_name = f"{table.schema_name}.{table.table_name}" if table.schema_name != 'public' else table.table_name
-                schema_parts.append(f"\nTable: {full_name}")
-                schema_parts.append("Columns:")
+        scores = [
+            2 * matches(name) + sum(matches(col_name) for col_name, _ in columns)
+            for name, columns in tables
+        ]
+        ranked = sorted(range(len(tables)), key=lambda i: -scores[i])  # Stable for ties
 
-                for col in table.columns:
-                    schema_parts.append(f"  - {col['name']}: {col['type']}")
+        selected = {}
+        used = 0
+        for i in ranked:
+            name, columns = tables[i]
+            if len(columns) > MAX_COLUMNS_PER_TABLE:
+                # Columns named in the question first, then in table order
+                columns = sorted(columns, key=lambda col: -matches(col[0]))[:MAX_COLUMNS_PER_TABLE]
+            block = _render_table(name, columns)
+            if selected and used + len(block) > budget:
+                break
+            selected[i] = block
+            used += len(block)
+
+        # Keep the original table order so identical selections give identical prompts
+        return (
+            f"Available tables ({len(selected)} of {len(tables)}, most relevant to the question):"
+            + "".join(selected[i] for i in sorted(selected))
+        )
+
+    @classmethod
+    def invalidate_schema(cls, connection_id: str) -> None:
+        """
+        Drop the cached schema for a connection (call when its tables change).
+
+        Also drops the connection's cached SQL, which was generated against
+        the old schema.
+
+        Args:
+            connection_id: Customer connection UUID
+        """
+        cls._schema_cache.pop(str(connection_id), None)
+        cls.invalidate_query_cache(connection_id)
+
+    @classmethod
+    def invalidate_query_cache(cls, connection_id: Optional[str] = None) -> None:
+        """
+        Drop cached SQL for one connection, or for the demo schema if None.
+
+        Args:
+            connection_id: Customer connection UUID
+        """
+        connection_id = str(connection_id or '')
+        for key in [key for key in cls._query_cache if key[0] == connection_id]:
+            del cls._query_cache[key]
+
+    async def _load_dynamic_schema(self, connection_id: str) -> List[TableSchema]:
+        """Query enabled tables for a connection as (table name, columns) pairs"""
+        async with db.session() as session:
+            result = await session.execute(
+                select(TableConfig).where(
+                    and_(
+                        TableConfig.connection_id == UUID(connection_id),
+                        TableConfig.is_enabled == True
+                    )
+                )
+            )
+            tables = result.scalars().all()
+
+        return [
+            (
+                f"{table.schema_name}.{table.table_name}" if table.schema_name != 'public' else table.table_name,
+                tuple((col['name'], col['type']) for col in table.columns)
+            )
+            for table in tables
+        ]
 
-            return "\n".join(schema_parts)
 
-        except Exception as e:
-            return f"Error loading schema: {str(e)}\nFalling back to demo mode."
-    
     def _extract_sql(self, response: str) -> str:
         """Extract SQL query from LLM response"""
         # Remove markdown code blocks
-        response = re.sub(r'```sql\n?', '', response)
-        response = re.sub(r'```\n?', '', response)
+        response = _RE_MD_SQL.sub('', response)
+        response = _RE_MD_FENCE.sub('', response)
         
-        # Extract SELECT statement
-        sql_match = re.search(
-            r'(SELECT\s+.*?;?)\s*$',
-            response,
-            re.IGNORECASE | re.DOTALL
-        )
+        # Fast path: the response is just the query (incl. CTEs and
+        # parenthesized set operations)
+        stripped = response.strip().rstrip(';')
+        if _is_single_query(stripped):
+            return stripped
+        
+        # Prose around the query: take the first query start from which the
+        # rest parses as one query (located without a tail-anchored pattern,
+        # so no backtracking)
+        for match in _RE_QUERY_START.finditer(response):
+            sql = response[match.start():].strip().rstrip(';')
+            if _is_single_query(sql):
+                return sql
+        
+        # Otherwise everything from the first SELECT keyword
+        sql_match = _RE_SELECT_START.search(response)
         
         if sql_match:
-            sql = sql_match.group(1).strip()
+            sql = response[sql_match.start():].strip()
             # Remove trailing semicolon if present
             return sql.rstrip(';')
         
         # If no SELECT found, assume entire response is SQL
-        return response.strip().rstrip(';')
+        return stripped
     
     def _validate_sql(self, sql: str) -> str:
         """
@@ -207,29 +411,28 @@ class SQLAgent(BaseAgent):
         Raises:
             ValueError: If SQL contains forbidden operations
         """
-        sql_upper = sql.upper()
-        
-        # Check for forbidden operations
-        for forbidden in self.forbidden_operations:
-            if forbidden in sql_upper:
-                raise ValueError(f"Forbidden operation detected: {forbidden}")
+        try:
+            statements = _parse_sql(sql)
+        except SqlglotError:
+            raise ValueError("Could not parse SQL query")
         
-        # Ensure it starts with SELECT
-        if not sql_upper.strip().startswith('SELECT'):
-            raise ValueError("Only SELECT queries are allowed")
+        # Check for forbidden operations anywhere in the tree (incl. CTEs and chained statements)
+        for statement in statements:
+            for node in statement.walk():
+                operation = _WRITE_NODES.get(type(node))
+                if operation in self.forbidden_operations:
+                    raise ValueError(f"Forbidden operation detected: {operation}")
+                if operation:
+                    raise ValueError("Only SELECT queries are allowed")
         
-        # Basic injection protection checks
-        dangerous_patterns = [
-            r';\s*DROP',
-            r';\s*DELETE',
-            r';\s*UPDATE',
-            r';\s*INSERT',
-            r'--',  # SQL comments
-            r'/\*',  # Multi-line comments
-        ]
+        # Comments are rejected (they could hide the LIMIT appended by the executor)
+        for statement in statements:
+            if any(node.comments for node in statement.walk()):
+                raise ValueError("Potentially unsafe SQL pattern detected")
         
-        for pattern in dangerous_patterns:
-            if re.search(pattern, sql_upper):
-                raise ValueError(f"Potentially unsafe SQL pattern detected")
+        # Ensure it is a single SELECT (or set operation / subquery of SELECTs)
+        queries = [s for s in statements if not isinstance(s, exp.Semicolon)]
+        if len(queries) != 1 or not isinstance(queries[0], exp.Query):
+            raise ValueError("Only SELECT queries are allowed")
         
         return sql
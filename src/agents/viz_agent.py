@@ -2,10 +2,26 @@
 Viz Agent - Selects optimal visualizations
 """
 from typing import Dict, Any, List
+import re
+
+import pandas as pd
 
 from .base_agent import BaseAgent
 from ..tools.chart_generator import ChartGenerator
 
+# Column names that look like a date/time axis
+_DATE_COL_RE = re.compile(r'date|time|month|year', re.IGNORECASE)
+
+
+def _numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Names of numeric columns, classified from dtypes over all rows"""
+    return df.select_dtypes(include='number').columns.tolist()
+
+
+def _categorical_columns(df: pd.DataFrame) -> List[str]:
+    """Names of text/categorical columns, classified from dtypes over all rows"""
+    return df.select_dtypes(include=['object', 'category', 'string']).columns.tolist()
+
 
 class VizAgent(BaseAgent):
     """
@@ -16,6 +32,12 @@ class VizAgent(BaseAgent):
     def __init__(self):
         super().__init__(agent_name='viz_agent')
         self.chart_generator = ChartGenerator()
+        self._chart_generators = {
+            'bar': self._generate_bar_chart,
+            'line': self._generate_line_chart,
+            'pie': self._generate_pie_chart,
+            'scatter': self._generate_scatter_chart
+        }
     
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -27,10 +49,10 @@ class VizAgent(BaseAgent):
         Returns:
             State updates with chart_type and chart_config
         """
-        results = state.get('query_results', [])
+        results = state.get('query_results')
         user_query = state.get('user_query', '')
         
-        if not results:
+        if results is None or results.empty:
             return {
                 "chart_type": None,
                 "chart_config": None,
@@ -59,7 +81,7 @@ class VizAgent(BaseAgent):
     
     def _select_chart_type(
         self,
-        results: List[Dict[str, Any]],
+        results: pd.DataFrame,
         query: str
     ) -> str:
         """Select appropriate chart type"""
@@ -67,52 +89,29 @@ class VizAgent(BaseAgent):
     
     def _generate_chart(
         self,
-        results: List[Dict[str, Any]],
+        results: pd.DataFrame,
         chart_type: str,
         query: str
     ) -> Dict[str, Any]:
         """Generate chart configuration"""
-        if not results:
+        if results.empty:
             return {}
         
-        # Get columns and their types
-        first_row = results[0]
-        columns = list(first_row.keys())
-        
-        # Identify categorical and numeric columns
-        categorical_cols = [
-            col for col in columns
-            if isinstance(first_row[col], (str, type(None)))
-        ]
-        numeric_cols = [
-            col for col in columns
-            if isinstance(first_row[col], (int, float))
-        ]
-        
-        # Generate title from query
-        title = self._generate_title(query, chart_type)
-        
-        # Generate appropriate chart
-        if chart_type == 'bar':
-            return self._generate_bar_chart(results, categorical_cols, numeric_cols, title)
-        elif chart_type == 'line':
-            return self._generate_line_chart(results, columns, numeric_cols, title)
-        elif chart_type == 'pie':
-            return self._generate_pie_chart(results, categorical_cols, numeric_cols, title)
-        elif chart_type == 'scatter':
-            return self._generate_scatter_chart(results, numeric_cols, title)
-        else:
-            return self._generate_bar_chart(results, categorical_cols, numeric_cols, title)
+        # Each generator classifies only the columns it needs; unknown types fall back to bar
+        generate = self._chart_generators.get(chart_type, self._generate_bar_chart)
+        return generate(results, query)
     
     def _generate_bar_chart(
         self,
-        results: List[Dict[str, Any]],
-        categorical_cols: List[str],
-        numeric_cols: List[str],
-        title: str
+        results: pd.DataFrame,
+        query: str
     ) -> Dict[str, Any]:
         """Generate bar chart configuration"""
-        if not categorical_cols or not numeric_cols:
+        numeric_cols = _numeric_columns(results)
+        if not numeric_cols:
+            return {}
+        categorical_cols = _categorical_columns(results)
+        if not categorical_cols:
             return {}
         
         x_col = categorical_cols[0]
@@ -122,58 +121,58 @@ class VizAgent(BaseAgent):
         orientation = 'h' if len(results) > 10 else 'v'
         
         return self.chart_generator.generate_bar_chart(
-            results, x_col, y_col, title, orientation
+            results, x_col, y_col, self._generate_title(query, 'bar'), orientation
         )
     
     def _generate_line_chart(
         self,
-        results: List[Dict[str, Any]],
-        columns: List[str],
-        numeric_cols: List[str],
-        title: str
+        results: pd.DataFrame,
+        query: str
     ) -> Dict[str, Any]:
         """Generate line chart configuration"""
+        numeric_cols = _numeric_columns(results)
         if not numeric_cols:
             return {}
         
         # Look for date/time column
+        columns = results.columns.tolist()
         date_col = next(
-            (col for col in columns if any(
-                kw in col.lower() for kw in ['date', 'time', 'month', 'year']
-            )),
+            (col for col in columns if _DATE_COL_RE.search(col)),
             columns[0]
         )
         y_col = numeric_cols[0]
         
         return self.chart_generator.generate_line_chart(
-            results, date_col, y_col, title
+            results, date_col, y_col, self._generate_title(query, 'line')
         )
     
     def _generate_pie_chart(
         self,
-        results: List[Dict[str, Any]],
-        categorical_cols: List[str],
-        numeric_cols: List[str],
-        title: str
+        results: pd.DataFrame,
+        query: str
     ) -> Dict[str, Any]:
         """Generate pie chart configuration"""
-        if not categorical_cols or not numeric_cols:
+        numeric_cols = _numeric_columns(results)
+        if not numeric_cols:
+            return {}
+        categorical_cols = _categorical_columns(results)
+        if not categorical_cols:
             return {}
         
         labels_col = categorical_cols[0]
         values_col = numeric_cols[0]
         
         return self.chart_generator.generate_pie_chart(
-            results, labels_col, values_col, title
+            results, labels_col, values_col, self._generate_title(query, 'pie')
         )
     
     def _generate_scatter_chart(
         self,
-        results: List[Dict[str, Any]],
-        numeric_cols: List[str],
-        title: str
+        results: pd.DataFrame,
+        query: str
     ) -> Dict[str, Any]:
         """Generate scatter chart configuration"""
+        numeric_cols = _numeric_columns(results)
         if len(numeric_cols) < 2:
             return {}
         
@@ -182,16 +181,17 @@ class VizAgent(BaseAgent):
         color_col = numeric_cols[2] if len(numeric_cols) > 2 else None
         
         return self.chart_generator.generate_scatter_chart(
-            results, x_col, y_col, title, color_col
+            results, x_col, y_col, self._generate_title(query, 'scatter'), color_col
         )
     
     def _generate_title(self, query: str, chart_type: str) -> str:
         """Generate chart title from query"""
-        # Capitalize first letter
-        title = query[0].upper() + query[1:] if query else "Data Analysis"
+        if not query:
+            return "Data Analysis"
         
-        # Trim if too long
-        if len(title) > 60:
-            title = title[:57] + "..."
+        # Trim if too long (slice before capitalizing to avoid copying long queries)
+        if len(query) > 60:
+            return query[0].upper() + query[1:57] + "..."
         
-        return title
+        # Capitalize first letter
+        return query[0].upper() + query[1:]
@@ -1,24 +1,40 @@
 """
 Authentication API endpoints.
 """
+import asyncio
 import os
-from datetime import datetime, timedelta
-from typing import Optional
-
-from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import select
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple, Union
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Row, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.connection import get_db
+from src.database.connection import db as app_db, get_db
 from src.database.models import User, PasswordResetToken
-from src.auth.password import hash_password, verify_password, validate_password_strength
+from src.auth.password import (
+    ahash_password,
+    averify_password,
+    hash_password,
+    validate_password_strength
+)
 from src.auth.jwt import (
     create_access_token,
     create_password_reset_token,
     get_password_reset_expiry,
     is_token_expired
 )
-from src.auth.dependencies import get_current_user, get_user_by_email
+from src.auth.dependencies import (
+    AUTH_COOKIE_NAME,
+    get_current_user,
+    get_user_by_email,
+    get_user_login_row,
+    invalidate_user_cache
+)
+from src.auth.lockout import LockoutTracker
 
 from .auth_schemas import (
     UserRegisterRequest,
@@ -31,58 +47,167 @@ from .auth_schemas import (
     MessageResponse,
 )
 
-router = APIRouter(prefix="/api/auth", tags=["auth"])
+router = APIRouter(prefix="/api/auth", tags=["auth"], default_response_class=ORJSONResponse)
 
 # Rate limiting constants
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_MINUTES = 15
+# How often changed failure counts are written back to the users table
+LOCKOUT_WRITEBACK_SECONDS = 5
+
+# Hash of a random password, verified against when the email is unknown so
+# login takes the same time whether or not the account exists
+_DUMMY_HASH = hash_password(os.urandom(32).hex())
+
+# Failed login attempts per user id, kept in memory instead of the users table
+login_lockouts = LockoutTracker(MAX_LOGIN_ATTEMPTS, LOCKOUT_MINUTES * 60)
+# Serializes writebacks with resets, so a flush never lands after a reset
+_writeback_lock = asyncio.Lock()
 
 # Cookie configuration
 COOKIE_SECURE = os.getenv("COOKIE_SECURE", "true").lower() == "true"
 COOKIE_SAMESITE = os.getenv("COOKIE_SAMESITE", "lax")
 COOKIE_MAX_AGE = 86400  # 24 hours
 
+# Pre-encoded MessageResponse bodies for endpoints with a fixed message
+_LOGGED_OUT = orjson.dumps({"message": "Logged out successfully"})
+_RESET_LINK_SENT = orjson.dumps({"message": "If your email is registered, you will receive a password reset link."})
+_PASSWORD_RESET = orjson.dumps({"message": "Password has been reset successfully"})
+_PASSWORD_CHANGED = orjson.dumps({"message": "Password changed successfully"})
+_ACCOUNT_DELETED = orjson.dumps({"message": "Account deleted successfully"})
+
+
+def message_response(body: bytes) -> Response:
+    """
+    Wrap a pre-encoded message body in a fresh response.
+
+    A new Response is built per request since handlers may set cookies on it.
+
+    Args:
+        body: JSON-encoded MessageResponse
+
+    Returns:
+        JSON response with the given body
+    """
+    return Response(content=body, media_type="application/json")
+
 
-async def check_login_lockout(user: User) -> bool:
+async def check_login_lockout(user: Union[User, Row]) -> Optional[datetime]:
     """
     Check if user is currently locked out due to failed login attempts.
 
+    Raises the in-memory count to the one persisted on the user row (written
+    back by other processes or before a restart), then consults the tracker
+    and the lockout persisted on the row.
+
     Args:
-        user: User object to check
+        user: User object or login row to check
 
     Returns:
-        True if locked out, False otherwise
+        End of the lockout if locked out, None otherwise
     """
+    login_lockouts.seed(str(user.id), user.failed_login_attempts or 0)
+    locked_until = login_lockouts.locked_until(str(user.id))
+    if locked_until:
+        return locked_until
     if user.locked_until and user.locked_until > datetime.utcnow():
-        return True
-    return False
+        return user.locked_until
+    return None
 
 
-async def increment_failed_attempts(user: User, db: AsyncSession):
+async def increment_failed_attempts(user: Union[User, Row], db: AsyncSession) -> Tuple[int, Optional[datetime]]:
     """
     Increment failed login attempts and lock account if threshold reached.
 
+    Failures are counted in memory and written back to the users table in
+    batches by `writeback_failed_attempts`; the row is only written
+    immediately when an account actually gets locked.
+
     Args:
-        user: User object
+        user: User object or login row
         db: Database session
+
+    Returns:
+        Tuple of (failed_login_attempts, locked_until)
     """
-    user.failed_login_attempts += 1
-    if user.failed_login_attempts >= MAX_LOGIN_ATTEMPTS:
-        user.locked_until = datetime.utcnow() + timedelta(minutes=LOCKOUT_MINUTES)
-    await db.commit()
+    failed_attempts, locked_until = login_lockouts.record_failure(str(user.id))
+
+    if locked_until:
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(failed_login_attempts=failed_attempts, locked_until=locked_until)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+    return failed_attempts, locked_until
 
 
-async def reset_failed_attempts(user: User, db: AsyncSession):
+async def reset_failed_attempts(user: Union[User, Row], db: AsyncSession):
     """
     Reset failed login attempts on successful login.
 
+    Writes to the database when the row has a persisted count or lockout, or
+    when this process counted failures that a writeback may have stored since
+    the row was read. Runs under the writeback lock, so an in-flight flush
+    cannot store a stale count after the reset.
+
     Args:
-        user: User object
+        user: User object or login row
         db: Database session
     """
-    user.failed_login_attempts = 0
-    user.locked_until = None
-    await db.commit()
+    async with _writeback_lock:
+        had_failures = login_lockouts.reset(str(user.id))
+        if not had_failures and not user.failed_login_attempts and user.locked_until is None:
+            return
+
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(failed_login_attempts=0, locked_until=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+
+async def flush_failed_attempts() -> int:
+    """
+    Write changed failure counts to the users table in one bulk update.
+
+    Counts are put back for the next flush if the write fails.
+
+    Returns:
+        Number of users updated
+    """
+    async with _writeback_lock:
+        pending = login_lockouts.drain_pending()
+        if not pending:
+            return 0
+
+        try:
+            async with app_db.session() as session:
+                await session.execute(
+                    update(User),
+                    [
+                        {"id": uuid.UUID(user_id), "failed_login_attempts": failures}
+                        for user_id, failures in pending.items()
+                    ]
+                )
+        except Exception:
+            login_lockouts.requeue(pending)
+            raise
+        return len(pending)
+
+
+async def writeback_failed_attempts(interval: float = LOCKOUT_WRITEBACK_SECONDS):
+    """Flush failure counts every `interval` seconds (run as a background task)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_failed_attempts()
+        except Exception as e:
+            print(f"Writing back failed login attempts failed: {e}")
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -113,16 +238,16 @@ async def register(
             detail="Email already registered"
         )
 
-    # Create new user
+    # Create new user (bcrypt runs in a worker thread, off the event loop)
     new_user = User(
         email=request.email,
-        hashed_password=hash_password(request.password)
+        hashed_password=await ahash_password(request.password)
     )
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
 
-    return UserResponse(
+    return UserResponse.model_construct(
         id=str(new_user.id),
         email=new_user.email,
         is_active=new_user.is_active,
@@ -143,28 +268,30 @@ async def login(
     - Checks for account lockout
     - Sets httpOnly cookie with JWT token
     """
-    # Find user by email
-    user = await get_user_by_email(db, request.email)
+    # Find user by email (only the columns login needs)
+    user = await get_user_login_row(db, request.email)
 
     if not user:
+        await averify_password(request.password, _DUMMY_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
     # Check if account is locked
-    if await check_login_lockout(user):
-        remaining_time = (user.locked_until - datetime.utcnow()).seconds // 60
+    locked_until = await check_login_lockout(user)
+    if locked_until:
+        remaining_time = (locked_until - datetime.utcnow()).seconds // 60
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail=f"Account locked. Try again in {remaining_time + 1} minutes."
         )
 
-    # Verify password
-    if not verify_password(request.password, user.hashed_password):
-        await increment_failed_attempts(user, db)
+    # Verify password (bcrypt runs in a worker thread, off the event loop)
+    if not await averify_password(request.password, user.hashed_password):
+        failed_attempts, _ = await increment_failed_attempts(user, db)
 
-        attempts_remaining = MAX_LOGIN_ATTEMPTS - user.failed_login_attempts
+        attempts_remaining = MAX_LOGIN_ATTEMPTS - failed_attempts
         if attempts_remaining > 0:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -191,7 +318,7 @@ async def login(
 
     # Set httpOnly cookie
     response.set_cookie(
-        key="access_token",
+        key=AUTH_COOKIE_NAME,
         value=access_token,
         httponly=True,
         secure=COOKIE_SECURE,
@@ -199,21 +326,26 @@ async def login(
         max_age=COOKIE_MAX_AGE
     )
 
-    return TokenResponse(access_token=access_token)
+    return TokenResponse.model_construct(access_token=access_token)
 
 
 @router.post("/logout", response_model=MessageResponse)
-async def logout(response: Response):
+async def logout(request: Request):
     """
     Logout user by clearing the JWT cookie.
     """
+    token = request.cookies.get(AUTH_COOKIE_NAME)
+    if token:
+        invalidate_user_cache(token=token)
+
+    response = message_response(_LOGGED_OUT)
     response.delete_cookie(
-        key="access_token",
+        key=AUTH_COOKIE_NAME,
         httponly=True,
         secure=COOKIE_SECURE,
         samesite=COOKIE_SAMESITE
     )
-    return MessageResponse(message="Logged out successfully")
+    return response
 
 
 @router.get("/me", response_model=UserResponse)
@@ -221,7 +353,7 @@ async def get_me(current_user: User = Depends(get_current_user)):
     """
     Get current authenticated user's information.
     """
-    return UserResponse(
+    return UserResponse.model_construct(
         id=str(current_user.id),
         email=current_user.email,
         is_active=current_user.is_active,
@@ -258,18 +390,18 @@ async def forgot_password(
         db.add(reset_token)
         await db.commit()
 
-        # Send email (import here to avoid circular imports)
+        # Send email in the background, or inline if the worker is not running
+        # (import here to avoid circular imports)
         try:
-            from src.auth.email import send_password_reset_email
-            await send_password_reset_email(user.email, token)
+            from src.auth.email import queue_password_reset_email, send_password_reset_email
+            if not queue_password_reset_email(user.email, token):
+                await send_password_reset_email(user.email, token)
         except Exception as e:
             # Log error but don't expose it to user
             print(f"Failed to send password reset email: {e}")
 
     # Always return success to prevent email enumeration
-    return MessageResponse(
-        message="If your email is registered, you will receive a password reset link."
-    )
+    return message_response(_RESET_LINK_SENT)
 
 
 @router.post("/reset-password", response_model=MessageResponse)
@@ -292,21 +424,25 @@ async def reset_password(
             detail=error_msg
         )
 
-    # Find the reset token
+    # Find the reset token and its user in one query
     result = await db.execute(
-        select(PasswordResetToken).where(
+        select(User, PasswordResetToken)
+        .join(PasswordResetToken, PasswordResetToken.user_id == User.id)
+        .where(
             PasswordResetToken.token == request.token,
             PasswordResetToken.used == False
         )
     )
-    reset_token = result.scalar_one_or_none()
+    row = result.first()
 
-    if not reset_token:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid or expired reset token"
         )
 
+    user, reset_token = row
+
     # Check if token is expired
     if is_token_expired(reset_token.expires_at):
         raise HTTPException(
@@ -314,29 +450,19 @@ async def reset_password(
             detail="Reset token has expired"
         )
 
-    # Get the user
-    user_result = await db.execute(
-        select(User).where(User.id == reset_token.user_id)
-    )
-    user = user_result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid reset token"
-        )
-
     # Update password
-    user.hashed_password = hash_password(request.new_password)
+    user.hashed_password = await ahash_password(request.new_password)
     user.failed_login_attempts = 0
     user.locked_until = None
+    login_lockouts.reset(str(user.id))
 
     # Mark token as used
     reset_token.used = True
 
     await db.commit()
+    invalidate_user_cache(user_id=user.id)
 
-    return MessageResponse(message="Password has been reset successfully")
+    return message_response(_PASSWORD_RESET)
 
 
 @router.post("/change-password", response_model=MessageResponse)
@@ -352,7 +478,7 @@ async def change_password(
     - Validates new password strength
     """
     # Verify current password
-    if not verify_password(request.current_password, current_user.hashed_password):
+    if not await averify_password(request.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -367,15 +493,15 @@ async def change_password(
         )
 
     # Update password
-    current_user.hashed_password = hash_password(request.new_password)
+    current_user.hashed_password = await ahash_password(request.new_password)
     await db.commit()
+    invalidate_user_cache(user_id=current_user.id)
 
-    return MessageResponse(message="Password changed successfully")
+    return message_response(_PASSWORD_CHANGED)
 
 
 @router.delete("/account", response_model=MessageResponse)
 async def delete_account(
-    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -386,15 +512,18 @@ async def delete_account(
     - Clears authentication cookie
     """
     # Delete user (cascade will handle related records)
+    user_id = current_user.id
     await db.delete(current_user)
     await db.commit()
+    invalidate_user_cache(user_id=user_id)
 
     # Clear cookie
+    response = message_response(_ACCOUNT_DELETED)
     response.delete_cookie(
-        key="access_token",
+        key=AUTH_COOKIE_NAME,
         httponly=True,
         secure=COOKIE_SECURE,
         samesite=COOKIE_SAMESITE
     )
 
-    return MessageResponse(message="Account deleted successfully")
+    return response
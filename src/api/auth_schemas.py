@@ -2,14 +2,45 @@
 Pydantic schemas for authentication endpoints.
 """
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, StringConstraints
 
+# Response models are built server-side from trusted data (see model_construct
+# in the handlers), so skip extras and assignment validation
+RESPONSE_MODEL_CONFIG = ConfigDict(extra="ignore", validate_assignment=False, populate_by_name=True)
+
+# Syntactic email check for request bodies (a single regex match instead of
+# email-validator's full parse on every request): a dot-atom local part and a
+# domain of dot-separated hostname labels ending in an alphabetic TLD
+_EMAIL_ATOM = r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+"
+_EMAIL_LABEL = r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+EMAIL_RE = rf"^{_EMAIL_ATOM}(?:\.{_EMAIL_ATOM})*@(?:{_EMAIL_LABEL}\.)+[A-Za-z]{{2,63}}$"
+
+
+def normalize_email(email: str) -> str:
+    """
+    Lowercase the domain part, as EmailStr did (the local part is kept as typed).
+
+    Args:
+        email: Syntactically valid email address
+
+    Returns:
+        Email address with a lowercase domain
+    """
+    local, _, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
+Email = Annotated[
+    str,
+    StringConstraints(strip_whitespace=True, pattern=EMAIL_RE, max_length=254),
+    AfterValidator(normalize_email)
+]
 
 class UserRegisterRequest(BaseModel):
     """Request schema for user registration"""
-    email: EmailStr = Field(..., description="User's email address")
+    email: Email = Field(..., description="User's email address")
     password: str = Field(
         ...,
         min_length=8,
@@ -19,30 +50,31 @@ class UserRegisterRequest(BaseModel):
 
 class UserLoginRequest(BaseModel):
     """Request schema for user login"""
-    email: EmailStr = Field(..., description="User's email address")
+    email: Email = Field(..., description="User's email address")
     password: str = Field(..., description="User's password")
 
 
 class TokenResponse(BaseModel):
     """Response schema for successful authentication"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     access_token: str = Field(..., description="JWT access token")
     token_type: str = Field(default="bearer", description="Token type")
 
 
 class UserResponse(BaseModel):
     """Response schema for user information"""
+    model_config = ConfigDict(from_attributes=True, **RESPONSE_MODEL_CONFIG)
+
     id: str = Field(..., description="User's UUID")
     email: str = Field(..., description="User's email address")
     is_active: bool = Field(..., description="Whether user account is active")
     created_at: datetime = Field(..., description="Account creation timestamp")
 
-    class Config:
-        from_attributes = True
-
 
 class ForgotPasswordRequest(BaseModel):
     """Request schema for forgot password flow"""
-    email: EmailStr = Field(..., description="Email address for password reset")
+    email: Email = Field(..., description="Email address for password reset")
 
 
 class ResetPasswordRequest(BaseModel):
@@ -67,4 +99,6 @@ class ChangePasswordRequest(BaseModel):
 
 class MessageResponse(BaseModel):
     """Generic message response"""
+    model_config = RESPONSE_MODEL_CONFIG
+
     message: str = Field(..., description="Response message")
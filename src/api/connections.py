@@ -1,21 +1,76 @@
 """
 API routes for customer database connection management.
 """
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import time
+
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy import select, delete as sql_delete, and_
+from sqlalchemy import select, insert, update, delete as sql_delete, and_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import CustomerConnection, TableConfig, QueryUsage
 from src.database.connection import get_db
 from src.database.encryption import encrypt_credential, decrypt_credential
 from src.database.introspection import get_adapter, detect_db_type, TableInfo
+from src.agents.sql_agent import SQLAgent
+
+
+router = APIRouter(prefix="/api/connections", tags=["connections"], default_response_class=ORJSONResponse)
 
+# Decrypted URLs of recently used connections, so hot connections skip the
+# decrypt: connection id -> (cached_until, encrypted_url, url)
+URL_CACHE_TTL_SECONDS = 300
+URL_CACHE_MAX_ENTRIES = 1024
+_url_cache: Dict[UUID, Tuple[float, str, str]] = {}
 
-router = APIRouter(prefix="/api/connections", tags=["connections"])
+
+def get_connection_url(connection: CustomerConnection) -> str:
+    """
+    Get a connection's plain database URL, decrypting it at most once per TTL.
+
+    The cache entry is keyed by connection id and only used while the stored
+    encrypted URL is unchanged. Plain URLs are kept in memory only.
+
+    Args:
+        connection: CustomerConnection row
+
+    Returns:
+        Plain database URL
+    """
+    now = time.monotonic()
+    cached = _url_cache.get(connection.id)
+    if cached and cached[0] > now and cached[1] == connection.encrypted_url:
+        return cached[2]
+
+    url = decrypt_credential(connection.encrypted_url)
+    _url_cache.pop(connection.id, None)
+    if len(_url_cache) >= URL_CACHE_MAX_ENTRIES:
+        del _url_cache[next(iter(_url_cache))]
+    _url_cache[connection.id] = (now + URL_CACHE_TTL_SECONDS, connection.encrypted_url, url)
+    return url
+
+
+def invalidate_connection_url(connection_id: UUID) -> None:
+    """Drop a connection's cached plain URL (call on update or delete)"""
+    _url_cache.pop(connection_id, None)
+
+
+# Pre-encoded get_tables responses: connection id -> (cached_until, JSON bytes)
+TABLES_CACHE_TTL_SECONDS = 60
+TABLES_CACHE_MAX_ENTRIES = 1024
+_tables_cache: Dict[UUID, Tuple[float, bytes]] = {}
+
+
+def invalidate_tables_cache(connection_id: UUID) -> None:
+    """Drop a connection's cached table list (call after changing its tables)"""
+    _tables_cache.pop(connection_id, None)
 
 
 # Request/Response Models
@@ -68,35 +123,63 @@ class QueryLimitResponse(BaseModel):
 
 # Helper functions
 async def get_query_usage(db: AsyncSession, connection_id: UUID) -> QueryUsage:
-    """Get or create query usage for current month."""
+    """
+    Get or create query usage for current month.
+
+    The common path is a single SELECT. On a miss the row is created with
+    INSERT ... ON CONFLICT DO NOTHING on the (connection_id, year, month)
+    unique index, so concurrent first requests cannot create duplicates.
+    """
     now = datetime.utcnow()
     month, year = now.month, now.year
 
-    result = await db.execute(
-        select(QueryUsage).where(
-            and_(
-                QueryUsage.connection_id == connection_id,
-                QueryUsage.month == month,
-                QueryUsage.year == year
-            )
+    query = select(QueryUsage).where(
+        and_(
+            QueryUsage.connection_id == connection_id,
+            QueryUsage.month == month,
+            QueryUsage.year == year
         )
     )
-    usage = result.scalar_one_or_none()
+    usage = (await db.execute(query)).scalar_one_or_none()
 
     if not usage:
-        usage = QueryUsage(
-            connection_id=connection_id,
-            query_count=0,
-            month=month,
-            year=year
+        await db.execute(
+            pg_insert(QueryUsage)
+            .values(connection_id=connection_id, query_count=0, month=month, year=year)
+            .on_conflict_do_nothing(index_elements=["connection_id", "year", "month"])
         )
-        db.add(usage)
-        await db.commit()
-        await db.refresh(usage)
+        usage = (await db.execute(query)).scalar_one()
 
     return usage
 
 
+def select_connections_with_counts():
+    """SELECT connections with their total and enabled table counts (one query, no per-connection lookups)."""
+    return (
+        select(
+            CustomerConnection,
+            func.count(TableConfig.id).label("table_count"),
+            func.count(TableConfig.id).filter(TableConfig.is_enabled.is_(True)).label("enabled_table_count")
+        )
+        .outerjoin(TableConfig, TableConfig.connection_id == CustomerConnection.id)
+        .group_by(CustomerConnection.id)
+    )
+
+
+def to_connection_response(connection: CustomerConnection, table_count: int, enabled_table_count: int) -> ConnectionResponse:
+    """Build the API response for a connection and its table counts (skips re-validation)."""
+    return ConnectionResponse.model_construct(
+        id=str(connection.id),
+        name=connection.name,
+        db_type=connection.db_type,
+        ssl_mode=connection.ssl_mode,
+        is_active=connection.is_active,
+        created_at=connection.created_at,
+        table_count=table_count,
+        enabled_table_count=enabled_table_count
+    )
+
+
 async def check_query_limit(db: AsyncSession, connection_id: UUID, limit: int = 30) -> bool:
     """
     Check if connection has queries remaining.
@@ -113,11 +196,31 @@ async def check_query_limit(db: AsyncSession, connection_id: UUID, limit: int =
     return usage.query_count < limit
 
 
-async def increment_query_count(db: AsyncSession, connection_id: UUID):
-    """Increment query count for current month."""
-    usage = await get_query_usage(db, connection_id)
-    usage.query_count += 1
+async def increment_query_count(db: AsyncSession, connection_id: UUID) -> int:
+    """
+    Increment query count for current month.
+
+    A single atomic upsert: creates the month's row or bumps its counter in
+    the database, so concurrent queries cannot lose increments.
+
+    Returns:
+        The new query count
+    """
+    now = datetime.utcnow()
+    stmt = pg_insert(QueryUsage).values(
+        connection_id=connection_id, query_count=1, month=now.month, year=now.year
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["connection_id", "year", "month"],
+        set_={
+            "query_count": QueryUsage.query_count + 1,
+            "updated_at": stmt.excluded.updated_at
+        }
+    ).returning(QueryUsage.query_count)
+
+    query_count = (await db.execute(stmt)).scalar_one()
     await db.commit()
+    return query_count
 
 
 # API Endpoints
@@ -149,35 +252,51 @@ async def create_connection(
         if not test_result.success:
             raise HTTPException(status_code=400, detail=f"Connection test failed: {test_result.message}")
 
-        # Encrypt credentials
-        encrypted_url = encrypt_credential(request.database_url)
+        # Introspect schema concurrently with saving the connection record
+        introspect_task = asyncio.create_task(adapter.introspect_schema(request.database_url))
 
-        # Create connection record
-        connection = CustomerConnection(
-            name=request.name,
-            db_type=db_type,
-            encrypted_url=encrypted_url,
-            ssl_mode=request.ssl_mode,
-            is_active=True
-        )
-        db.add(connection)
-        await db.commit()
-        await db.refresh(connection)
+        try:
+            # Encrypt credentials
+            encrypted_url = encrypt_credential(request.database_url)
+
+            # Create connection record
+            connection = CustomerConnection(
+                name=request.name,
+                db_type=db_type,
+                encrypted_url=encrypted_url,
+                ssl_mode=request.ssl_mode,
+                is_active=True
+            )
+            db.add(connection)
+            await db.commit()
+            await db.refresh(connection)
+        except BaseException:
+            introspect_task.cancel()
+            raise
 
-        # Introspect schema in background
         try:
-            tables = await adapter.introspect_schema(request.database_url)
-
-            # Store table metadata
-            for table in tables:
-                table_config = TableConfig(
-                    connection_id=connection.id,
-                    table_name=table.table_name,
-                    schema_name=table.schema_name,
-                    columns=[{"name": col.name, "type": col.data_type} for col in table.columns],
-                    is_enabled=False  # Disabled by default
-                )
-                db.add(table_config)
+            tables = await introspect_task
+
+            # Store table metadata (one multi-row INSERT instead of one per table)
+            if tables:
+                await db.execute(insert(TableConfig), [
+                    {
+                        "connection_id": connection.id,
+                        "table_name": table.table_name,
+                        "schema_name": table.schema_name,
+                        "columns": [
+                            {
+                                "name": col.name,
+                                "type": col.data_type,
+                                "primary_key": col.is_primary_key,
+                                "indexed": col.is_indexed
+                            }
+                            for col in table.columns
+                        ],
+                        "is_enabled": False  # Disabled by default
+                    }
+                    for table in tables
+                ])
 
             await db.commit()
 
@@ -185,13 +304,8 @@ async def create_connection(
             # Connection created but introspection failed - log but don't fail
             print(f"Warning: Schema introspection failed: {e}")
 
-        return ConnectionResponse(
-            id=str(connection.id),
-            name=connection.name,
-            db_type=connection.db_type,
-            ssl_mode=connection.ssl_mode,
-            is_active=connection.is_active,
-            created_at=connection.created_at,
+        return to_connection_response(
+            connection,
             table_count=len(tables) if 'tables' in locals() else 0,
             enabled_table_count=0
         )
@@ -205,60 +319,25 @@ async def create_connection(
 @router.get("/", response_model=List[ConnectionResponse])
 async def list_connections(db: AsyncSession = Depends(get_db)):
     """List all connections for the current user."""
-    result = await db.execute(select(CustomerConnection).where(CustomerConnection.is_active == True))
-    connections = result.scalars().all()
-
-    response = []
-    for conn in connections:
-        # Count tables
-        table_result = await db.execute(
-            select(TableConfig).where(TableConfig.connection_id == conn.id)
-        )
-        tables = table_result.scalars().all()
-        enabled_count = sum(1 for t in tables if t.is_enabled)
-
-        response.append(ConnectionResponse(
-            id=str(conn.id),
-            name=conn.name,
-            db_type=conn.db_type,
-            ssl_mode=conn.ssl_mode,
-            is_active=conn.is_active,
-            created_at=conn.created_at,
-            table_count=len(tables),
-            enabled_table_count=enabled_count
-        ))
+    result = await db.execute(
+        select_connections_with_counts().where(CustomerConnection.is_active == True)
+    )
 
-    return response
+    return [to_connection_response(*row) for row in result.all()]
 
 
 @router.get("/{connection_id}", response_model=ConnectionResponse)
 async def get_connection(connection_id: UUID, db: AsyncSession = Depends(get_db)):
     """Get connection details by ID."""
     result = await db.execute(
-        select(CustomerConnection).where(CustomerConnection.id == connection_id)
+        select_connections_with_counts().where(CustomerConnection.id == connection_id)
     )
-    connection = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not connection:
+    if not row:
         raise HTTPException(status_code=404, detail="Connection not found")
 
-    # Count tables
-    table_result = await db.execute(
-        select(TableConfig).where(TableConfig.connection_id == connection.id)
-    )
-    tables = table_result.scalars().all()
-    enabled_count = sum(1 for t in tables if t.is_enabled)
-
-    return ConnectionResponse(
-        id=str(connection.id),
-        name=connection.name,
-        db_type=connection.db_type,
-        ssl_mode=connection.ssl_mode,
-        is_active=connection.is_active,
-        created_at=connection.created_at,
-        table_count=len(tables),
-        enabled_table_count=enabled_count
-    )
+    return to_connection_response(*row)
 
 
 @router.delete("/{connection_id}")
@@ -283,6 +362,9 @@ async def delete_connection(connection_id: UUID, db: AsyncSession = Depends(get_
     await db.execute(sql_delete(CustomerConnection).where(CustomerConnection.id == connection_id))
 
     await db.commit()
+    SQLAgent.invalidate_schema(connection_id)
+    invalidate_connection_url(connection_id)
+    invalidate_tables_cache(connection_id)
 
     return {"message": "Connection deleted successfully"}
 
@@ -298,8 +380,8 @@ async def test_connection(connection_id: UUID, db: AsyncSession = Depends(get_db
     if not connection:
         raise HTTPException(status_code=404, detail="Connection not found")
 
-    # Decrypt URL and test
-    url = decrypt_credential(connection.encrypted_url)
+    # Decrypt URL (cached) and test
+    url = get_connection_url(connection)
     adapter = get_adapter(url)
     test_result = await adapter.test_connection(url)
 
@@ -313,13 +395,16 @@ async def test_connection(connection_id: UUID, db: AsyncSession = Depends(get_db
 @router.get("/{connection_id}/tables", response_model=List[TableInfoResponse])
 async def get_tables(connection_id: UUID, db: AsyncSession = Depends(get_db)):
     """Get all tables for a connection."""
+    now = time.monotonic()
+    cached = _tables_cache.get(connection_id)
+    if cached and cached[0] > now:
+        return Response(content=cached[1], media_type="application/json")
+
     # Check if connection exists
     result = await db.execute(
-        select(CustomerConnection).where(CustomerConnection.id == connection_id)
+        select(CustomerConnection.id).where(CustomerConnection.id == connection_id)
     )
-    connection = result.scalar_one_or_none()
-
-    if not connection:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Connection not found")
 
     # Get tables
@@ -328,15 +413,22 @@ async def get_tables(connection_id: UUID, db: AsyncSession = Depends(get_db)):
     )
     tables = table_result.scalars().all()
 
-    return [
-        TableInfoResponse(
-            schema_name=table.schema_name,
-            table_name=table.table_name,
-            column_count=len(table.columns),
-            is_enabled=table.is_enabled
-        )
+    content = orjson.dumps([
+        {
+            "schema_name": table.schema_name,
+            "table_name": table.table_name,
+            "column_count": len(table.columns),
+            "is_enabled": table.is_enabled
+        }
         for table in tables
-    ]
+    ])
+
+    _tables_cache.pop(connection_id, None)
+    if len(_tables_cache) >= TABLES_CACHE_MAX_ENTRIES:
+        del _tables_cache[next(iter(_tables_cache))]
+    _tables_cache[connection_id] = (now + TABLES_CACHE_TTL_SECONDS, content)
+
+    return Response(content=content, media_type="application/json")
 
 
 @router.patch("/{connection_id}/tables")
@@ -348,32 +440,46 @@ async def update_tables(
     """Enable/disable tables for queries."""
     # Check if connection exists
     result = await db.execute(
-        select(CustomerConnection).where(CustomerConnection.id == connection_id)
+        select(CustomerConnection.id).where(CustomerConnection.id == connection_id)
     )
-    connection = result.scalar_one_or_none()
-
-    if not connection:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Connection not found")
 
     # Get all tables
     table_result = await db.execute(
-        select(TableConfig).where(TableConfig.connection_id == connection_id)
+        select(
+            TableConfig.id,
+            TableConfig.schema_name,
+            TableConfig.table_name,
+            TableConfig.is_enabled
+        ).where(TableConfig.connection_id == connection_id)
     )
-    tables = table_result.scalars().all()
 
-    # Update enabled status
-    updated = 0
-    for table in tables:
-        full_name = f"{table.schema_name}.{table.table_name}"
-        should_enable = full_name in request.enabled_table_names or table.table_name in request.enabled_table_names
-
-        if table.is_enabled != should_enable:
-            table.is_enabled = should_enable
-            updated += 1
+    # Resolve the new enabled status of every table
+    enabled_names = frozenset(request.enabled_table_names)
+    enabled_ids = []
+    changed_ids = []
+    for table_id, schema_name, table_name, is_enabled in table_result:
+        should_enable = f"{schema_name}.{table_name}" in enabled_names or table_name in enabled_names
+        if should_enable:
+            enabled_ids.append(table_id)
+        if bool(is_enabled) != should_enable:
+            changed_ids.append(table_id)
+
+    # Apply all changes in one UPDATE
+    if changed_ids:
+        await db.execute(
+            update(TableConfig)
+            .where(TableConfig.id.in_(changed_ids))
+            .values(is_enabled=TableConfig.id.in_(enabled_ids))
+            .execution_options(synchronize_session=False)
+        )
 
     await db.commit()
+    SQLAgent.invalidate_schema(connection_id)
+    invalidate_tables_cache(connection_id)
 
-    return {"message": f"Updated {updated} tables", "enabled_count": sum(1 for t in tables if t.is_enabled)}
+    return {"message": f"Updated {len(changed_ids)} tables", "enabled_count": len(enabled_ids)}
 
 
 @router.get("/{connection_id}/usage", response_model=QueryLimitResponse)
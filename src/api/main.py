@@ -3,15 +3,26 @@ FastAPI Main Application - Executive Analytics Assistant API
 """
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
+import sys
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
-from .routes import router
+from .routes import router, local_tracer
 from .connections import router as connections_router
-from .auth import router as auth_router
+from .auth import flush_failed_attempts, router as auth_router, writeback_failed_attempts
 from .schemas import ErrorResponse
+from .settings import settings
+from ..database.connection import db, tenant_manager
+from ..database.introspection import dispose_engines
+from ..graph import get_workflow
+from ..auth.email import close_http_client, start_email_worker, stop_email_worker
 from ..utils.logging import setup_logging, get_logger
 
 # Load environment variables
@@ -25,17 +36,51 @@ os.environ["LANGCHAIN_ENDPOINT"] = os.getenv("LANGSMITH_ENDPOINT", "https://api.
 
 # Setup logging
 setup_logging(
-    log_level=os.getenv("LOG_LEVEL", "INFO"),
+    log_level=settings.log_level,
     console_output=True
 )
 logger = get_logger("api.main")
 
+LOG_REQUESTS = logging.getLevelName(settings.log_level) <= logging.INFO
+
+# Load balancer probes are not logged
+UNLOGGED_PATHS = frozenset({"/api/health"})
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("application_startup", version="0.1.0")
     
+    # Default executor for asyncio.to_thread (password hashing, blocking calls)
+    workers = max(32, (os.cpu_count() or 1) * 5)
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-worker")
+    )
+    
+    # Open the database pool's connections before the first request needs them
+    try:
+        opened = await db.warmup()
+        logger.info("database_pool_warmed", connections=opened)
+    except Exception as e:
+        logger.warning("database_pool_warmup_failed", error=str(e))
+    
+    # Close customer database pools that go idle
+    tenant_reaper = asyncio.create_task(tenant_manager.reap_idle())
+    
+    # Failed login counts are written back to the users table in batches
+    lockout_writer = asyncio.create_task(writeback_failed_attempts())
+    
+    # Password reset emails are sent by a background worker
+    start_email_worker()
+    
+    # Build the LangGraph workflow now instead of on the first query
+    try:
+        get_workflow()
+        logger.info("workflow_initialized")
+    except Exception as e:
+        logger.warning("workflow_init_failed", error=str(e))
+    
     # Log LangSmith configuration
     langsmith_enabled = os.getenv("LANGCHAIN_TRACING_V2", "false")
     langsmith_project = os.getenv("LANGCHAIN_PROJECT", "unknown")
@@ -47,6 +92,26 @@ async def lifespan(app: FastAPI):
     )
     
     yield
+    
+    # Write out any queued traces before exiting
+    if local_tracer:
+        local_tracer.flush()
+    
+    # Persist failed login counts not yet written back
+    lockout_writer.cancel()
+    try:
+        await flush_failed_attempts()
+    except Exception as e:
+        logger.warning("failed_attempts_flush_failed", error=str(e))
+    
+    # Close customer database pools
+    tenant_reaper.cancel()
+    await tenant_manager.close_all()
+    await dispose_engines()
+    
+    # Deliver queued emails, then release the SendGrid connection
+    await stop_email_worker()
+    await close_http_client()
     logger.info("application_shutdown")
 
 
@@ -55,21 +120,26 @@ app = FastAPI(
     title="Executive Analytics Assistant API",
     description="Multi-agent system for conversational SQL analytics with LangGraph",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Compress large responses (query results); level 4 trades a little ratio for CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
 # CORS Configuration (integrated, no separate middleware file)
-allowed_origins = os.getenv(
-    "CORS_ORIGINS",
-    "http://localhost:8501,http://localhost:3000,http://localhost:7860,http://localhost:7861"
-).split(",")
+allowed_origins = settings.allowed_origins
+CORS_ALLOW_METHODS = ["GET", "POST", "PATCH", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["Content-Type", "Authorization"]
+CORS_MAX_AGE = 86400  # Browsers cache preflight responses for 24h
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=CORS_ALLOW_METHODS,
+    allow_headers=CORS_ALLOW_HEADERS,
+    max_age=CORS_MAX_AGE,
 )
 
 logger.info("cors_configured", allowed_origins=allowed_origins)
@@ -89,14 +159,14 @@ async def global_exception_handler(request: Request, exc: Exception):
         path=request.url.path,
         method=request.method,
         error=str(exc),
-        exc_info=True
+        exc_info=settings.debug  # Tracebacks only in debug mode
     )
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=ErrorResponse(
             error="Internal server error",
-            detail=str(exc) if os.getenv("DEBUG", "false").lower() == "true" else None
+            detail=str(exc) if settings.debug else None
         ).model_dump()
     )
 
@@ -114,34 +184,112 @@ async def root():
     }
 
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all HTTP requests"""
-    logger.info(
-        "http_request",
-        method=request.method,
-        path=request.url.path,
-        client_host=request.client.host if request.client else "unknown"
-    )
-    
-    response = await call_next(request)
-    
-    logger.info(
-        "http_response",
-        method=request.method,
-        path=request.url.path,
-        status_code=response.status_code
-    )
-    
-    return response
+# Request logging middleware (pure ASGI: no per-request task or body streaming)
+class LogRequestsMiddleware:
+    """Log all HTTP requests and their response status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not LOG_REQUESTS or scope["type"] != "http" or scope["path"] in UNLOGGED_PATHS:
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        logger.info(
+            "http_request",
+            method=method,
+            path=path,
+            client_host=client[0] if client else "unknown"
+        )
+
+        async def send_with_logging(message):
+            if message["type"] == "http.response.start":
+                logger.info(
+                    "http_response",
+                    method=method,
+                    path=path,
+                    status_code=message["status"]
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_logging)
+
+
+app.add_middleware(LogRequestsMiddleware)
+
+
+# Preflight fast path: valid CORS preflights are answered before any other middleware
+class PreflightMiddleware:
+    """
+    Answer CORS preflight requests from allowed origins with precomputed headers.
+
+    Preflights this cannot fully vouch for (unknown origin, method or header)
+    fall through to CORSMiddleware, which produces the proper rejection.
+    """
+
+    def __init__(self, app, origins: List[str], methods: List[str], headers: List[str], max_age: int):
+        self.app = app
+        self.methods = frozenset(method.encode() for method in methods)
+        self.headers = frozenset(header.lower() for header in headers)
+        common = [
+            (b"access-control-allow-methods", ", ".join(methods).encode()),
+            (b"access-control-allow-headers", ", ".join(headers).encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"vary", b"Origin"),
+            (b"content-length", b"0"),
+        ]
+        self.responses = {
+            origin.encode(): [(b"access-control-allow-origin", origin.encode())] + common
+            for origin in origins
+            if origin != "*"
+        }
+
+    def _preflight_headers(self, scope) -> Optional[List[Tuple[bytes, bytes]]]:
+        origin = method = None
+        requested_headers = b""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                method = value
+            elif name == b"access-control-request-headers":
+                requested_headers = value
+        if origin not in self.responses or method not in self.methods:
+            return None
+        for header in requested_headers.decode("latin-1").split(","):
+            header = header.strip().lower()
+            if header and header not in self.headers:
+                return None
+        return self.responses[origin]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            headers = self._preflight_headers(scope)
+            if headers is not None:
+                await send({"type": "http.response.start", "status": 204, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(
+    PreflightMiddleware,
+    origins=allowed_origins,
+    methods=CORS_ALLOW_METHODS,
+    headers=CORS_ALLOW_HEADERS,
+    max_age=CORS_MAX_AGE,
+)
 
 
 if __name__ == "__main__":
     import uvicorn
     
-    host = os.getenv("API_HOST", "0.0.0.0")
-    port = int(os.getenv("API_PORT", "8000"))
+    host = settings.api_host
+    port = settings.api_port
     
     logger.info("starting_server", host=host, port=port)
     
@@ -149,6 +297,12 @@ if __name__ == "__main__":
         "src.api.main:app",
         host=host,
         port=port,
-        reload=True,
+        # C-accelerated event loop and HTTP parser (uvloop is unavailable on Windows)
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        reload=settings.api_reload,
+        # Opt in to more processes with API_WORKERS; each has its own DB pool
+        # and in-memory state. The autoreloader only supports a single worker
+        workers=1 if settings.api_reload else settings.api_workers,
         log_level="info"
     )
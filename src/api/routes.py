@@ -1,19 +1,22 @@
 """
 API Routes for Executive Analytics Assistant
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-import uuid
-import os
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+import time
 
-from .schemas import QueryRequest, QueryResponse, HealthResponse, ErrorResponse
+import orjson
+
+from .schemas import QueryRequest, QueryResponse, HealthResponse
+from .settings import settings
 from ..graph import get_workflow, create_initial_state
 from ..utils.logging import get_logger
 from ..utils.custom_tracer import get_local_tracer
+from ..tools.sql_executor import frame_to_records
 from ..database.connection import test_connection
 from ..database.models import User
 from ..auth.dependencies import get_current_user, get_current_user_optional
-from typing import Optional
 
 # Get logger
 logger = get_logger("api.routes")
@@ -27,11 +30,83 @@ except Exception as e:
     logger.warning("local_json_tracer_init_failed", error=str(e))
     local_tracer = None
 
+# Workflow run config, shared by every request
+TRACE_CONFIG = {"callbacks": [local_tracer]} if local_tracer else {}
+
 # Create router
 router = APIRouter(prefix="/api", tags=["analytics"])
 
-# Import connections router
-from .connections import router as connections_router
+
+def _build_query_response(session_id: str, result: Dict[str, Any], query_results: Any = None) -> QueryResponse:
+    """Build a QueryResponse from a trusted workflow result, without validation"""
+    return QueryResponse.model_construct(
+        session_id=session_id,
+        sql_query=result.get("sql_query"),
+        query_results=query_results,
+        result_count=result.get("result_count", 0),
+        derived_metrics=result.get("derived_metrics"),
+        chart_type=result.get("chart_type"),
+        chart_config=result.get("chart_config"),
+        insights=result.get("insights", []),
+        recommendations=result.get("recommendations", []),
+        errors=result.get("errors", []),
+        warnings=result.get("warnings", []),
+        metrics=result.get("metrics")
+    )
+
+
+def query_response(session_id: str, result: Dict[str, Any]) -> ORJSONResponse:
+    """
+    Encode a workflow result as a QueryResponse.
+
+    The workflow output is trusted, so the model is built without validation
+    and encoded with orjson directly instead of being validated again against
+    the route's response_model (which still documents the schema).
+
+    Args:
+        session_id: Session ID from the request
+        result: Final workflow state
+
+    Returns:
+        JSON response with the QueryResponse body
+    """
+    response = _build_query_response(
+        session_id, result, frame_to_records(result.get("query_results"))
+    )
+    return ORJSONResponse(content=response.model_dump())
+
+
+# Result rows encoded per chunk when streaming
+STREAM_CHUNK_ROWS = 500
+
+
+def stream_query_response(session_id: str, result: Dict[str, Any]) -> StreamingResponse:
+    """
+    Stream a workflow result as NDJSON.
+
+    The first line holds every QueryResponse field except query_results; each
+    following line is one result row. Rows are encoded in chunks as they are
+    sent, so the full result list is never built in memory.
+
+    Args:
+        session_id: Session ID from the request
+        result: Final workflow state
+
+    Returns:
+        Streaming NDJSON response
+    """
+    header = _build_query_response(session_id, result).model_dump(exclude={"query_results"})
+    results = result.get("query_results")
+
+    def lines():
+        yield orjson.dumps(header) + b"\n"
+        if results is None:
+            return
+        for start in range(0, len(results), STREAM_CHUNK_ROWS):
+            rows = frame_to_records(results.iloc[start:start + STREAM_CHUNK_ROWS])
+            yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.post("/query", response_model=QueryResponse, status_code=status.HTTP_200_OK)
@@ -59,7 +134,7 @@ async def execute_query(
     )
     
     try:
-        # Get workflow
+        # Get workflow (built once, at startup)
         workflow = get_workflow()
         
         # Create initial state
@@ -69,8 +144,7 @@ async def execute_query(
         )
         
         # Execute workflow with local JSON tracing
-        config = {"callbacks": [local_tracer]} if local_tracer else {}
-        result = await workflow.ainvoke(state, config=config)
+        result = await workflow.ainvoke(state, config=TRACE_CONFIG)
         
         # Log completion
         logger.info(
@@ -81,27 +155,69 @@ async def execute_query(
         )
         
         # Return response
-        return QueryResponse(
-            session_id=request.session_id,
-            sql_query=result.get("sql_query"),
-            query_results=result.get("query_results"),
-            result_count=result.get("result_count", 0),
-            derived_metrics=result.get("derived_metrics"),
-            chart_type=result.get("chart_type"),
-            chart_config=result.get("chart_config"),
-            insights=result.get("insights", []),
-            recommendations=result.get("recommendations", []),
-            errors=result.get("errors", []),
-            warnings=result.get("warnings", []),
-            metrics=result.get("metrics")
-        )
+        return query_response(request.session_id, result)
         
     except Exception as e:
         logger.error(
             "api_query_error",
             session_id=request.session_id,
             error=str(e),
-            exc_info=True
+            exc_info=settings.debug
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error processing query: {str(e)}"
+        )
+
+
+@router.post("/query/stream", status_code=status.HTTP_200_OK)
+async def execute_query_stream(
+    request: QueryRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Execute a natural language query and stream the results as NDJSON
+
+    Same as /query, but the first line carries SQL, charts, insights and
+    metrics, and every following line is one result row.
+
+    Args:
+        request: QueryRequest with natural language query and session_id
+        current_user: Authenticated user (injected by dependency)
+
+    Returns:
+        Streaming NDJSON response
+    """
+    logger.info(
+        "api_query_stream_received",
+        session_id=request.session_id,
+        user_id=str(current_user.id),
+        query_preview=request.query[:100]
+    )
+
+    try:
+        workflow = get_workflow()
+        state = create_initial_state(
+            user_query=request.query,
+            session_id=request.session_id
+        )
+        result = await workflow.ainvoke(state, config=TRACE_CONFIG)
+
+        logger.info(
+            "api_query_stream_completed",
+            session_id=request.session_id,
+            success=not result.get("errors"),
+            duration_ms=result.get("metrics", {}).get("total_duration_ms", 0)
+        )
+
+        return stream_query_response(request.session_id, result)
+
+    except Exception as e:
+        logger.error(
+            "api_query_stream_error",
+            session_id=request.session_id,
+            error=str(e),
+            exc_info=settings.debug
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,7 +255,7 @@ async def execute_demo_query(
     )
 
     try:
-        # Get workflow
+        # Get workflow (built once, at startup)
         workflow = get_workflow()
 
         # Create initial state
@@ -149,8 +265,7 @@ async def execute_demo_query(
         )
 
         # Execute workflow with local JSON tracing
-        config = {"callbacks": [local_tracer]} if local_tracer else {}
-        result = await workflow.ainvoke(state, config=config)
+        result = await workflow.ainvoke(state, config=TRACE_CONFIG)
 
         # Log completion
         logger.info(
@@ -163,20 +278,7 @@ async def execute_demo_query(
         )
 
         # Return response
-        return QueryResponse(
-            session_id=request.session_id,
-            sql_query=result.get("sql_query"),
-            query_results=result.get("query_results"),
-            result_count=result.get("result_count", 0),
-            derived_metrics=result.get("derived_metrics"),
-            chart_type=result.get("chart_type"),
-            chart_config=result.get("chart_config"),
-            insights=result.get("insights", []),
-            recommendations=result.get("recommendations", []),
-            errors=result.get("errors", []),
-            warnings=result.get("warnings", []),
-            metrics=result.get("metrics")
-        )
+        return query_response(request.session_id, result)
 
     except Exception as e:
         logger.error(
@@ -184,7 +286,7 @@ async def execute_demo_query(
             session_id=request.session_id,
             user_id=user_id,
             error=str(e),
-            exc_info=True
+            exc_info=settings.debug
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -192,14 +294,26 @@ async def execute_demo_query(
         )
 
 
+# Encoded health response, reused by probes until it expires
+HEALTH_CACHE_TTL_SECONDS = 1.0
+_health_cache = {"body": b"", "expires": 0.0}
+
+
 @router.get("/health", response_model=HealthResponse, status_code=status.HTTP_200_OK)
 async def health_check():
     """
     Health check endpoint to verify service and database connectivity
+
+    The database is probed at most once per HEALTH_CACHE_TTL_SECONDS; probes in
+    between get the last encoded response.
     
     Returns:
         HealthResponse with service and database status
     """
+    now = time.monotonic()
+    if now < _health_cache["expires"]:
+        return Response(content=_health_cache["body"], media_type="application/json")
+
     try:
         logger.info("health_check_requested")
         
@@ -208,7 +322,7 @@ async def health_check():
         db_status = "error"
         
         try:
-            db_connected = test_connection()
+            db_connected = await test_connection()
             db_status = "connected" if db_connected else "disconnected"
         except Exception as db_error:
             logger.warning("database_connection_test_failed", error=str(db_error))
@@ -219,7 +333,7 @@ async def health_check():
         
         logger.info("health_check_completed", status=service_status, database=db_status)
         
-        return HealthResponse(
+        health = HealthResponse(
             status=service_status,
             database=db_status
         )
@@ -227,11 +341,15 @@ async def health_check():
     except Exception as e:
         logger.error("health_check_error", error=str(e), exc_info=True)
         # Return unhealthy status but don't raise exception
-        return HealthResponse(
+        health = HealthResponse(
             status="unhealthy",
             database="error"
         )
 
+    _health_cache["body"] = orjson.dumps(health.model_dump())
+    _health_cache["expires"] = now + HEALTH_CACHE_TTL_SECONDS
+    return Response(content=_health_cache["body"], media_type="application/json")
+
 
 @router.get("/history/{session_id}", response_model=List[QueryResponse])
 async def get_session_history(
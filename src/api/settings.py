@@ -0,0 +1,29 @@
+"""
+API settings - read once from the environment at startup
+"""
+from typing import List
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """API configuration from environment variables (e.g. DEBUG, API_PORT)"""
+    model_config = SettingsConfigDict(frozen=True, extra="ignore")
+
+    debug: bool = False
+    log_level: str = "INFO"
+    cors_origins: str = "http://localhost:8501,http://localhost:3000,http://localhost:7860,http://localhost:7861"
+    api_host: str = "0.0.0.0"
+    api_port: int = 8000
+    api_reload: bool = False
+    # Lockout counters, caches and DB pools are per process; scale workers deliberately
+    api_workers: int = 1
+
+    @property
+    def allowed_origins(self) -> List[str]:
+        """CORS origins as a list"""
+        return self.cors_origins.split(",")
+
+
+# Read from the environment once, at import
+settings = Settings()
@@ -8,13 +8,21 @@ Provides:
 - Email services (SendGrid)
 """
 
-from .password import hash_password, verify_password, validate_password_strength
+from .password import (
+    ahash_password,
+    averify_password,
+    hash_password,
+    verify_password,
+    validate_password_strength
+)
 from .jwt import create_access_token, decode_token, create_password_reset_token
 from .dependencies import get_current_user
 
 __all__ = [
     "hash_password",
     "verify_password",
+    "ahash_password",
+    "averify_password",
     "validate_password_strength",
     "create_access_token",
     "decode_token",
@@ -1,20 +1,97 @@
 """
 FastAPI authentication dependencies.
 """
-from typing import Optional
+import time
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
-from fastapi.security import APIKeyCookie
-from sqlalchemy import select
+from sqlalchemy import Row, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from src.database.connection import get_db
 from src.database.models import User
-from .jwt import decode_token
+from .jwt import decode_token, evict_token, token_digest
 
 
-# Cookie-based authentication scheme
-cookie_scheme = APIKeyCookie(name="access_token", auto_error=False)
+# Cookie holding the JWT (read straight from request.cookies)
+AUTH_COOKIE_NAME = "access_token"
+
+# Authenticated users by token digest, so hot tokens skip JWT verification and
+# the user SELECT: blake2b-128(token) -> (cached_until, user column values)
+USER_CACHE_TTL_SECONDS = 30
+USER_CACHE_MAX_ENTRIES = 10000
+_user_cache: Dict[bytes, Tuple[float, Dict[str, Any]]] = {}
+_USER_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+def invalidate_user_cache(user_id: Optional[Any] = None, token: Optional[str] = None) -> None:
+    """
+    Drop cached authentications for a user or a single token.
+
+    Call after changing a user's password, status, or deleting the account.
+
+    Args:
+        user_id: User's UUID; drops every cached token of this user
+        token: JWT token; drops this token's entry
+    """
+    if token:
+        _user_cache.pop(token_digest(token), None)
+        evict_token(token)
+    if user_id is not None:
+        user_id = str(user_id)
+        for key in [k for k, (_, row) in _user_cache.items() if str(row["id"]) == user_id]:
+            del _user_cache[key]
+
+
+async def _authenticate(db: AsyncSession, token: str) -> Optional[User]:
+    """
+    Resolve a JWT to its User, using the short-lived authentication cache.
+
+    Cached users are re-attached to the request's session without a query,
+    so handlers can still modify and commit them.
+
+    Args:
+        db: Database session
+        token: JWT token from cookie
+
+    Returns:
+        User object if the token is valid and the user exists, None otherwise
+    """
+    key = token_digest(token)
+    now = time.time()
+
+    cached = _user_cache.get(key)
+    if cached and cached[0] > now:
+        user = User(**cached[1])
+        make_transient_to_detached(user)
+        db.add(user)
+        return user
+
+    payload = decode_token(token)
+    if not payload:
+        return None
+
+    user_id = payload.get("sub")
+    if not user_id:
+        return None
+
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+
+    # Never cache past the token's own expiry
+    cached_until = min(now + USER_CACHE_TTL_SECONDS, payload.get("exp", now))
+    if cached_until > now:
+        if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+            del _user_cache[next(iter(_user_cache))]  # Evict the oldest entry
+        _user_cache[key] = (
+            cached_until,
+            {column: getattr(user, column) for column in _USER_COLUMNS}
+        )
+
+    return user
 
 
 async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
@@ -28,12 +105,9 @@ async def get_user_by_id(db: AsyncSession, user_id: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
-    from uuid import UUID
     try:
-        result = await db.execute(
-            select(User).where(User.id == UUID(user_id))
-        )
-        return result.scalar_one_or_none()
+        # Primary-key lookup: served from the session identity map when loaded
+        return await db.get(User, UUID(user_id))
     except (ValueError, Exception):
         return None
 
@@ -49,15 +123,37 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     Returns:
         User object if found, None otherwise
     """
+    return await db.scalar(select(User).where(User.email == email))
+
+
+async def get_user_login_row(db: AsyncSession, email: str) -> Optional[Row]:
+    """
+    Fetch only the columns needed to authenticate a login.
+
+    Skips hydrating a full User object on the login hot path.
+
+    Args:
+        db: Database session
+        email: User's email address
+
+    Returns:
+        Row with id, hashed_password, is_active, failed_login_attempts and
+        locked_until if found, None otherwise
+    """
     result = await db.execute(
-        select(User).where(User.email == email)
+        select(
+            User.id,
+            User.hashed_password,
+            User.is_active,
+            User.failed_login_attempts,
+            User.locked_until
+        ).where(User.email == email)
     )
-    return result.scalar_one_or_none()
+    return result.one_or_none()
 
 
 async def get_current_user(
     request: Request,
-    token: Optional[str] = Depends(cookie_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> User:
     """
@@ -67,8 +163,7 @@ async def get_current_user(
     and returns the corresponding User object.
 
     Args:
-        request: FastAPI request object
-        token: JWT token from cookie
+        request: FastAPI request object (JWT read from its cookie)
         db: Database session
 
     Returns:
@@ -83,18 +178,11 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    token = request.cookies.get(AUTH_COOKIE_NAME)
     if not token:
         raise credentials_exception
 
-    payload = decode_token(token)
-    if not payload:
-        raise credentials_exception
-
-    user_id = payload.get("sub")
-    if not user_id:
-        raise credentials_exception
-
-    user = await get_user_by_id(db, user_id)
+    user = await _authenticate(db, token)
     if not user:
         raise credentials_exception
 
@@ -109,7 +197,6 @@ async def get_current_user(
 
 async def get_current_user_optional(
     request: Request,
-    token: Optional[str] = Depends(cookie_scheme),
     db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
     """
@@ -119,25 +206,17 @@ async def get_current_user_optional(
     Useful for endpoints that work differently for authenticated vs anonymous users.
 
     Args:
-        request: FastAPI request object
-        token: JWT token from cookie
+        request: FastAPI request object (JWT read from its cookie)
         db: Database session
 
     Returns:
         User object if authenticated, None otherwise
     """
+    token = request.cookies.get(AUTH_COOKIE_NAME)
     if not token:
         return None
 
-    payload = decode_token(token)
-    if not payload:
-        return None
-
-    user_id = payload.get("sub")
-    if not user_id:
-        return None
-
-    user = await get_user_by_id(db, user_id)
+    user = await _authenticate(db, token)
     if not user or not user.is_active:
         return None
 
@@ -1,13 +1,17 @@
 """
 Email service for authentication flows using SendGrid.
 """
+import asyncio
 import os
-from typing import Optional
+from pathlib import Path
+from string import Template
+from typing import List, Optional, Set, Tuple
+
+import httpx
 
 # SendGrid imports (graceful fallback if not installed)
 try:
-    import sendgrid
-    from sendgrid.helpers.mail import Mail, Email, To, Content
+    from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization, Substitution
     SENDGRID_AVAILABLE = True
 except ImportError:
     SENDGRID_AVAILABLE = False
@@ -18,12 +22,101 @@ FROM_EMAIL = os.getenv("FROM_EMAIL", "noreply@example.com")
 FROM_NAME = os.getenv("FROM_NAME", "Executive Analytics")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:8501")
 
+# SendGrid v3 API, called over a shared async HTTP/2 client
+SENDGRID_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+SENDGRID_TIMEOUT_SECONDS = 10.0
+SENDGRID_MAX_RETRIES = 3
+SENDGRID_RETRY_BASE_SECONDS = 0.5
+
+# Background delivery: handlers enqueue and return, a worker drains the queue
+# in batches with at most EMAIL_SEND_CONCURRENCY SendGrid requests in flight
+EMAIL_QUEUE_MAX_SIZE = 10000
+EMAIL_SEND_CONCURRENCY = 4
+EMAIL_DRAIN_TIMEOUT_SECONDS = 5.0
+
+# Email bodies, loaded and parsed once at import
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+_RESET_HTML_TMPL = Template((TEMPLATES_DIR / "password_reset.html").read_text(encoding="utf-8"))
+_RESET_PLAIN_TMPL = Template("""
+    Password Reset Request
+
+    We received a request to reset your password for your Executive Analytics account.
+
+    Click here to reset your password:
+    $reset_url
+
+    This link will expire in 1 hour.
+
+    If you didn't request a password reset, you can safely ignore this email.
+
+    --
+    Executive Analytics
+    """)
+
+# Batched sends: one API call carries up to SendGrid's limit of personalizations,
+# each substituting its own reset URL into the shared bodies
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+_RESET_URL_TAG = "-reset_url-"
+_RESET_HTML_BATCH = _RESET_HTML_TMPL.safe_substitute(reset_url=_RESET_URL_TAG)
+_RESET_PLAIN_BATCH = _RESET_PLAIN_TMPL.safe_substitute(reset_url=_RESET_URL_TAG)
+
+# The welcome email has no per-recipient fields, so it is rendered once
+_WELCOME_HTML = Template(
+    (TEMPLATES_DIR / "welcome.html").read_text(encoding="utf-8")
+).safe_substitute(frontend_url=FRONTEND_URL)
+
 
 def _is_email_configured() -> bool:
     """Check if email service is properly configured."""
     return SENDGRID_AVAILABLE and bool(SENDGRID_API_KEY)
 
 
+# Shared HTTP client, built on first send
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared SendGrid HTTP client."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=SENDGRID_TIMEOUT_SECONDS,
+            headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"}
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared SendGrid HTTP client (application shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _send(message: "Mail") -> int:
+    """
+    POST a message to SendGrid without blocking the event loop.
+
+    Rate-limited (429) requests are retried with exponential backoff.
+
+    Args:
+        message: SendGrid Mail helper
+
+    Returns:
+        HTTP status code of the last attempt
+    """
+    client = _get_http_client()
+    payload = message.get()
+
+    for attempt in range(SENDGRID_MAX_RETRIES + 1):
+        response = await client.post(SENDGRID_SEND_URL, json=payload)
+        if response.status_code != 429 or attempt == SENDGRID_MAX_RETRIES:
+            return response.status_code
+        await asyncio.sleep(SENDGRID_RETRY_BASE_SECONDS * 2 ** attempt)
+
+
 async def send_password_reset_email(to_email: str, reset_token: str) -> bool:
     """
     Send password reset email via SendGrid.
@@ -41,75 +134,10 @@ async def send_password_reset_email(to_email: str, reset_token: str) -> bool:
 
     reset_url = f"{FRONTEND_URL}/reset-password?token={reset_token}"
 
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #2563eb; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 30px; background: #f9fafb; }}
-            .button {{
-                display: inline-block;
-                background: #2563eb;
-                color: white;
-                padding: 12px 30px;
-                text-decoration: none;
-                border-radius: 5px;
-                margin: 20px 0;
-            }}
-            .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Password Reset Request</h1>
-            </div>
-            <div class="content">
-                <p>Hello,</p>
-                <p>We received a request to reset your password for your Executive Analytics account.</p>
-                <p>Click the button below to reset your password:</p>
-                <p style="text-align: center;">
-                    <a href="{reset_url}" class="button">Reset Password</a>
-                </p>
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all; font-size: 14px; color: #666;">
-                    {reset_url}
-                </p>
-                <p><strong>This link will expire in 1 hour.</strong></p>
-                <p>If you didn't request a password reset, you can safely ignore this email.</p>
-            </div>
-            <div class="footer">
-                <p>This is an automated message from Executive Analytics.</p>
-                <p>Please do not reply to this email.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-    plain_content = f"""
-    Password Reset Request
-
-    We received a request to reset your password for your Executive Analytics account.
-
-    Click here to reset your password:
-    {reset_url}
-
-    This link will expire in 1 hour.
-
-    If you didn't request a password reset, you can safely ignore this email.
-
-    --
-    Executive Analytics
-    """
+    html_content = _RESET_HTML_TMPL.safe_substitute(reset_url=reset_url)
+    plain_content = _RESET_PLAIN_TMPL.safe_substitute(reset_url=reset_url)
 
     try:
-        sg = sendgrid.SendGridAPIClient(api_key=SENDGRID_API_KEY)
-
         message = Mail(
             from_email=Email(FROM_EMAIL, FROM_NAME),
             to_emails=To(to_email),
@@ -118,13 +146,13 @@ async def send_password_reset_email(to_email: str, reset_token: str) -> bool:
         message.add_content(Content("text/plain", plain_content))
         message.add_content(Content("text/html", html_content))
 
-        response = sg.send(message)
+        status_code = await _send(message)
 
-        if response.status_code in (200, 201, 202):
+        if status_code in (200, 201, 202):
             print(f"[Email Service] Password reset email sent to {to_email}")
             return True
         else:
-            print(f"[Email Service] Failed to send email. Status: {response.status_code}")
+            print(f"[Email Service] Failed to send email. Status: {status_code}")
             return False
 
     except Exception as e:
@@ -132,6 +160,78 @@ async def send_password_reset_email(to_email: str, reset_token: str) -> bool:
         return False
 
 
+async def send_password_reset_batch(recipients: List[Tuple[str, str]]) -> int:
+    """
+    Send password reset emails to many users with one API call per 1000 recipients.
+
+    A rejected batch is retried one recipient at a time, so a single invalid
+    address does not drop everyone else's email.
+
+    Args:
+        recipients: List of (email address, reset token) pairs
+
+    Returns:
+        Number of recipients whose emails were accepted by SendGrid
+    """
+    if not _is_email_configured():
+        for to_email, reset_token in recipients:
+            print(f"[Email Service] SendGrid not configured. Reset token for {to_email}: {reset_token}")
+        return 0
+
+    sent = 0
+
+    for start in range(0, len(recipients), SENDGRID_MAX_PERSONALIZATIONS):
+        chunk = recipients[start:start + SENDGRID_MAX_PERSONALIZATIONS]
+
+        message = Mail(
+            from_email=Email(FROM_EMAIL, FROM_NAME),
+            subject="Password Reset Request - Executive Analytics",
+        )
+        for index, (to_email, reset_token) in enumerate(chunk):
+            personalization = Personalization()
+            personalization.add_to(To(to_email))
+            personalization.add_substitution(Substitution(
+                _RESET_URL_TAG, f"{FRONTEND_URL}/reset-password?token={reset_token}"
+            ))
+            message.add_personalization(personalization, index=index)  # Default prepends
+        message.add_content(Content("text/plain", _RESET_PLAIN_BATCH))
+        message.add_content(Content("text/html", _RESET_HTML_BATCH))
+
+        try:
+            status_code = await _send(message)
+        except httpx.HTTPError as e:
+            print(f"[Email Service] Error sending batch: {e}")
+            continue
+        except Exception as e:
+            # e.g. an address the SendGrid helpers cannot serialize
+            print(f"[Email Service] Error building batch: {e}")
+            status_code = None
+
+        if status_code in (200, 201, 202):
+            sent += len(chunk)
+        elif len(chunk) > 1:
+            # SendGrid rejects the whole request if any address is invalid,
+            # so retry one by one to deliver the valid ones
+            print(f"[Email Service] Batch rejected (status {status_code}). Sending individually")
+            sent += await _send_password_resets_individually(chunk)
+        else:
+            print(f"[Email Service] Failed to send batch. Status: {status_code}")
+
+    return sent
+
+
+async def _send_password_resets_individually(recipients: List[Tuple[str, str]]) -> int:
+    """Send one reset email per recipient, EMAIL_SEND_CONCURRENCY at a time."""
+    semaphore = asyncio.Semaphore(EMAIL_SEND_CONCURRENCY)
+
+    async def send(to_email: str, reset_token: str) -> bool:
+        async with semaphore:
+            return await send_password_reset_email(to_email, reset_token)
+
+    results = await asyncio.gather(*(send(to_email, token) for to_email, token in recipients))
+    return sum(results)
+
+
 async def send_welcome_email(to_email: str) -> bool:
     """
     Send welcome email to new users (optional enhancement).
@@ -146,61 +246,91 @@ async def send_welcome_email(to_email: str) -> bool:
         print(f"[Email Service] SendGrid not configured. Welcome email skipped for {to_email}")
         return False
 
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #2563eb; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 30px; background: #f9fafb; }}
-            .button {{
-                display: inline-block;
-                background: #2563eb;
-                color: white;
-                padding: 12px 30px;
-                text-decoration: none;
-                border-radius: 5px;
-            }}
-            .footer {{ padding: 20px; text-align: center; font-size: 12px; color: #666; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Welcome to Executive Analytics!</h1>
-            </div>
-            <div class="content">
-                <p>Hello,</p>
-                <p>Thank you for creating an account with Executive Analytics.</p>
-                <p>You can now connect your database and start asking questions in natural language.</p>
-                <p style="text-align: center;">
-                    <a href="{FRONTEND_URL}" class="button">Get Started</a>
-                </p>
-            </div>
-            <div class="footer">
-                <p>This is an automated message from Executive Analytics.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
     try:
-        sg = sendgrid.SendGridAPIClient(api_key=SENDGRID_API_KEY)
-
         message = Mail(
             from_email=Email(FROM_EMAIL, FROM_NAME),
             to_emails=To(to_email),
             subject="Welcome to Executive Analytics!",
         )
-        message.add_content(Content("text/html", html_content))
+        message.add_content(Content("text/html", _WELCOME_HTML))
 
-        response = sg.send(message)
-        return response.status_code in (200, 201, 202)
+        return await _send(message) in (200, 201, 202)
 
     except Exception as e:
         print(f"[Email Service] Error sending welcome email: {e}")
         return False
+
+
+_email_queue: Optional["asyncio.Queue[Tuple[str, str]]"] = None
+_email_worker: Optional[asyncio.Task] = None
+_email_sends: Set[asyncio.Task] = set()
+
+
+def queue_password_reset_email(to_email: str, reset_token: str) -> bool:
+    """
+    Hand a password reset email to the background worker.
+
+    Args:
+        to_email: Recipient email address
+        reset_token: Password reset token
+
+    Returns:
+        True if queued, False if the worker is not running or the queue is full
+        (the caller should then send inline)
+    """
+    if _email_queue is None:
+        return False
+    try:
+        _email_queue.put_nowait((to_email, reset_token))
+        return True
+    except asyncio.QueueFull:
+        return False
+
+
+async def _run_email_worker(queue: "asyncio.Queue[Tuple[str, str]]") -> None:
+    """Collect whatever is queued into one batch and send it, bounded by a semaphore."""
+    semaphore = asyncio.Semaphore(EMAIL_SEND_CONCURRENCY)
+
+    async def send(batch: List[Tuple[str, str]]) -> None:
+        try:
+            await send_password_reset_batch(batch)
+        except Exception as e:
+            print(f"[Email Service] Error sending queued emails: {e}")
+        finally:
+            semaphore.release()
+            for _ in batch:
+                queue.task_done()
+
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < SENDGRID_MAX_PERSONALIZATIONS and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        await semaphore.acquire()
+        task = asyncio.create_task(send(batch))
+        _email_sends.add(task)
+        task.add_done_callback(_email_sends.discard)
+
+
+def start_email_worker() -> None:
+    """Start the background email worker (application startup)."""
+    global _email_queue, _email_worker
+    if _email_worker is None:
+        _email_queue = asyncio.Queue(maxsize=EMAIL_QUEUE_MAX_SIZE)
+        _email_worker = asyncio.create_task(_run_email_worker(_email_queue))
+
+
+async def stop_email_worker() -> None:
+    """Send what is still queued (bounded by a timeout), then stop the worker."""
+    global _email_queue, _email_worker
+    if _email_worker is None:
+        return
+
+    queue, worker = _email_queue, _email_worker
+    _email_queue = _email_worker = None
+
+    try:
+        await asyncio.wait_for(queue.join(), EMAIL_DRAIN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        print(f"[Email Service] Dropped {queue.qsize()} queued emails at shutdown")
+    worker.cancel()
@@ -1,17 +1,50 @@
 """
 JWT token management utilities.
 """
+import hashlib
 import os
 import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
-from jose import JWTError, jwt
+import jwt
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from jwt import InvalidTokenError
 
 # JWT Configuration from environment
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 1440))  # 24 hours
+PUBLIC_KEY = os.getenv("PUBLIC_KEY", "")
+
+# Signing and verification keys, loaded once. HS256 uses SECRET_KEY for both;
+# EdDSA signs with the Ed25519 private key in SECRET_KEY (PEM) and verifies with
+# PUBLIC_KEY (PEM), derived from the private key when unset
+if ALGORITHM == "EdDSA":
+    SIGNING_KEY = load_pem_private_key(SECRET_KEY.replace("\\n", "\n").encode(), password=None)
+    VERIFY_KEY = (
+        load_pem_public_key(PUBLIC_KEY.replace("\\n", "\n").encode())
+        if PUBLIC_KEY else SIGNING_KEY.public_key()
+    )
+else:
+    SIGNING_KEY = VERIFY_KEY = SECRET_KEY
+
+# Decoder settings, built once: only the configured algorithm is accepted,
+# exp, iat and sub are required, and claims this app never issues are not checked
+DECODE_ALGORITHMS = (ALGORITHM,)
+DECODE_OPTIONS = {
+    "verify_signature": True,
+    "verify_aud": False,
+    "verify_iss": False,
+    "require": ["exp", "iat", "sub"],
+}
+
+# Verified payloads by token digest, so repeated decodes of a session's token
+# skip HMAC verification: blake2b-128(token) -> (cached_until, payload)
+DECODE_CACHE_TTL_SECONDS = 60
+DECODE_CACHE_MAX_ENTRIES = 10000
+_decode_cache: Dict[bytes, Tuple[float, Dict[str, Any]]] = {}
 
 # Password reset token expiration
 PASSWORD_RESET_EXPIRE_MINUTES = 60  # 1 hour
@@ -41,7 +74,7 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         "type": "access"
     })
 
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
@@ -55,12 +88,42 @@ def decode_token(token: str) -> Optional[Dict[str, Any]]:
     Returns:
         Decoded payload dict if valid, None if invalid/expired
     """
+    key = token_digest(token)
+    now = time.time()
+
+    cached = _decode_cache.get(key)
+    if cached and cached[0] > now:
+        return dict(cached[1])
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt.decode(token, VERIFY_KEY, algorithms=DECODE_ALGORITHMS, options=DECODE_OPTIONS)
+    except InvalidTokenError:
         return None
 
+    # Never cache past the token's own expiry
+    cached_until = min(now + DECODE_CACHE_TTL_SECONDS, payload["exp"])
+    if cached_until > now:
+        if len(_decode_cache) >= DECODE_CACHE_MAX_ENTRIES:
+            del _decode_cache[next(iter(_decode_cache))]  # Evict the oldest entry
+        _decode_cache[key] = (cached_until, dict(payload))
+
+    return payload
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key for a token (the token itself is never stored)"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def evict_token(token: str) -> None:
+    """
+    Drop a token's cached payload (e.g. on logout).
+
+    Args:
+        token: JWT token string
+    """
+    _decode_cache.pop(token_digest(token), None)
+
 
 def create_password_reset_token(user_id: str) -> str:
     """
@@ -0,0 +1,171 @@
+"""
+In-memory login lockout tracking.
+
+Failed login attempts are counted per account in a sharded, TTL-bounded map
+instead of being written to the users table on every failure. Changed counts
+are queued and written back to the table periodically, so other processes and
+restarts see them.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Shard count must be a power of two (shard index is hash & mask)
+LOCKOUT_SHARDS = 256
+LOCKOUT_MAX_ENTRIES = 100_000
+
+
+class LockoutTracker:
+    """
+    Sharded failed-login counter with lockout expiry.
+
+    Each shard maps an account key to (failures, locked_until, expires_at)
+    and has its own lock, so concurrent logins for different accounts never
+    contend. Entries expire `lockout_seconds` after the last failure or the
+    end of the lockout, and each shard is bounded by evicting its oldest entry.
+    New failure counts are also queued for writeback (see `drain_pending`).
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        lockout_seconds: float,
+        shards: int = LOCKOUT_SHARDS,
+        max_entries: int = LOCKOUT_MAX_ENTRIES
+    ):
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_seconds
+        self._mask = shards - 1
+        self._max_shard_entries = max(1, max_entries // shards)
+        self._shards: List[Dict[str, Tuple[int, Optional[datetime], float]]] = [
+            {} for _ in range(shards)
+        ]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._max_entries = max_entries
+        # Failure counts not yet written back, account key -> failures
+        self._pending: Dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+
+    def _shard(self, key: str) -> int:
+        return hash(key) & self._mask
+
+    def locked_until(self, key: str) -> Optional[datetime]:
+        """
+        Get the end of an active lockout.
+
+        Args:
+            key: Account key (e.g. user id)
+
+        Returns:
+            UTC datetime the lockout ends, or None if not locked out
+        """
+        index = self._shard(key)
+        with self._locks[index]:
+            entry = self._shards[index].get(key)
+            if entry is None:
+                return None
+            _, locked_until, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._shards[index][key]
+                return None
+        if locked_until and locked_until > datetime.utcnow():
+            return locked_until
+        return None
+
+    def record_failure(self, key: str) -> Tuple[int, Optional[datetime]]:
+        """
+        Count a failed login and start a lockout when the limit is reached.
+
+        Args:
+            key: Account key (e.g. user id)
+
+        Returns:
+            Tuple of (failed attempts, locked_until or None)
+        """
+        index = self._shard(key)
+        now = time.monotonic()
+        with self._locks[index]:
+            shard = self._shards[index]
+            entry = shard.pop(key, None)
+            failures = entry[0] + 1 if entry and entry[2] > now else 1
+
+            locked_until = None
+            if failures >= self.max_attempts:
+                locked_until = datetime.utcnow() + timedelta(seconds=self.lockout_seconds)
+
+            if len(shard) >= self._max_shard_entries:
+                del shard[next(iter(shard))]
+            shard[key] = (failures, locked_until, now + self.lockout_seconds)
+        self._queue(key, failures)
+        return failures, locked_until
+
+    def seed(self, key: str, failures: int) -> None:
+        """
+        Raise an account's count to one persisted elsewhere (e.g. the users table).
+
+        Args:
+            key: Account key (e.g. user id)
+            failures: Failed attempts recorded outside this process
+        """
+        if failures <= 0:
+            return
+        index = self._shard(key)
+        now = time.monotonic()
+        with self._locks[index]:
+            shard = self._shards[index]
+            entry = shard.get(key)
+            if entry and entry[2] > now and entry[0] >= failures:
+                return
+            shard.pop(key, None)
+            if len(shard) >= self._max_shard_entries:
+                del shard[next(iter(shard))]
+            locked_until = entry[1] if entry and entry[2] > now else None
+            shard[key] = (failures, locked_until, now + self.lockout_seconds)
+
+    def _queue(self, key: str, failures: int) -> None:
+        with self._pending_lock:
+            self._pending.pop(key, None)
+            if len(self._pending) >= self._max_entries:
+                del self._pending[next(iter(self._pending))]
+            self._pending[key] = failures
+
+    def drain_pending(self) -> Dict[str, int]:
+        """
+        Take the failure counts changed since the last drain.
+
+        Returns:
+            Dict of account key -> failed attempts
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def requeue(self, pending: Dict[str, int]) -> None:
+        """
+        Put back counts whose writeback failed, unless newer ones were queued.
+
+        Args:
+            pending: Counts previously returned by drain_pending
+        """
+        with self._pending_lock:
+            for key, failures in pending.items():
+                if key not in self._pending and len(self._pending) < self._max_entries:
+                    self._pending[key] = failures
+
+    def reset(self, key: str) -> bool:
+        """
+        Forget an account's failed attempts (e.g. after a successful login).
+
+        Args:
+            key: Account key (e.g. user id)
+
+        Returns:
+            True if the account had counted or queued failures
+        """
+        index = self._shard(key)
+        with self._locks[index]:
+            entry = self._shards[index].pop(key, None)
+        with self._pending_lock:
+            queued = self._pending.pop(key, None)
+        return entry is not None or queued is not None
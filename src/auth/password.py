@@ -1,12 +1,21 @@
 """
 Password hashing and validation utilities using bcrypt.
 """
-import re
-from passlib.context import CryptContext
+import asyncio
+import os
+import string
 from typing import Tuple
 
-# bcrypt context with cost factor 12 (as per spec)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+import bcrypt
+from passlib.context import CryptContext
+
+# bcrypt cost factor (12 as per spec)
+_BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# New hashes go straight through the native bcrypt extension; passlib is kept
+# only to verify legacy hashes in other formats
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=_BCRYPT_ROUNDS)
+_BCRYPT_PREFIXES = ("$2b$", "$2a$", "$2y$")
 
 # Password requirements
 MIN_PASSWORD_LENGTH = 8
@@ -15,6 +24,12 @@ REQUIRE_LOWERCASE = True
 REQUIRE_DIGIT = True
 REQUIRE_SPECIAL = False  # Optional for MVP
 
+# Character classes checked by validate_password_strength (ASCII only)
+_UPPERCASE = frozenset(string.ascii_uppercase)
+_LOWERCASE = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+_SPECIAL = frozenset('!@#$%^&*(),.?":{}|<>')
+
 
 def hash_password(password: str) -> str:
     """
@@ -26,7 +41,7 @@ def hash_password(password: str) -> str:
     Returns:
         Hashed password string
     """
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=_BCRYPT_ROUNDS)).decode()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -40,9 +55,42 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if password matches, False otherwise
     """
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+
+    # Legacy hash formats
+    if pwd_context.identify(hashed_password) is None:
+        return False
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def ahash_password(password: str) -> str:
+    """
+    Hash a password in a worker thread so the event loop stays free.
+
+    Args:
+        password: Plain text password
+
+    Returns:
+        Hashed password string
+    """
+    return await asyncio.to_thread(hash_password, password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password in a worker thread so the event loop stays free.
+
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Hashed password to compare against
+
+    Returns:
+        True if password matches, False otherwise
+    """
+    return await asyncio.to_thread(verify_password, plain_password, hashed_password)
+
+
 def validate_password_strength(password: str) -> Tuple[bool, str]:
     """
     Validate password meets minimum security requirements.
@@ -63,16 +111,19 @@ def validate_password_strength(password: str) -> Tuple[bool, str]:
     if len(password) < MIN_PASSWORD_LENGTH:
         return False, f"Password must be at least {MIN_PASSWORD_LENGTH} characters"
 
-    if REQUIRE_UPPERCASE and not re.search(r"[A-Z]", password):
+    # One pass over the password instead of a regex search per rule
+    chars = set(password)
+
+    if REQUIRE_UPPERCASE and chars.isdisjoint(_UPPERCASE):
         return False, "Password must contain at least one uppercase letter"
 
-    if REQUIRE_LOWERCASE and not re.search(r"[a-z]", password):
+    if REQUIRE_LOWERCASE and chars.isdisjoint(_LOWERCASE):
         return False, "Password must contain at least one lowercase letter"
 
-    if REQUIRE_DIGIT and not re.search(r"\d", password):
+    if REQUIRE_DIGIT and chars.isdisjoint(_DIGITS):
         return False, "Password must contain at least one digit"
 
-    if REQUIRE_SPECIAL and not re.search(r"[!@#$%^&*(),.?\":{}|<>]", password):
+    if REQUIRE_SPECIAL and chars.isdisjoint(_SPECIAL):
         return False, "Password must contain at least one special character"
 
     return True, ""
@@ -1,10 +1,20 @@
 """
-Credential encryption utilities using Fernet (AES-128).
+Credential encryption utilities using AES-256-GCM (legacy Fernet tokens still decrypt).
 """
+import base64
 import os
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from typing import Optional
 
+# Token layout: urlsafe-base64(version byte + 12-byte nonce + ciphertext and tag).
+# Fernet tokens start with 0x80, so the first byte tells the formats apart
+AESGCM_VERSION = 0x01
+FERNET_VERSION = 0x80
+NONCE_BYTES = 12
+
 
 class CredentialEncryption:
     """Handle encryption/decryption of database credentials."""
@@ -23,7 +33,44 @@ class CredentialEncryption:
                 "Generate with: python -c \"from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())\""
             )
 
-        self.fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        key = key.encode() if isinstance(key, str) else key
+        self.fernet = Fernet(key)
+
+        # Separate AES-256 key derived from the same secret
+        self.aead = AESGCM(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b"credential-encryption-aesgcm"
+        ).derive(base64.urlsafe_b64decode(key)))
+
+    def encrypt_credential_bytes(self, url: bytes) -> bytes:
+        """
+        Encrypt a database URL to a raw token (for binary storage).
+
+        Args:
+            url: Plain database URL as UTF-8 bytes
+
+        Returns:
+            Raw token: version byte + nonce + ciphertext and tag
+        """
+        nonce = os.urandom(NONCE_BYTES)
+        return bytes([AESGCM_VERSION]) + nonce + self.aead.encrypt(nonce, url, None)
+
+    def decrypt_credential_bytes(self, token: bytes) -> bytes:
+        """
+        Decrypt a raw token from encrypt_credential_bytes.
+
+        Args:
+            token: Raw token (legacy Fernet tokens are accepted base64-decoded)
+
+        Returns:
+            Plain database URL as UTF-8 bytes
+        """
+        if token[0] == FERNET_VERSION:
+            return self.fernet.decrypt(base64.urlsafe_b64encode(token))
+        nonce = token[1:1 + NONCE_BYTES]
+        return self.aead.decrypt(nonce, token[1 + NONCE_BYTES:], None)
 
     def encrypt_credential(self, url: str) -> str:
         """
@@ -35,7 +82,7 @@ class CredentialEncryption:
         Returns:
             Encrypted string (base64)
         """
-        return self.fernet.encrypt(url.encode()).decode()
+        return base64.urlsafe_b64encode(self.encrypt_credential_bytes(url.encode())).decode()
 
     def decrypt_credential(self, encrypted: str) -> str:
         """
@@ -47,7 +94,7 @@ class CredentialEncryption:
         Returns:
             Plain database URL
         """
-        return self.fernet.decrypt(encrypted.encode()).decode()
+        return self.decrypt_credential_bytes(base64.urlsafe_b64decode(encrypted)).decode()
 
 
 # Singleton instance
@@ -2,11 +2,139 @@
 Database introspection utilities for PostgreSQL and MySQL.
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 import asyncio
-from sqlalchemy import create_engine, text
-from sqlalchemy.ext.asyncio import create_async_engine
+import hashlib
+import time
+from collections import OrderedDict, defaultdict
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncResult, create_async_engine
+
+from .connection import to_asyncpg_url
+
+
+# Engines for connection tests and introspection, reused across calls by URL
+# (least recently used first; the oldest is disposed beyond the limit)
+MAX_ENGINES = 32
+_engines: "OrderedDict[str, AsyncEngine]" = OrderedDict()
+
+
+async def get_engine(url: str) -> AsyncEngine:
+    """
+    Get the shared pooled engine for a database URL.
+
+    Args:
+        url: SQLAlchemy async database URL
+
+    Returns:
+        AsyncEngine (created on first use)
+    """
+    engine = _engines.get(url)
+    if engine is not None:
+        _engines.move_to_end(url)
+        return engine
+
+    engine = create_async_engine(
+        url,
+        pool_size=2,  # Introspection and tests are occasional
+        max_overflow=3,
+        pool_pre_ping=True,
+        pool_recycle=1800
+    )
+    _engines[url] = engine
+    while len(_engines) > MAX_ENGINES:
+        _, oldest = _engines.popitem(last=False)
+        await oldest.dispose()
+    return engine
+
+
+async def discard_engine(url: str) -> None:
+    """
+    Dispose and forget the engine for a URL (e.g. after a failed connection).
+
+    Args:
+        url: SQLAlchemy async database URL
+    """
+    engine = _engines.pop(url, None)
+    if engine is not None:
+        await engine.dispose()
+
+
+async def dispose_engines() -> None:
+    """Dispose all shared engines (application shutdown)."""
+    while _engines:
+        _, engine = _engines.popitem()
+        await engine.dispose()
+
+
+# Rows fetched per round trip when streaming information_schema.columns
+INTROSPECTION_BATCH_ROWS = 1000
+
+# Introspected schemas by URL digest: blake2b-128(url) -> (cached_at, version, tables).
+# A hit needs both a fresh entry and an unchanged schema version token from a
+# one-row catalog query
+SCHEMA_CACHE_TTL_SECONDS = 300
+SCHEMA_CACHE_MAX_ENTRIES = 256
+_schema_cache: Dict[bytes, Tuple[float, str, List["TableInfo"]]] = {}
+
+# Schema version tokens: change whenever tables or columns are added, dropped,
+# renamed or altered. PostgreSQL rewrites a catalog row (new xmin) on any of
+# these; only user objects (oid >= 16384, FirstNormalObjectId) are read. MySQL
+# checksums each column's name, type, nullability, key and position
+PG_SCHEMA_VERSION_QUERY = text("""
+    SELECT
+        (SELECT count(*) || '-' || sum(xmin::text::bigint) FROM pg_class WHERE oid >= 16384)
+        || '/' ||
+        (SELECT count(*) || '-' || sum(xmin::text::bigint) FROM pg_attribute WHERE attrelid >= 16384)
+""")
+MYSQL_SCHEMA_VERSION_QUERY = text("""
+    SELECT CONCAT_WS('/',
+        (SELECT CONCAT(COUNT(*), '-', COALESCE(SUM(CRC32(CONCAT_WS(':',
+                TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, ORDINAL_POSITION
+            ))), 0))
+         FROM information_schema.columns WHERE TABLE_SCHEMA = DATABASE()),
+        (SELECT CONCAT(COUNT(*), '-', COALESCE(MAX(CREATE_TIME), ''), '-', COALESCE(SUM(CRC32(TABLE_NAME)), 0))
+         FROM information_schema.tables WHERE TABLE_SCHEMA = DATABASE())
+    )
+""")
+
+def _schema_cache_key(url: str) -> bytes:
+    """Cache key for a database URL (the URL itself is never stored)"""
+    return hashlib.blake2b(url.encode(), digest_size=16).digest()
+
+
+def get_cached_schema(url: str, version: str) -> Optional[List["TableInfo"]]:
+    """
+    Get a cached introspection result if it is recent and the schema is unchanged.
+
+    Args:
+        url: Database connection URL
+        version: Current schema version token
+
+    Returns:
+        List of TableInfo objects, or None on a miss
+    """
+    cached = _schema_cache.get(_schema_cache_key(url))
+    if cached and cached[1] == version and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL_SECONDS:
+        return list(cached[2])
+    return None
+
+
+def cache_schema(url: str, version: str, tables: List["TableInfo"]) -> None:
+    """
+    Store an introspection result.
+
+    Args:
+        url: Database connection URL
+        version: Schema version token the result was read at
+        tables: List of TableInfo objects
+    """
+    key = _schema_cache_key(url)
+    _schema_cache.pop(key, None)
+    if len(_schema_cache) >= SCHEMA_CACHE_MAX_ENTRIES:
+        del _schema_cache[next(iter(_schema_cache))]  # Evict the oldest entry
+    _schema_cache[key] = (time.monotonic(), version, list(tables))
 
 
 @dataclass
@@ -15,6 +143,8 @@ class ColumnInfo:
     name: str
     data_type: str
     is_nullable: bool
+    is_primary_key: bool = False
+    is_indexed: bool = False
 
 
 @dataclass
@@ -25,6 +155,28 @@ class TableInfo:
     columns: List[ColumnInfo]
 
 
+async def group_columns(result: AsyncResult) -> List[TableInfo]:
+    """
+    Group streamed column rows into tables.
+
+    Rows are (schema, table, column, data_type, is_nullable, is_primary_key,
+    is_indexed), with the flags as booleans (or 0/1).
+
+    Args:
+        result: Streamed column rows from information_schema.columns
+
+    Returns:
+        List of TableInfo objects, in first-seen order
+    """
+    groups: Dict[Tuple[str, str], List[ColumnInfo]] = defaultdict(list)
+    async for rows in result.partitions():
+        for schema, table, column, data_type, is_nullable, is_primary_key, is_indexed in rows:
+            groups[(schema, table)].append(ColumnInfo(
+                column, data_type, bool(is_nullable), bool(is_primary_key), bool(is_indexed)
+            ))
+    return [TableInfo(schema, table, columns) for (schema, table), columns in groups.items()]
+
+
 @dataclass
 class ConnectionResult:
     """Connection test result."""
@@ -69,9 +221,9 @@ class PostgreSQLAdapter(DatabaseAdapter):
 
     async def test_connection(self, url: str, timeout: int = 5) -> ConnectionResult:
         """Test PostgreSQL connection."""
+        engine_url = to_asyncpg_url(url)
         try:
-            # Create async engine for testing
-            engine = create_async_engine(url, pool_pre_ping=True)
+            engine = await get_engine(engine_url)
 
             # Test connection with timeout
             async with asyncio.timeout(timeout):
@@ -79,8 +231,6 @@ class PostgreSQLAdapter(DatabaseAdapter):
                     result = await conn.execute(text("SELECT version()"))
                     version = result.scalar()
 
-                    await engine.dispose()
-
                     return ConnectionResult(
                         success=True,
                         message="Connection successful",
@@ -88,11 +238,14 @@ class PostgreSQLAdapter(DatabaseAdapter):
                     )
 
         except asyncio.TimeoutError:
+            await discard_engine(engine_url)
             return ConnectionResult(
                 success=False,
                 message=f"Connection timeout after {timeout} seconds"
             )
         except Exception as e:
+            # Don't keep a pool for a URL that doesn't work
+            await discard_engine(engine_url)
             return ConnectionResult(
                 success=False,
                 message=f"Connection failed: {str(e)}"
@@ -101,49 +254,54 @@ class PostgreSQLAdapter(DatabaseAdapter):
     async def introspect_schema(self, url: str) -> List[TableInfo]:
         """Introspect PostgreSQL schema."""
         try:
-            engine = create_async_engine(url)
+            engine = await get_engine(to_asyncpg_url(url))
 
+            # Columns with their key and index membership in one round trip, read
+            # from pg_catalog directly (information_schema.columns is a view over
+            # these tables with per-row privilege checks and type-name lookups)
             query = text("""
+                WITH indexed AS (
+                    SELECT
+                        i.indrelid,
+                        k.attnum,
+                        bool_or(i.indisprimary) AS is_primary_key
+                    FROM pg_catalog.pg_index i
+                    CROSS JOIN LATERAL unnest(i.indkey) AS k(attnum)
+                    GROUP BY i.indrelid, k.attnum
+                )
                 SELECT
-                    table_schema,
-                    table_name,
-                    column_name,
-                    data_type,
-                    is_nullable
-                FROM information_schema.columns
-                WHERE table_schema NOT IN ('pg_catalog', 'information_schema')
-                ORDER BY table_schema, table_name, ordinal_position
+                    n.nspname,
+                    c.relname,
+                    a.attname,
+                    format_type(a.atttypid, a.atttypmod),
+                    NOT a.attnotnull,
+                    coalesce(ix.is_primary_key, false),
+                    ix.attnum IS NOT NULL
+                FROM pg_catalog.pg_attribute a
+                JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN indexed ix ON ix.indrelid = a.attrelid AND ix.attnum = a.attnum
+                WHERE c.relkind IN ('r', 'v', 'm', 'f', 'p')
+                    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+                    AND a.attnum > 0
+                    AND NOT a.attisdropped
+                    AND has_table_privilege(c.oid, 'SELECT')
+                ORDER BY n.nspname, c.relname, a.attnum
             """)
 
             async with engine.connect() as conn:
-                result = await conn.execute(query)
-                rows = result.fetchall()
-
-                await engine.dispose()
-
-            # Group by table
-            tables_dict: Dict[tuple, List[ColumnInfo]] = {}
-            for row in rows:
-                key = (row[0], row[1])  # (schema, table)
-                if key not in tables_dict:
-                    tables_dict[key] = []
-
-                tables_dict[key].append(ColumnInfo(
-                    name=row[2],
-                    data_type=row[3],
-                    is_nullable=(row[4] == 'YES')
+                version = str((await conn.execute(PG_SCHEMA_VERSION_QUERY)).scalar())
+                tables = get_cached_schema(url, version)
+                if tables is not None:
+                    return tables
+
+                # Stream rows through a server-side cursor, grouping each batch
+                # as it arrives instead of holding the whole catalog in memory
+                tables = await group_columns(await conn.stream(
+                    query, execution_options={"yield_per": INTROSPECTION_BATCH_ROWS}
                 ))
 
-            # Convert to TableInfo list
-            tables = [
-                TableInfo(
-                    schema_name=schema,
-                    table_name=table,
-                    columns=columns
-                )
-                for (schema, table), columns in tables_dict.items()
-            ]
-
+            cache_schema(url, version, tables)
             return tables
 
         except Exception as e:
@@ -155,10 +313,10 @@ class MySQLAdapter(DatabaseAdapter):
 
     async def test_connection(self, url: str, timeout: int = 5) -> ConnectionResult:
         """Test MySQL connection."""
+        # Convert to aiomysql-compatible URL
+        mysql_url = url.replace('mysql://', 'mysql+aiomysql://')
         try:
-            # Convert to aiomysql-compatible URL
-            mysql_url = url.replace('mysql://', 'mysql+aiomysql://')
-            engine = create_async_engine(mysql_url, pool_pre_ping=True)
+            engine = await get_engine(mysql_url)
 
             # Test connection with timeout
             async with asyncio.timeout(timeout):
@@ -166,8 +324,6 @@ class MySQLAdapter(DatabaseAdapter):
                     result = await conn.execute(text("SELECT VERSION()"))
                     version = result.scalar()
 
-                    await engine.dispose()
-
                     return ConnectionResult(
                         success=True,
                         message="Connection successful",
@@ -175,11 +331,14 @@ class MySQLAdapter(DatabaseAdapter):
                     )
 
         except asyncio.TimeoutError:
+            await discard_engine(mysql_url)
             return ConnectionResult(
                 success=False,
                 message=f"Connection timeout after {timeout} seconds"
             )
         except Exception as e:
+            # Don't keep a pool for a URL that doesn't work
+            await discard_engine(mysql_url)
             return ConnectionResult(
                 success=False,
                 message=f"Connection failed: {str(e)}"
@@ -190,49 +349,45 @@ class MySQLAdapter(DatabaseAdapter):
         try:
             # Convert to aiomysql-compatible URL
             mysql_url = url.replace('mysql://', 'mysql+aiomysql://')
-            engine = create_async_engine(mysql_url)
+            engine = await get_engine(mysql_url)
 
+            # Columns with their key and index membership in one round trip
             query = text("""
                 SELECT
-                    TABLE_SCHEMA,
-                    TABLE_NAME,
-                    COLUMN_NAME,
-                    DATA_TYPE,
-                    IS_NULLABLE
-                FROM information_schema.columns
-                WHERE TABLE_SCHEMA = DATABASE()
-                ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION
+                    c.TABLE_SCHEMA,
+                    c.TABLE_NAME,
+                    c.COLUMN_NAME,
+                    c.DATA_TYPE,
+                    c.IS_NULLABLE = 'YES',
+                    COALESCE(s.IS_PRIMARY_KEY, 0),
+                    s.COLUMN_NAME IS NOT NULL
+                FROM information_schema.columns c
+                LEFT JOIN (
+                    SELECT
+                        TABLE_NAME,
+                        COLUMN_NAME,
+                        MAX(INDEX_NAME = 'PRIMARY') AS IS_PRIMARY_KEY
+                    FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                    GROUP BY TABLE_NAME, COLUMN_NAME
+                ) s ON s.TABLE_NAME = c.TABLE_NAME AND s.COLUMN_NAME = c.COLUMN_NAME
+                WHERE c.TABLE_SCHEMA = DATABASE()
+                ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION
             """)
 
             async with engine.connect() as conn:
-                result = await conn.execute(query)
-                rows = result.fetchall()
-
-                await engine.dispose()
-
-            # Group by table
-            tables_dict: Dict[tuple, List[ColumnInfo]] = {}
-            for row in rows:
-                key = (row[0], row[1])  # (schema, table)
-                if key not in tables_dict:
-                    tables_dict[key] = []
-
-                tables_dict[key].append(ColumnInfo(
-                    name=row[2],
-                    data_type=row[3],
-                    is_nullable=(row[4] == 'YES')
+                version = str((await conn.execute(MYSQL_SCHEMA_VERSION_QUERY)).scalar())
+                tables = get_cached_schema(url, version)
+                if tables is not None:
+                    return tables
+
+                # Stream rows through a server-side cursor, grouping each batch
+                # as it arrives instead of holding the whole catalog in memory
+                tables = await group_columns(await conn.stream(
+                    query, execution_options={"yield_per": INTROSPECTION_BATCH_ROWS}
                 ))
 
-            # Convert to TableInfo list
-            tables = [
-                TableInfo(
-                    schema_name=schema,
-                    table_name=table,
-                    columns=columns
-                )
-                for (schema, table), columns in tables_dict.items()
-            ]
-
+            cache_schema(url, version, tables)
             return tables
 
         except Exception as e:
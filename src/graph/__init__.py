@@ -8,6 +8,7 @@ from .nodes import (
     analyst_agent_node,
     viz_agent_node,
     insight_agent_node,
+    viz_and_insight_node,
     should_continue
 )
 
@@ -21,5 +22,6 @@ __all__ = [
     'analyst_agent_node',
     'viz_agent_node',
     'insight_agent_node',
+    'viz_and_insight_node',
     'should_continue'
 ]
@@ -21,7 +21,7 @@ async def sql_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current workflow state
     
     Returns:
-        Updated state with sql_query
+        State update with sql_query
     """
     session_id = state.get("session_id", "unknown")
     user_query = state.get("user_query", "")
@@ -35,7 +35,7 @@ async def sql_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
     with TimerContext() as timer:
         try:
             agent = SQLAgent()
-            result = agent.process(state)
+            result = await agent.process(state)
             
             logger.info(
                 "sql_agent_completed",
@@ -45,12 +45,8 @@ async def sql_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 has_errors=bool(result.get("errors"))
             )
             
-            # Add timing to state
-            if "metrics" not in state:
-                state["metrics"] = {}
-            state["metrics"]["sql_agent_duration_ms"] = timer.duration_ms
-            
-            return {**state, **result}
+            # Timing is merged into state["metrics"] by its reducer
+            return {**result, "metrics": {"sql_agent_duration_ms": timer.duration_ms}}
             
         except Exception as e:
             logger.error(
@@ -60,10 +56,7 @@ async def sql_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 error=str(e),
                 exc_info=True
             )
-            return {
-                **state,
-                "errors": state.get("errors", []) + [f"SQL Agent error: {str(e)}"]
-            }
+            return {"errors": [f"SQL Agent error: {str(e)}"]}
 
 
 async def analyst_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -74,14 +67,14 @@ async def analyst_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current workflow state
     
     Returns:
-        Updated state with query_results and metrics
+        State update with query_results and metrics
     """
     session_id = state.get("session_id", "unknown")
     
     # Skip if previous errors
     if state.get("errors"):
         logger.warning("analyst_agent_skipped", session_id=session_id, reason="previous_errors")
-        return state
+        return {}
     
     logger.info("analyst_agent_started", session_id=session_id)
     
@@ -98,12 +91,8 @@ async def analyst_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 has_metrics=bool(result.get("derived_metrics"))
             )
             
-            # Add timing to state
-            if "metrics" not in state:
-                state["metrics"] = {}
-            state["metrics"]["analyst_agent_duration_ms"] = timer.duration_ms
-            
-            return {**state, **result}
+            # Timing is merged into state["metrics"] by its reducer
+            return {**result, "metrics": {"analyst_agent_duration_ms": timer.duration_ms}}
             
         except Exception as e:
             logger.error(
@@ -113,10 +102,7 @@ async def analyst_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 error=str(e),
                 exc_info=True
             )
-            return {
-                **state,
-                "errors": state.get("errors", []) + [f"Analyst Agent error: {str(e)}"]
-            }
+            return {"errors": [f"Analyst Agent error: {str(e)}"]}
 
 
 async def viz_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -127,15 +113,14 @@ async def viz_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current workflow state
     
     Returns:
-        Updated state with chart_config
+        State update with chart_config
     """
     # Skip if previous errors
     if state.get("errors"):
-        return state
+        return {}
     
     agent = VizAgent()
-    result = agent.process(state)
-    return {**state, **result}
+    return await asyncio.to_thread(agent.process, state)
 
 
 async def insight_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
@@ -146,21 +131,21 @@ async def insight_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
         state: Current workflow state
     
     Returns:
-        Updated state with insights and recommendations
+        State update with insights and recommendations
     """
     session_id = state.get("session_id", "unknown")
     
     # Skip if previous errors
     if state.get("errors"):
         logger.warning("insight_agent_skipped", session_id=session_id, reason="previous_errors")
-        return state
+        return {}
     
     logger.info("insight_agent_started", session_id=session_id)
     
     with TimerContext() as timer:
         try:
             agent = InsightAgent()
-            result = agent.process(state)
+            result = await agent.process(state)
             
             logger.info(
                 "insight_agent_completed",
@@ -170,29 +155,26 @@ async def insight_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 recommendation_count=len(result.get("recommendations", []))
             )
             
-            # Add timing to state
-            if "metrics" not in state:
-                state["metrics"] = {}
-            state["metrics"]["insight_agent_duration_ms"] = timer.duration_ms
-            
             # Calculate total duration
-            metrics = state.get("metrics", {})
-            total_duration = sum([
+            metrics = {
+                **state["metrics"],
+                "insight_agent_duration_ms": timer.duration_ms
+            }
+            metrics["total_duration_ms"] = sum([
                 metrics.get("sql_agent_duration_ms", 0),
                 metrics.get("analyst_agent_duration_ms", 0),
                 metrics.get("viz_agent_duration_ms", 0),
                 metrics.get("insight_agent_duration_ms", 0)
             ])
-            state["metrics"]["total_duration_ms"] = total_duration
             
             logger.info(
                 "workflow_completed",
                 session_id=session_id,
-                total_duration_ms=total_duration,
+                total_duration_ms=metrics["total_duration_ms"],
                 breakdown=metrics
             )
             
-            return {**state, **result}
+            return {**result, "metrics": metrics}
             
         except Exception as e:
             logger.error(
@@ -202,10 +184,50 @@ async def insight_agent_node(state: Dict[str, Any]) -> Dict[str, Any]:
                 error=str(e),
                 exc_info=True
             )
-            return {
-                **state,
-                "errors": state.get("errors", []) + [f"Insight Agent error: {str(e)}"]
-            }
+            return {"errors": [f"Insight Agent error: {str(e)}"]}
+
+
+async def viz_and_insight_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Viz + Insight Node - Run visualization and insight generation concurrently
+    
+    Both agents only read the analyst output, so they run side by side and
+    their updates are combined into one (insight wins on shared keys like
+    current_step).
+    
+    Args:
+        state: Current workflow state
+    
+    Returns:
+        State update with chart_config, insights and recommendations
+    """
+    if state.get("errors"):
+        return {}
+    
+    branches = await asyncio.gather(
+        viz_agent_node(state),
+        insight_agent_node(state),
+        return_exceptions=True
+    )
+    
+    merged: Dict[str, Any] = {}
+    for name, branch in zip(("Viz Agent", "Insight Agent"), branches):
+        if isinstance(branch, Exception):
+            logger.error(
+                "parallel_agent_error",
+                session_id=state.get("session_id", "unknown"),
+                agent=name,
+                error=str(branch)
+            )
+            branch = {"errors": [f"{name} error: {str(branch)}"]}
+        for key, value in branch.items():
+            # List channels (errors, warnings, ...) are appended by their reducers
+            if isinstance(value, list) and key in merged:
+                merged[key] = merged[key] + value
+            else:
+                merged[key] = value
+    
+    return merged
 
 
 def should_continue(state: Dict[str, Any]) -> str:
@@ -6,6 +6,8 @@ from dataclasses import dataclass, field
 from datetime import datetime
 import operator
 
+import pandas as pd
+
 
 class AgentState(TypedDict):
     """
@@ -21,7 +23,7 @@ class AgentState(TypedDict):
     sql_explanation: Optional[str]
     
     # Analyst Agent outputs  
-    query_results: Optional[List[Dict[str, Any]]]
+    query_results: Optional[pd.DataFrame]
     result_count: int
     derived_metrics: Optional[Dict[str, Any]]
     data_quality_issues: Annotated[List[str], operator.add]
@@ -42,6 +44,9 @@ class AgentState(TypedDict):
     
     # Conversation context
     conversation_history: List[Dict[str, str]]
+    
+    # Per-node timings, merged as each node reports its own
+    metrics: Annotated[Dict[str, Any], operator.or_]
 
 
 @dataclass
@@ -87,5 +92,6 @@ def create_initial_state(user_query: str, session_id: str) -> AgentState:
         "errors": [],
         "warnings": [],
         "current_step": "initialization",
-        "conversation_history": []
+        "conversation_history": [],
+        "metrics": {}
     }
@@ -8,8 +8,7 @@ from .state import AgentState, create_initial_state
 from .nodes import (
     sql_agent_node,
     analyst_agent_node,
-    viz_agent_node,
-    insight_agent_node,
+    viz_and_insight_node,
     should_continue
 )
 
@@ -21,8 +20,8 @@ def create_workflow():
     Workflow sequence:
     1. SQL Agent: Generate SQL query
     2. Analyst Agent: Execute query and analyze
-    3. Viz Agent: Create visualization
-    4. Insight Agent: Generate insights
+    3. Viz + Insight Agents: Create visualization and generate insights
+       concurrently
     
     Returns:
         Compiled LangGraph workflow
@@ -33,8 +32,7 @@ def create_workflow():
     # Add nodes
     workflow.add_node("sql_agent", sql_agent_node)
     workflow.add_node("analyst_agent", analyst_agent_node)
-    workflow.add_node("viz_agent", viz_agent_node)
-    workflow.add_node("insight_agent", insight_agent_node)
+    workflow.add_node("viz_and_insight", viz_and_insight_node)
     
     # Set entry point
     workflow.set_entry_point("sql_agent")
@@ -54,22 +52,13 @@ def create_workflow():
         "analyst_agent",
         should_continue,
         {
-            "continue": "viz_agent",
-            "end": END
-        }
-    )
-    
-    workflow.add_conditional_edges(
-        "viz_agent",
-        should_continue,
-        {
-            "continue": "insight_agent",
+            "continue": "viz_and_insight",
             "end": END
         }
     )
     
     # Final edge to END
-    workflow.add_edge("insight_agent", END)
+    workflow.add_edge("viz_and_insight", END)
     
     # Compile and return
     return workflow.compile()
@@ -1,13 +1,14 @@
 """
 Tools package for Executive Analytics Assistant
 """
-from .sql_executor import SQLExecutor, get_sql_executor
+from .sql_executor import SQLExecutor, get_sql_executor, frame_to_records
 from .chart_generator import ChartGenerator
 from .metric_calculator import MetricCalculator
 
 __all__ = [
     'SQLExecutor',
     'get_sql_executor',
+    'frame_to_records',
     'ChartGenerator',
     'MetricCalculator'
 ]
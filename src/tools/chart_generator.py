@@ -2,10 +2,17 @@
 Chart Generator - Generate Plotly charts from data
 """
 from typing import List, Dict, Any, Optional
+import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 
+def _column_values(data: pd.DataFrame, column: str) -> List[Any]:
+    """Column as a JSON-ready list (missing values become None)"""
+    values = data[column]
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
 class ChartGenerator:
     """Generate interactive Plotly charts"""
     
@@ -15,7 +22,7 @@ class ChartGenerator:
     
     @staticmethod
     def generate_bar_chart(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         x_column: str,
         y_column: str,
         title: str,
@@ -25,7 +32,7 @@ class ChartGenerator:
         Generate bar chart
         
         Args:
-            data: List of data rows
+            data: Query results, one column per field
             x_column: Column for x-axis
             y_column: Column for y-axis (numeric)
             title: Chart title
@@ -34,8 +41,8 @@ class ChartGenerator:
         Returns:
             Plotly figure as dict
         """
-        x_values = [row[x_column] for row in data]
-        y_values = [row[y_column] for row in data]
+        x_values = _column_values(data, x_column)
+        y_values = _column_values(data, y_column)
         
         fig = go.Figure(data=[
             go.Bar(
@@ -72,7 +79,7 @@ class ChartGenerator:
     
     @staticmethod
     def generate_line_chart(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         x_column: str,
         y_column: str,
         title: str,
@@ -82,7 +89,7 @@ class ChartGenerator:
         Generate line chart (supports multiple series if group_column provided)
         
         Args:
-            data: List of data rows
+            data: Query results, one column per field
             x_column: Column for x-axis (usually dates)
             y_column: Column for y-axis (numeric)
             title: Chart title
@@ -95,18 +102,10 @@ class ChartGenerator:
         
         if group_column:
             # Multiple series
-            groups = {}
-            for row in data:
-                group = row[group_column]
-                if group not in groups:
-                    groups[group] = {'x': [], 'y': []}
-                groups[group]['x'].append(row[x_column])
-                groups[group]['y'].append(row[y_column])
-            
-            for group_name, values in groups.items():
+            for group_name, values in data.groupby(group_column, sort=False, dropna=False):
                 fig.add_trace(go.Scatter(
-                    x=values['x'],
-                    y=values['y'],
+                    x=_column_values(values, x_column),
+                    y=_column_values(values, y_column),
                     mode='lines+markers',
                     name=str(group_name),
                     hovertemplate=(
@@ -117,8 +116,8 @@ class ChartGenerator:
                 ))
         else:
             # Single series
-            x_values = [row[x_column] for row in data]
-            y_values = [row[y_column] for row in data]
+            x_values = _column_values(data, x_column)
+            y_values = _column_values(data, y_column)
             
             fig.add_trace(go.Scatter(
                 x=x_values,
@@ -146,7 +145,7 @@ class ChartGenerator:
     
     @staticmethod
     def generate_pie_chart(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         labels_column: str,
         values_column: str,
         title: str
@@ -155,7 +154,7 @@ class ChartGenerator:
         Generate pie chart
         
         Args:
-            data: List of data rows
+            data: Query results, one column per field
             labels_column: Column for labels
             values_column: Column for values (numeric)
             title: Chart title
@@ -163,8 +162,8 @@ class ChartGenerator:
         Returns:
             Plotly figure as dict
         """
-        labels = [row[labels_column] for row in data]
-        values = [row[values_column] for row in data]
+        labels = _column_values(data, labels_column)
+        values = _column_values(data, values_column)
         
         fig = go.Figure(data=[go.Pie(
             labels=labels,
@@ -189,7 +188,7 @@ class ChartGenerator:
     
     @staticmethod
     def generate_scatter_chart(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         x_column: str,
         y_column: str,
         title: str,
@@ -199,7 +198,7 @@ class ChartGenerator:
         Generate scatter plot
         
         Args:
-            data: List of data rows
+            data: Query results, one column per field
             x_column: Column for x-axis
             y_column: Column for y-axis
             title: Chart title
@@ -208,8 +207,8 @@ class ChartGenerator:
         Returns:
             Plotly figure as dict
         """
-        x_values = [row[x_column] for row in data]
-        y_values = [row[y_column] for row in data]
+        x_values = _column_values(data, x_column)
+        y_values = _column_values(data, y_column)
         
         scatter_params = {
             'x': x_values,
@@ -224,7 +223,7 @@ class ChartGenerator:
         }
         
         if color_column:
-            scatter_params['marker']['color'] = [row[color_column] for row in data]
+            scatter_params['marker']['color'] = _column_values(data, color_column)
             scatter_params['marker']['colorscale'] = 'Viridis'
             scatter_params['marker']['showscale'] = True
         
@@ -243,24 +242,24 @@ class ChartGenerator:
     
     @staticmethod
     def select_chart_type(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         query: str
     ) -> str:
         """
         Automatically select appropriate chart type based on data structure
         
         Args:
-            data: Query results
+            data: Query results, one column per field
             query: Original user query (for context)
         
         Returns:
             Chart type: 'bar', 'line', 'pie', 'scatter'
         """
-        if not data:
+        if data.empty:
             return 'bar'  # default
         
         query_lower = query.lower()
-        columns = list(data[0].keys())
+        columns = data.columns
         
         # Check for temporal data
         temporal_keywords = ['trend', 'over time', 'monthly', 'daily', 'quarterly', 'yearly']
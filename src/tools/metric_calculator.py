@@ -2,8 +2,8 @@
 Metric Calculator - Calculate business metrics and KPIs
 """
 from typing import List, Dict, Any, Optional
-import statistics
-from decimal import Decimal
+import numpy as np
+import pandas as pd
 
 
 class MetricCalculator:
@@ -11,44 +11,83 @@ class MetricCalculator:
     
     @staticmethod
     def calculate_financial_metrics(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         amount_column: str
     ) -> Dict[str, float]:
         """
         Calculate financial metrics (sum, avg, median, etc.)
         
         Args:
-            data: List of result rows
+            data: Query results
             amount_column: Name of column with monetary values
         
         Returns:
             Dict with financial metrics
         """
-        if not data:
+        if data.empty or amount_column not in data.columns:
             return {}
         
-        amounts = [
-            float(row[amount_column])
-            for row in data
-            if row.get(amount_column) is not None
-        ]
+        amounts = data[amount_column].dropna().astype(float)
         
-        if not amounts:
+        if amounts.empty:
             return {}
         
         return {
-            "total": sum(amounts),
-            "average": statistics.mean(amounts),
-            "median": statistics.median(amounts),
-            "min": min(amounts),
-            "max": max(amounts),
-            "std_dev": statistics.stdev(amounts) if len(amounts) > 1 else 0,
+            "total": float(amounts.sum()),
+            "average": float(amounts.mean()),
+            "median": float(amounts.median()),
+            "min": float(amounts.min()),
+            "max": float(amounts.max()),
+            "std_dev": float(amounts.std()) if len(amounts) > 1 else 0,
             "count": len(amounts)
         }
     
+    @staticmethod
+    def calculate_financial_metrics_batch(
+        data: pd.DataFrame,
+        amount_columns: List[str]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate financial metrics for several columns in one vectorized pass
+        
+        Args:
+            data: Query results
+            amount_columns: Names of columns with monetary values
+        
+        Returns:
+            Dict mapping column name to its financial metrics
+            (same keys as calculate_financial_metrics)
+        """
+        columns = [col for col in amount_columns if col in data.columns]
+        if data.empty or not columns:
+            return {}
+        
+        stats = data[columns].astype(float).agg(
+            ['sum', 'mean', 'median', 'min', 'max', 'std', 'count']
+        )
+        
+        metrics = {}
+        for col in columns:
+            col_stats = stats[col]
+            count = int(col_stats['count'])
+            if count == 0:
+                continue
+            
+            metrics[col] = {
+                "total": float(col_stats['sum']),
+                "average": float(col_stats['mean']),
+                "median": float(col_stats['median']),
+                "min": float(col_stats['min']),
+                "max": float(col_stats['max']),
+                "std_dev": float(col_stats['std']) if count > 1 else 0,
+                "count": count
+            }
+        
+        return metrics
+    
     @staticmethod
     def calculate_rate(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         condition_column: str,
         condition_values: List[str]
     ) -> float:
@@ -56,77 +95,69 @@ class MetricCalculator:
         Calculate rate (e.g., default rate, approval rate)
         
         Args:
-            data: List of result rows
+            data: Query results
             condition_column: Column to check condition
             condition_values: Values that meet condition
         
         Returns:
             Rate as percentage (0-100)
         """
-        if not data:
+        if data.empty or condition_column not in data.columns:
             return 0.0
         
-        total = len(data)
-        matching = sum(
-            1 for row in data
-            if row.get(condition_column) in condition_values
-        )
+        rate = data[condition_column].isin(condition_values).mean()
         
-        return round((matching / total) * 100, 2)
+        return round(float(rate) * 100, 2)
     
     @staticmethod
     def calculate_distribution(
-        data: List[Dict[str, Any]],
+        data: pd.DataFrame,
         column: str
     ) -> Dict[str, Any]:
         """
         Calculate distribution statistics
         
         Args:
-            data: List of result rows
+            data: Query results
             column: Column to analyze
         
         Returns:
             Distribution metrics including quartiles
         """
-        if not data:
+        if data.empty or column not in data.columns:
             return {}
         
-        values = [
-            float(row[column])
-            for row in data
-            if row.get(column) is not None
-        ]
+        values = data[column].dropna().to_numpy(dtype=float)
         
-        if not values:
+        if values.size == 0:
             return {}
         
-        sorted_values = sorted(values)
+        # 'weibull' matches statistics.quantiles' default (exclusive) method
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75], method='weibull')
         
         return {
-            "min": min(values),
-            "q1": statistics.quantiles(values, n=4)[0],
-            "median": statistics.median(values),
-            "q3": statistics.quantiles(values, n=4)[2],
-            "max": max(values),
-            "iqr": statistics.quantiles(values, n=4)[2] - statistics.quantiles(values, n=4)[0],
+            "min": float(values.min()),
+            "q1": float(q1),
+            "median": float(np.median(values)),
+            "q3": float(q3),
+            "max": float(values.max()),
+            "iqr": float(q3 - q1),
             "outliers_count": MetricCalculator._count_outliers(values)
         }
     
     @staticmethod
-    def _count_outliers(values: List[float]) -> int:
+    def _count_outliers(values: np.ndarray) -> int:
         """Count outliers using IQR method"""
         if len(values) < 4:
             return 0
         
-        q1 = statistics.quantiles(values, n=4)[0]
-        q3 = statistics.quantiles(values, n=4)[2]
+        q1, q3 = np.quantile(values, [0.25, 0.75], method='weibull')
         iqr = q3 - q1
         
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
         
-        return sum(1 for v in values if v < lower_bound or v > upper_bound)
+        return int(((values < lower_bound) | (values > upper_bound)).sum())
     
     @staticmethod
     def calculate_growth(
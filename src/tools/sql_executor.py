@@ -4,7 +4,9 @@ SQL Executor Tool - Safe query execution with connection pooling
 import asyncio
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime
+from decimal import Decimal
 import asyncpg
+import pandas as pd
 from contextlib import asynccontextmanager
 
 from ..database.connection import get_database_url
@@ -51,7 +53,7 @@ class SQLExecutor:
         self,
         sql: str,
         params: Dict[str, Any] = None
-    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Execute SELECT query safely
         
@@ -61,7 +63,7 @@ class SQLExecutor:
         
         Returns:
             Tuple of (results, metadata) where:
-            - results: List of dictionaries (rows)
+            - results: DataFrame with one column per result column
             - metadata: Dict with execution info
         
         Raises:
@@ -70,8 +72,12 @@ class SQLExecutor:
         """
         start_time = datetime.utcnow()
         
-        # Validate query is SELECT only
-        if not sql.strip().upper().startswith('SELECT'):
+        # Uppercase once; reused by the LIMIT check below
+        sql_upper = sql.upper()
+        
+        # Validate query is SELECT only (optionally with a leading CTE or a
+        # parenthesized set operation)
+        if not sql_upper.lstrip().startswith(('SELECT', 'WITH', '(')):
             raise ValueError("Only SELECT queries are allowed")
         
         pool = await self._get_pool()
@@ -79,25 +85,26 @@ class SQLExecutor:
         async with pool.acquire() as conn:
             try:
                 # Add LIMIT if not present
-                sql_with_limit = self._add_limit_clause(sql)
+                sql_with_limit = self._add_limit_clause(sql, sql_upper)
                 
-                # Execute query
-                rows = await conn.fetch(sql_with_limit)
+                # Execute query (prepared so column names are known even for empty results)
+                statement = await conn.prepare(sql_with_limit)
+                rows = await statement.fetch()
+                columns = [attr.name for attr in statement.get_attributes()]
                 
                 # Calculate execution time
                 execution_time = (datetime.utcnow() - start_time).total_seconds() * 1000
                 
-                # Convert to list of dicts
-                results = [dict(row) for row in rows]
+                # Build columnar result directly from the record tuples
+                results = self._to_frame(rows, columns)
                 
                 # Extract metadata
                 metadata = {
                     "row_count": len(results),
-                    "column_names": list(results[0].keys()) if results else [],
+                    "column_names": columns,
                     "column_types": {
-                        col: str(type(results[0][col]).__name__)
-                        for col in results[0].keys()
-                    } if results else {},
+                        col: str(dtype) for col, dtype in results.dtypes.items()
+                    },
                     "execution_time_ms": round(execution_time, 2),
                     "truncated": len(rows) >= self.max_results,
                     "query": sql_with_limit
@@ -110,9 +117,25 @@ class SQLExecutor:
             except asyncpg.PostgresError as e:
                 raise ValueError(f"Database error: {str(e)}")
     
-    def _add_limit_clause(self, sql: str) -> str:
-        """Add LIMIT clause if not present"""
-        sql_upper = sql.upper()
+    @staticmethod
+    def _to_frame(rows: List[asyncpg.Record], columns: List[str]) -> pd.DataFrame:
+        """Convert fetched records to a DataFrame, casting NUMERIC (Decimal) columns to float"""
+        df = pd.DataFrame.from_records(
+            [tuple(row) for row in rows],
+            columns=columns
+        )
+        
+        for col in df.columns[df.dtypes == object]:
+            non_null = df[col].dropna()
+            if not non_null.empty and isinstance(non_null.iloc[0], Decimal):
+                df[col] = df[col].astype(float)
+        
+        return df
+    
+    def _add_limit_clause(self, sql: str, sql_upper: Optional[str] = None) -> str:
+        """Add LIMIT clause if not present (sql_upper: precomputed sql.upper())"""
+        if sql_upper is None:
+            sql_upper = sql.upper()
         
         # Check if LIMIT already exists
         if 'LIMIT' in sql_upper:
@@ -165,3 +188,19 @@ def get_sql_executor() -> SQLExecutor:
     if _executor is None:
         _executor = SQLExecutor()
     return _executor
+
+
+def frame_to_records(df: Optional[pd.DataFrame]) -> Optional[List[Dict[str, Any]]]:
+    """
+    Convert a result DataFrame to JSON-friendly rows (NaN/NaT become None)
+    
+    Args:
+        df: Query results as returned by SQLExecutor.execute_query
+    
+    Returns:
+        List of row dictionaries, or None if there are no results
+    """
+    if df is None:
+        return None
+    
+    return df.astype(object).where(df.notna(), None).to_dict(orient='records')
@@ -3,12 +3,15 @@ Custom Callback Handler for Local Tracing
 Saves detailed traces to JSON files for inspection
 """
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+import pandas as pd
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.outputs import LLMResult
 from langchain_core.messages import BaseMessage
@@ -17,7 +20,14 @@ from langchain_core.messages import BaseMessage
 class LocalJSONTracer(BaseCallbackHandler):
     """
     Custom callback handler that saves traces to JSON files
+
+    Finished runs are handed to a background writer thread, so callbacks only
+    do in-memory bookkeeping and never wait on JSON encoding or file I/O.
     """
+
+    # Callbacks are cheap now, so run them on the event loop instead of
+    # hopping to an executor thread for every event
+    run_inline = True
     
     def __init__(self, trace_dir: str = "traces"):
         """Initialize the tracer with a directory for trace files"""
@@ -28,6 +38,11 @@ class LocalJSONTracer(BaseCallbackHandler):
         self.current_run = None
         self.runs = {}
         self.session_start = datetime.now()
+
+        # Background writer: (file path, run data) pairs
+        self._write_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self._writer.start()
     
     def _get_run_file(self, run_id: UUID) -> Path:
         """Get the file path for a run"""
@@ -204,6 +219,8 @@ class LocalJSONTracer(BaseCallbackHandler):
                 result[k] = v[:max_str_len] + "..." if len(v) > max_str_len else v
             elif isinstance(v, dict):
                 result[k] = self._truncate_dict(v, max_str_len)
+            elif isinstance(v, pd.DataFrame):
+                result[k] = v.head(10).to_dict(orient='records')  # Limit to first 10 rows
             elif isinstance(v, list):
                 result[k] = [
                     item[:max_str_len] + "..." if isinstance(item, str) and len(item) > max_str_len else item
@@ -234,15 +251,26 @@ class LocalJSONTracer(BaseCallbackHandler):
             return f"Completed in {duration:.2f}s"
     
     def _save_run(self, run_id: UUID) -> None:
-        """Save a run to a JSON file"""
-        run_data = self.runs[run_id]
-        file_path = self._get_run_file(run_id)
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(run_data, f, indent=2, ensure_ascii=False)
-        
-        # Clean up from memory
-        del self.runs[run_id]
+        """Queue a finished run to be written to a JSON file"""
+        # Remove from memory; the writer thread owns the data from here on
+        run_data = self.runs.pop(run_id)
+        self._write_queue.put((self._get_run_file(run_id), run_data))
+    
+    def _write_loop(self) -> None:
+        """Writer thread: encode and write queued runs"""
+        while True:
+            file_path, run_data = self._write_queue.get()
+            try:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(run_data, f, indent=2, ensure_ascii=False, default=str)
+            except Exception as e:
+                print(f"Warning: Failed to write trace {file_path}: {e}")
+            finally:
+                self._write_queue.task_done()
+    
+    def flush(self) -> None:
+        """Block until all queued runs have been written"""
+        self._write_queue.join()
 
 
 def get_local_tracer(enabled: bool = True) -> Optional[LocalJSONTracer]:
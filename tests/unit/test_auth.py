@@ -2,7 +2,9 @@
 Unit tests for Authentication module
 """
 import pytest
+import uuid
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.auth.password import (
     hash_password,
@@ -12,10 +14,14 @@ from src.auth.password import (
 from src.auth.jwt import (
     create_access_token,
     decode_token,
+    evict_token,
     create_password_reset_token,
     get_password_reset_expiry,
     is_token_expired
 )
+from src.auth.dependencies import get_current_user, get_user_login_row, invalidate_user_cache
+from src.auth.lockout import LockoutTracker
+from src.database.models import User
 
 
 class TestPasswordHashing:
@@ -60,6 +66,28 @@ class TestPasswordHashing:
         assert verify_password("securepass123", hashed) is False
         assert verify_password("SECUREPASS123", hashed) is False
 
+    def test_verify_password_accepts_passlib_hashes(self):
+        """Test that hashes created through passlib still verify"""
+        from src.auth.password import pwd_context
+
+        hashed = pwd_context.hash("SecurePass123")
+
+        assert verify_password("SecurePass123", hashed) is True
+        assert verify_password("WrongPassword123", hashed) is False
+
+    def test_verify_password_unknown_hash_format(self):
+        """Test that an unrecognized hash never verifies"""
+        assert verify_password("SecurePass123", "not-a-hash") is False
+
+    async def test_async_hash_and_verify(self):
+        """Test the thread-offloaded hash/verify wrappers"""
+        from src.auth.password import ahash_password, averify_password
+
+        hashed = await ahash_password("SecurePass123")
+
+        assert await averify_password("SecurePass123", hashed) is True
+        assert await averify_password("WrongPassword123", hashed) is False
+
 
 class TestPasswordStrengthValidation:
     """Test suite for password strength validation"""
@@ -99,6 +127,13 @@ class TestPasswordStrengthValidation:
         assert is_valid is False
         assert "digit" in error
 
+    def test_non_ascii_letters_do_not_count(self):
+        """Test that only ASCII letters satisfy the case rules"""
+        is_valid, error = validate_password_strength("Écolepass123")
+
+        assert is_valid is False
+        assert "uppercase" in error
+
     def test_minimum_valid_password(self):
         """Test that minimum valid password (8 chars, upper, lower, digit) passes"""
         is_valid, error = validate_password_strength("Abcdefg1")
@@ -147,6 +182,51 @@ class TestJWTUtilities:
 
         assert payload is None
 
+    def test_decode_token_requires_subject(self):
+        """Test that a token without a subject is rejected"""
+        token = create_access_token(data={"role": "admin"})
+
+        assert decode_token(token) is None
+
+    def test_decode_token_caches_payload(self):
+        """Test that a repeated decode skips verification until evicted"""
+        from src.auth import jwt as jwt_module
+
+        token = create_access_token(data={"sub": "user-cached"})
+
+        with patch.object(jwt_module.jwt, "decode", wraps=jwt_module.jwt.decode) as decode:
+            assert decode_token(token)["sub"] == "user-cached"
+            assert decode_token(token)["sub"] == "user-cached"
+            assert decode.call_count == 1
+
+            evict_token(token)
+            assert decode_token(token)["sub"] == "user-cached"
+            assert decode.call_count == 2
+
+    def test_eddsa_tokens_round_trip(self, monkeypatch):
+        """Test that ALGORITHM=EdDSA signs with the Ed25519 key from SECRET_KEY"""
+        import importlib
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+        from src.auth import jwt as jwt_module
+
+        pem = Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode()
+        monkeypatch.setenv("ALGORITHM", "EdDSA")
+        monkeypatch.setenv("SECRET_KEY", pem.replace("\n", "\\n"))
+        try:
+            importlib.reload(jwt_module)
+            token = jwt_module.create_access_token(data={"sub": "user-ed"})
+
+            assert jwt_module.jwt.get_unverified_header(token)["alg"] == "EdDSA"
+            assert jwt_module.decode_token(token)["sub"] == "user-ed"
+        finally:
+            monkeypatch.undo()
+            importlib.reload(jwt_module)
+
     def test_create_token_with_custom_expiration(self):
         """Test that custom expiration is applied"""
         token = create_access_token(
@@ -239,6 +319,251 @@ class TestRateLimiting:
 
         assert is_locked is False
 
+    async def test_failures_below_limit_skip_database(self):
+        """Test that failed attempts are counted without writing the users table"""
+        from src.api.auth import MAX_LOGIN_ATTEMPTS, increment_failed_attempts
+
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        user = User(id=uuid.uuid4(), failed_login_attempts=0)
+
+        for attempt in range(1, MAX_LOGIN_ATTEMPTS):
+            assert await increment_failed_attempts(user, db) == (attempt, None)
+        db.execute.assert_not_awaited()
+
+        attempts, locked_until = await increment_failed_attempts(user, db)
+
+        assert attempts == MAX_LOGIN_ATTEMPTS and locked_until > datetime.utcnow()
+        assert str(db.execute.await_args.args[0]).startswith("UPDATE users")
+
+    async def test_unknown_email_still_verifies_password(self):
+        """Test that login runs a password check even when the email is unknown"""
+        from fastapi import HTTPException
+        from src.api import auth
+        from src.api.auth_schemas import UserLoginRequest
+
+        db = MagicMock()
+        result = MagicMock()
+        result.one_or_none.return_value = None
+        db.execute = AsyncMock(return_value=result)
+
+        with patch.object(auth, "averify_password", AsyncMock(return_value=False)) as verify:
+            with pytest.raises(HTTPException) as exc:
+                await auth.login(
+                    UserLoginRequest(email="nobody@example.com", password="Secret123"),
+                    MagicMock(),
+                    db
+                )
+
+        assert exc.value.status_code == 401
+        verify.assert_awaited_once_with("Secret123", auth._DUMMY_HASH)
+
+    def test_lockout_tracker_expires_entries(self):
+        """Test that the tracker locks at the limit and forgets after reset"""
+        tracker = LockoutTracker(max_attempts=2, lockout_seconds=60, shards=4)
+
+        assert tracker.record_failure("u1") == (1, None)
+        assert tracker.locked_until("u1") is None
+        _, locked_until = tracker.record_failure("u1")
+        assert tracker.locked_until("u1") == locked_until
+        assert tracker.locked_until("u2") is None
+
+        tracker.reset("u1")
+        assert tracker.locked_until("u1") is None
+        assert tracker.record_failure("u1") == (1, None)
+
+    def test_lockout_tracker_seeds_and_queues_counts(self):
+        """Test that persisted counts are picked up and new counts are queued"""
+        tracker = LockoutTracker(max_attempts=3, lockout_seconds=60, shards=4)
+
+        tracker.seed("u1", 2)
+        _, locked_until = tracker.record_failure("u1")
+        assert locked_until is not None
+        tracker.record_failure("u2")
+
+        assert tracker.drain_pending() == {"u1": 3, "u2": 1}
+        assert tracker.drain_pending() == {}
+
+        tracker.record_failure("u2")
+        tracker.reset("u2")
+        assert tracker.drain_pending() == {}
+
+    async def test_login_check_uses_persisted_count(self):
+        """Test that a count written back by another process counts towards lockout"""
+        from src.api.auth import MAX_LOGIN_ATTEMPTS, check_login_lockout, increment_failed_attempts
+
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        user = User(id=uuid.uuid4(), failed_login_attempts=MAX_LOGIN_ATTEMPTS - 1, locked_until=None)
+
+        assert await check_login_lockout(user) is None
+        attempts, locked_until = await increment_failed_attempts(user, db)
+
+        assert attempts == MAX_LOGIN_ATTEMPTS and locked_until is not None
+
+    async def test_flush_failed_attempts_bulk_updates(self):
+        """Test that queued counts are written in one bulk update and requeued on failure"""
+        from src.api import auth
+
+        user_id = uuid.uuid4()
+        auth.login_lockouts.drain_pending()
+        auth.login_lockouts.record_failure(str(user_id))
+
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[RuntimeError("db down"), None])
+        app_db = MagicMock()
+        app_db.session.return_value.__aenter__ = AsyncMock(return_value=session)
+        app_db.session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        with patch.object(auth, "app_db", app_db):
+            with pytest.raises(RuntimeError):
+                await auth.flush_failed_attempts()
+            assert await auth.flush_failed_attempts() == 1
+
+        rows = session.execute.await_args.args[1]
+        assert rows == [{"id": user_id, "failed_login_attempts": 1}]
+        auth.login_lockouts.reset(str(user_id))
+
+    async def test_reset_is_not_undone_by_inflight_writeback(self):
+        """Test that a reset during a flush still leaves the row at zero"""
+        import asyncio
+        from src.api import auth
+
+        user = User(id=uuid.uuid4(), failed_login_attempts=0, locked_until=None)
+        auth.login_lockouts.drain_pending()
+        auth.login_lockouts.record_failure(str(user.id))
+
+        writes = []
+        flush_started = asyncio.Event()
+        release_flush = asyncio.Event()
+
+        async def slow_bulk_update(statement, rows):
+            flush_started.set()
+            await release_flush.wait()
+            writes.append(("flush", rows[0]["failed_login_attempts"]))
+
+        session = MagicMock(execute=AsyncMock(side_effect=slow_bulk_update))
+        app_db = MagicMock()
+        app_db.session.return_value.__aenter__ = AsyncMock(return_value=session)
+        app_db.session.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=lambda statement: writes.append(("reset", 0)))
+        db.commit = AsyncMock()
+
+        with patch.object(auth, "app_db", app_db):
+            flush = asyncio.create_task(auth.flush_failed_attempts())
+            await flush_started.wait()
+            reset = asyncio.create_task(auth.reset_failed_attempts(user, db))
+            await asyncio.sleep(0)
+            release_flush.set()
+            await asyncio.gather(flush, reset)
+
+        assert writes == [("flush", 1), ("reset", 0)]
+
+    async def test_reset_failed_attempts_skips_clean_user(self):
+        """Test that a user without failed attempts causes no write"""
+        from src.api.auth import reset_failed_attempts
+
+        db = MagicMock()
+        db.execute = AsyncMock()
+        db.commit = AsyncMock()
+        user = User(id=uuid.uuid4(), failed_login_attempts=0, locked_until=None)
+
+        await reset_failed_attempts(user, db)
+
+        db.execute.assert_not_awaited()
+
+
+class TestAuthenticationCache:
+    """Test suite for the per-token user cache in get_current_user"""
+
+    @pytest.fixture
+    def user(self):
+        """Active user as loaded from the database"""
+        return User(
+            id=uuid.uuid4(),
+            email="exec@example.com",
+            hashed_password="hash",
+            is_active=True,
+            failed_login_attempts=0
+        )
+
+    @pytest.fixture
+    def db(self, user):
+        """Session mock whose primary-key lookup returns the user"""
+        session = MagicMock()
+        session.get = AsyncMock(return_value=user)
+        return session
+
+    async def test_cached_token_skips_database(self, user, db):
+        """Test that a repeated token is resolved without a user lookup"""
+        token = create_access_token(data={"sub": str(user.id)})
+
+        first = await get_current_user(request=MagicMock(cookies={"access_token": token}), db=db)
+        second = await get_current_user(request=MagicMock(cookies={"access_token": token}), db=db)
+
+        assert db.get.await_count == 1
+        assert second.id == first.id and second.email == first.email
+        db.add.assert_called_once_with(second)
+        invalidate_user_cache(user_id=user.id)
+
+    async def test_invalidation_forces_reload(self, user, db):
+        """Test that invalidating a user drops their cached tokens"""
+        token = create_access_token(data={"sub": str(user.id)})
+
+        await get_current_user(request=MagicMock(cookies={"access_token": token}), db=db)
+        invalidate_user_cache(user_id=user.id)
+        await get_current_user(request=MagicMock(cookies={"access_token": token}), db=db)
+
+        assert db.get.await_count == 2
+        invalidate_user_cache(user_id=user.id)
+
+    async def test_login_row_projects_columns(self):
+        """Test that the login lookup selects only the columns it needs"""
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=MagicMock())
+
+        await get_user_login_row(db, "exec@example.com")
+
+        columns = [c.key for c in db.execute.await_args.args[0].selected_columns]
+        assert columns == ["id", "hashed_password", "is_active", "failed_login_attempts", "locked_until"]
+
+
+class TestEmailValidation:
+    """Test suite for the request email type"""
+
+    def test_domain_is_lowercased(self):
+        """Test that the domain is normalized like EmailStr did"""
+        from src.api.auth_schemas import ForgotPasswordRequest
+
+        assert ForgotPasswordRequest(email=" User@Example.COM ").email == "User@example.com"
+
+    @pytest.mark.parametrize("address", ["a@b..c", "a,b@c.d", "a..b@c.de", "a@-b.com", "a@b", "a b@c.de"])
+    def test_invalid_addresses_rejected(self, address):
+        """Test that malformed addresses fail validation"""
+        from pydantic import ValidationError
+        from src.api.auth_schemas import ForgotPasswordRequest
+
+        with pytest.raises(ValidationError):
+            ForgotPasswordRequest(email=address)
+
+
+class TestMessageResponses:
+    """Test suite for fixed-message auth responses"""
+
+    async def test_logout_returns_preencoded_message(self):
+        """Test that logout returns the fixed message and clears the cookie"""
+        from src.api.auth import logout
+
+        response = await logout(MagicMock(cookies={}))
+
+        assert response.body == b'{"message":"Logged out successfully"}'
+        assert response.headers["content-type"] == "application/json"
+        assert "access_token=" in response.headers["set-cookie"]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -1,15 +1,30 @@
 """
 Tests for connections API endpoints.
 """
+import asyncio
+
+import orjson
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
 
 from src.api.connections import (
     check_query_limit,
     increment_query_count,
-    get_query_usage
+    get_query_usage,
+    get_connection_url,
+    get_tables,
+    invalidate_connection_url,
+    invalidate_tables_cache,
+    update_tables,
+    create_connection,
+    CreateConnectionRequest,
+    UpdateTablesRequest
 )
+from src.database.introspection import TableInfo
 
 
 @pytest.mark.asyncio
@@ -49,6 +64,146 @@ async def test_check_query_limit_over():
         assert result is False
 
 
+@pytest.mark.asyncio
+async def test_get_query_usage_creates_missing_row():
+    """Test that a missing usage row is created with an ON CONFLICT insert."""
+    usage = MagicMock()
+    missing, found = MagicMock(), MagicMock()
+    missing.scalar_one_or_none.return_value = None
+    found.scalar_one.return_value = usage
+
+    mock_db = AsyncMock()
+    mock_db.execute.side_effect = [missing, MagicMock(), found]
+
+    assert await get_query_usage(mock_db, uuid4()) is usage
+
+    insert_stmt = mock_db.execute.await_args_list[1].args[0]
+    assert "ON CONFLICT" in str(insert_stmt.compile(dialect=postgresql.dialect()))
+    mock_db.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_increment_query_count_is_single_upsert():
+    """Test that incrementing usage is one atomic INSERT ... ON CONFLICT DO UPDATE."""
+    result = MagicMock()
+    result.scalar_one.return_value = 7
+    mock_db = AsyncMock()
+    mock_db.execute.return_value = result
+
+    assert await increment_query_count(mock_db, uuid4()) == 7
+
+    mock_db.execute.assert_awaited_once()
+    sql = str(mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (connection_id, year, month) DO UPDATE" in sql
+    assert "query_count = (query_usage.query_count +" in sql
+
+
+def test_connection_url_is_decrypted_once():
+    """Test that a connection's URL is decrypted once and refreshed when it changes."""
+    connection = MagicMock(id=uuid4(), encrypted_url="enc-1")
+
+    with patch("src.api.connections.decrypt_credential", side_effect=lambda e: f"url:{e}") as decrypt:
+        assert get_connection_url(connection) == "url:enc-1"
+        assert get_connection_url(connection) == "url:enc-1"
+        assert decrypt.call_count == 1
+
+        connection.encrypted_url = "enc-2"
+        assert get_connection_url(connection) == "url:enc-2"
+        assert decrypt.call_count == 2
+
+    invalidate_connection_url(connection.id)
+
+
+@pytest.mark.asyncio
+async def test_get_tables_served_from_cache():
+    """Test that repeated table listings skip the database until invalidated."""
+    table = MagicMock(schema_name="public", table_name="loans", columns=[{}, {}], is_enabled=True)
+    exists = MagicMock()
+    exists.scalar_one_or_none.return_value = uuid4()
+    tables = MagicMock()
+    tables.scalars.return_value.all.return_value = [table]
+    mock_db = AsyncMock()
+    mock_db.execute.side_effect = [exists, tables, exists, tables]
+    connection_id = uuid4()
+
+    first = await get_tables(connection_id, mock_db)
+    second = await get_tables(connection_id, mock_db)
+
+    assert first.body == second.body
+    assert orjson.loads(first.body) == [
+        {"schema_name": "public", "table_name": "loans", "column_count": 2, "is_enabled": True}
+    ]
+    assert mock_db.execute.await_count == 2
+
+    invalidate_tables_cache(connection_id)
+    await get_tables(connection_id, mock_db)
+    assert mock_db.execute.await_count == 4
+    invalidate_tables_cache(connection_id)
+
+
+@pytest.mark.asyncio
+async def test_update_tables_applies_changes_in_one_update():
+    """Test that enabling/disabling tables issues a single UPDATE for changed rows."""
+    ids = [uuid4(), uuid4(), uuid4()]
+    exists = MagicMock()
+    exists.scalar_one_or_none.return_value = uuid4()
+    rows = [
+        (ids[0], "public", "loans", False),
+        (ids[1], "public", "payments", True),
+        (ids[2], "sales", "orders", True),
+    ]
+    mock_db = AsyncMock()
+    mock_db.execute.side_effect = [exists, rows, MagicMock()]
+
+    with patch("src.api.connections.SQLAgent.invalidate_schema"):
+        response = await update_tables(
+            uuid4(),
+            UpdateTablesRequest(enabled_table_names=["loans", "sales.orders"]),
+            mock_db
+        )
+
+    assert response == {"message": "Updated 2 tables", "enabled_count": 2}
+    assert mock_db.execute.await_count == 3
+    sql = str(mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE table_configs SET is_enabled=(table_configs.id IN")
+
+
+@pytest.mark.asyncio
+async def test_create_connection_introspects_while_saving():
+    """Test that introspection starts before the connection record is committed."""
+    events = []
+
+    async def introspect(url):
+        events.append("introspect")
+        return [TableInfo(schema_name="public", table_name="loans", columns=[])]
+
+    async def commit():
+        await asyncio.sleep(0)  # network round-trip
+        events.append("commit")
+
+    async def refresh(connection):
+        connection.id = uuid4()
+        connection.created_at = datetime.utcnow()
+
+    adapter = MagicMock()
+    adapter.test_connection = AsyncMock(return_value=MagicMock(success=True))
+    adapter.introspect_schema = introspect
+    mock_db = AsyncMock()
+    mock_db.add = MagicMock()
+    mock_db.commit.side_effect = commit
+    mock_db.refresh.side_effect = refresh
+
+    with patch("src.api.connections.get_adapter", return_value=adapter), \
+         patch("src.api.connections.encrypt_credential", return_value="enc"):
+        response = await create_connection(
+            CreateConnectionRequest(name="prod", database_url="postgresql://u:p@h/db"),
+            mock_db
+        )
+
+    assert response.table_count == 1
+    assert events[:2] == ["introspect", "commit"]
+
+
 # Integration tests (require database)
 @pytest.mark.integration
 @pytest.mark.asyncio
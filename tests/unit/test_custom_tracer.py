@@ -0,0 +1,38 @@
+"""
+Unit tests for the local JSON tracer
+"""
+import json
+import uuid
+
+import pytest
+
+from src.utils.custom_tracer import LocalJSONTracer
+
+
+class TestLocalJSONTracer:
+    """Test suite for LocalJSONTracer"""
+
+    def test_finished_run_is_written_in_background(self, tmp_path):
+        """Test that a finished chain run is written to a trace file"""
+        tracer = LocalJSONTracer(trace_dir=str(tmp_path))
+        run_id = uuid.uuid4()
+
+        tracer.on_chain_start(
+            {"id": ["RunnableSequence"]},
+            {"user_query": "top loans"},
+            run_id=run_id,
+            metadata={"langgraph_node": "sql_agent"}
+        )
+        tracer.on_chain_end({"sql_query": "SELECT 1"}, run_id=run_id)
+        tracer.flush()
+
+        files = list(tmp_path.glob("trace_*.json"))
+        assert len(files) == 1
+        trace = json.loads(files[0].read_text(encoding="utf-8"))
+        assert trace["node_name"] == "sql_agent"
+        assert trace["status"] == "success"
+        assert run_id not in tracer.runs
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,126 @@
+"""
+Unit tests for the email service
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.auth import email
+
+
+def http_client(*status_codes):
+    """Fake HTTP client whose posts return the given status codes in order"""
+    client = MagicMock()
+    client.post = AsyncMock(side_effect=[MagicMock(status_code=code) for code in status_codes])
+    return client
+
+
+class TestPasswordResetBatch:
+    """Test suite for batched password reset emails"""
+
+    async def test_one_request_per_chunk(self):
+        """Test that recipients share one API call per personalization limit"""
+        client = http_client(202, 202, 202)
+        recipients = [(f"user{i}@example.com", f"token-{i}") for i in range(5)]
+
+        with patch.object(email, "SENDGRID_API_KEY", "key"), \
+             patch.object(email, "SENDGRID_MAX_PERSONALIZATIONS", 2), \
+             patch.object(email, "_http_client", client):
+            sent = await email.send_password_reset_batch(recipients)
+
+        assert sent == 5
+        assert client.post.await_count == 3
+
+        body = client.post.await_args_list[0].kwargs["json"]
+        assert [p["to"][0]["email"] for p in body["personalizations"]] == [
+            "user0@example.com", "user1@example.com"
+        ]
+        assert body["personalizations"][1]["substitutions"] == {
+            "-reset_url-": f"{email.FRONTEND_URL}/reset-password?token=token-1"
+        }
+        assert "-reset_url-" in body["content"][1]["value"]
+
+    async def test_rejected_batch_is_sent_individually(self):
+        """Test that one invalid address does not drop the rest of the batch"""
+        client = http_client(400, 202, 400, 202)
+        recipients = [("a@example.com", "t1"), ("b@example..com", "t2"), ("c@example.com", "t3")]
+
+        with patch.object(email, "SENDGRID_API_KEY", "key"), \
+             patch.object(email, "EMAIL_SEND_CONCURRENCY", 1), \
+             patch.object(email, "_http_client", client):
+            sent = await email.send_password_reset_batch(recipients)
+
+        assert sent == 2
+        assert client.post.await_count == 4
+        single = client.post.await_args_list[1].kwargs["json"]
+        assert single["personalizations"][0]["to"][0]["email"] == "a@example.com"
+
+    async def test_unserializable_address_does_not_drop_batch(self):
+        """Test that an address the helpers reject falls back to single sends"""
+        client = http_client(202)
+        recipients = [("a@example.com", "t1"), ("bad@@example.com", "t2")]
+
+        with patch.object(email, "SENDGRID_API_KEY", "key"), \
+             patch.object(email, "_http_client", client):
+            sent = await email.send_password_reset_batch(recipients)
+
+        assert sent == 1
+        assert client.post.await_count == 1
+
+    async def test_not_configured(self):
+        """Test that nothing is sent without an API key"""
+        with patch.object(email, "SENDGRID_API_KEY", None):
+            assert await email.send_password_reset_batch([("a@example.com", "t")]) == 0
+
+
+class TestSendGridTransport:
+    """Test suite for the async SendGrid client"""
+
+    async def test_retries_rate_limited_requests(self):
+        """Test that a 429 is retried with backoff until accepted"""
+        client = http_client(429, 429, 202)
+
+        with patch.object(email, "SENDGRID_API_KEY", "key"), \
+             patch.object(email, "_http_client", client), \
+             patch.object(email.asyncio, "sleep", AsyncMock()) as sleep:
+            assert await email.send_welcome_email("new@example.com") is True
+
+        assert client.post.await_count == 3
+        assert [call.args[0] for call in sleep.await_args_list] == [0.5, 1.0]
+
+    async def test_client_is_shared(self):
+        """Test that one HTTP client is built, reused, and closed"""
+        with patch.object(email, "_http_client", None), \
+             patch.object(email, "SENDGRID_API_KEY", "key"):
+            client = email._get_http_client()
+
+            assert email._get_http_client() is client
+            assert client.headers["Authorization"] == "Bearer key"
+
+            await email.close_http_client()
+            assert client.is_closed
+
+
+
+class TestEmailWorker:
+    """Test suite for background email delivery"""
+
+    async def test_queued_emails_are_sent_in_one_batch(self):
+        """Test that emails queued together go out in a single batch"""
+        with patch.object(email, "send_password_reset_batch", AsyncMock(return_value=2)) as send:
+            email.start_email_worker()
+            try:
+                assert email.queue_password_reset_email("a@example.com", "t1") is True
+                assert email.queue_password_reset_email("b@example.com", "t2") is True
+            finally:
+                await email.stop_email_worker()
+
+        send.assert_awaited_once_with([("a@example.com", "t1"), ("b@example.com", "t2")])
+
+    def test_queue_without_worker(self):
+        """Test that queueing is refused when the worker is not running"""
+        assert email.queue_password_reset_email("a@example.com", "t") is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
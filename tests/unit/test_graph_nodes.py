@@ -0,0 +1,125 @@
+"""
+Unit tests for workflow node functions
+"""
+import threading
+
+import pandas as pd
+import pytest
+
+from src.agents.insight_agent import InsightAgent
+from src.graph import create_initial_state, create_workflow, nodes
+
+
+class FakeVizAgent:
+    """Returns a fixed chart and waits until the insight agent has started"""
+
+    started = threading.Event()
+
+    def process(self, state):
+        assert FakeInsightAgent.started.wait(timeout=5)
+        return {"chart_type": "bar", "chart_config": {"data": []}, "current_step": "viz_complete"}
+
+
+class FakeInsightAgent:
+    """Returns fixed insights and signals that it has started"""
+
+    started = threading.Event()
+
+    async def process(self, state):
+        FakeInsightAgent.started.set()
+        return {"insights": ["up"], "recommendations": ["hold"], "current_step": "insight_complete"}
+
+
+class TestVizAndInsightNode:
+    """Test suite for the concurrent viz + insight node"""
+
+    @pytest.fixture(autouse=True)
+    def fake_agents(self, monkeypatch):
+        """Replace the LLM-backed agents with fakes"""
+        FakeInsightAgent.started.clear()
+        monkeypatch.setattr(nodes, "VizAgent", FakeVizAgent)
+        monkeypatch.setattr(nodes, "InsightAgent", FakeInsightAgent)
+
+    async def test_runs_both_agents_and_merges(self):
+        """Test that both agents overlap and their outputs are merged"""
+        state = {"session_id": "s1", "user_query": "q", "errors": [], "metrics": {}}
+
+        result = await nodes.viz_and_insight_node(state)
+
+        assert result["chart_config"] == {"data": []}
+        assert result["insights"] == ["up"]
+        assert result["recommendations"] == ["hold"]
+        assert result["current_step"] == "insight_complete"
+        assert result["metrics"]["insight_agent_duration_ms"] >= 0
+        assert "errors" not in result
+
+    async def test_branch_failure_is_reported(self, monkeypatch):
+        """Test that a failing branch adds an error without dropping the other"""
+        class BrokenVizAgent:
+            def process(self, state):
+                raise ValueError("bad chart")
+
+        monkeypatch.setattr(nodes, "VizAgent", BrokenVizAgent)
+
+        result = await nodes.viz_and_insight_node(
+            {"session_id": "s1", "errors": [], "metrics": {}}
+        )
+
+        assert result["errors"] == ["Viz Agent error: bad chart"]
+        assert result["insights"] == ["up"]
+
+    async def test_skips_after_previous_errors(self):
+        """Test that earlier errors skip both agents without an update"""
+        state = {"errors": ["SQL Agent error: boom"], "metrics": {}}
+
+        assert await nodes.viz_and_insight_node(state) == {}
+
+    async def test_workflow_returns_merged_state(self, monkeypatch):
+        """Test that node deltas are merged once, without duplicating lists"""
+        class FakeSQLAgent:
+            async def process(self, state):
+                return {"sql_query": "SELECT 1", "warnings": ["slow"]}
+
+        class FakeAnalystAgent:
+            async def process(self, state):
+                return {"query_results": None, "result_count": 1}
+
+        monkeypatch.setattr(nodes, "SQLAgent", FakeSQLAgent)
+        monkeypatch.setattr(nodes, "AnalystAgent", FakeAnalystAgent)
+        monkeypatch.setenv("LANGSMITH_TRACING", "false")
+        monkeypatch.setenv("LANGCHAIN_TRACING_V2", "false")
+
+        result = await create_workflow().ainvoke(create_initial_state("q", "s1"))
+
+        assert result["warnings"] == ["slow"]
+        assert result["insights"] == ["up"]
+        assert result["errors"] == []
+        assert set(result["metrics"]) >= {
+            "sql_agent_duration_ms", "analyst_agent_duration_ms", "total_duration_ms"
+        }
+
+
+class TestInsightAgent:
+    """Test suite for InsightAgent.process"""
+
+    async def test_insight_agent_awaits_llm(self, monkeypatch):
+        """Test that the insight agent awaits ainvoke_llm"""
+        async def fake_ainvoke(self, context):
+            return "INSIGHTS:\n- Volume grew\nRECOMMENDATIONS:\n- Keep going"
+
+        def blocking_invoke(self, context):
+            raise AssertionError("sync LLM call on the event loop")
+
+        monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+        monkeypatch.setattr(InsightAgent, "ainvoke_llm", fake_ainvoke)
+        monkeypatch.setattr(InsightAgent, "invoke_llm", blocking_invoke)
+
+        agent = InsightAgent()
+        result = await agent.process({"query_results": pd.DataFrame({"n": [1, 2]}), "user_query": "q"})
+
+        assert result["current_step"] == "insight_complete"
+        assert result["insights"] == ["Volume grew"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
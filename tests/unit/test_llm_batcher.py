@@ -0,0 +1,101 @@
+"""
+Unit tests for the prefix-grouping LLM batcher
+"""
+import threading
+
+import pytest
+
+from src.agents.llm_batcher import PrefixBatcher
+
+
+class FakeLLM:
+    """Records invoke/batch calls and echoes the last message back"""
+
+    def __init__(self):
+        self.invoked = []
+        self.batched = []
+        self.lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self.lock:
+            self.invoked.append(messages)
+        return f"re:{messages[-1]}"
+
+    def batch(self, inputs, return_exceptions=False):
+        with self.lock:
+            self.batched.append(inputs)
+        return [f"re:{messages[-1]}" for messages in inputs]
+
+
+class TestPrefixBatcher:
+    """Test suite for PrefixBatcher"""
+
+    def test_groups_requests_by_prefix(self):
+        """Test that one leader per prefix is invoked and the rest are batched"""
+        llm = FakeLLM()
+        batcher = PrefixBatcher(llm, max_batch=4, max_wait=0.5)
+
+        futures = [
+            batcher.submit("schema-a", ["a", "q1"]),
+            batcher.submit("schema-b", ["b", "q2"]),
+            batcher.submit("schema-a", ["a", "q3"]),
+            batcher.submit("schema-a", ["a", "q4"]),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+
+        assert results == ["re:q1", "re:q2", "re:q3", "re:q4"]
+        assert sorted(messages[-1] for messages in llm.invoked) == ["q1", "q2"]
+        assert llm.batched == [[["a", "q3"], ["a", "q4"]]]
+
+    def test_errors_reach_the_caller(self):
+        """Test that an LLM failure is raised from the request's future"""
+        class FailingLLM(FakeLLM):
+            def invoke(self, messages):
+                raise RuntimeError("rate limited")
+
+        batcher = PrefixBatcher(FailingLLM(), max_wait=0.01)
+
+        with pytest.raises(RuntimeError, match="rate limited"):
+            batcher.submit("schema", ["q"]).result(timeout=5)
+
+    def test_cancelled_request_does_not_block_group(self):
+        """Test that a cancelled caller is skipped and the rest still resolve"""
+        llm = FakeLLM()
+        batcher = PrefixBatcher(llm, max_batch=3, max_wait=0.5)
+
+        first = batcher.submit("schema", ["s", "q1"])
+        first.cancel()
+        rest = [batcher.submit("schema", ["s", "q2"]), batcher.submit("schema", ["s", "q3"])]
+
+        assert [future.result(timeout=5) for future in rest] == ["re:q2", "re:q3"]
+        assert all(messages[-1] != "q1" for messages in llm.invoked)
+
+    def test_batch_failure_reaches_followers(self):
+        """Test that followers get the error when llm.batch itself raises"""
+        class FailingBatchLLM(FakeLLM):
+            def batch(self, inputs, return_exceptions=False):
+                raise RuntimeError("batch down")
+
+        batcher = PrefixBatcher(FailingBatchLLM(), max_batch=3, max_wait=0.5)
+        leader = batcher.submit("schema", ["s", "q1"])
+        followers = [batcher.submit("schema", ["s", "q2"]), batcher.submit("schema", ["s", "q3"])]
+
+        assert leader.result(timeout=5) == "re:q1"
+        for follower in followers:
+            with pytest.raises(RuntimeError, match="batch down"):
+                follower.result(timeout=5)
+
+    def test_warm_prefix_is_sent_in_one_batch(self):
+        """Test that a recently sent prefix skips the leader round-trip"""
+        llm = FakeLLM()
+        batcher = PrefixBatcher(llm, max_batch=2, max_wait=0.5)
+        batcher.submit("schema", ["s", "q0"]).result(timeout=5)
+
+        futures = [batcher.submit("schema", ["s", "q1"]), batcher.submit("schema", ["s", "q2"])]
+
+        assert [future.result(timeout=5) for future in futures] == ["re:q1", "re:q2"]
+        assert llm.batched == [[["s", "q1"], ["s", "q2"]]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
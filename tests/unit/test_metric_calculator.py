@@ -0,0 +1,62 @@
+"""
+Unit tests for Metric Calculator
+"""
+import pytest
+import pandas as pd
+
+from src.tools.metric_calculator import MetricCalculator
+
+
+@pytest.fixture
+def results():
+    """Sample query results"""
+    return pd.DataFrame({
+        "loan_amnt": [1000.0, 2500.0, None, 4000.0],
+        "annual_inc": [50000.0, 72000.0, 61000.0, 88000.0],
+        "loan_status": ["Current", "Charged Off", "Default", "Fully Paid"],
+    })
+
+
+def test_batch_matches_single_column(results):
+    """Test that batch metrics equal per-column metrics"""
+    batch = MetricCalculator.calculate_financial_metrics_batch(
+        results, ["loan_amnt", "annual_inc"]
+    )
+
+    for col in ["loan_amnt", "annual_inc"]:
+        single = MetricCalculator.calculate_financial_metrics(results, col)
+        assert batch[col] == pytest.approx(single)
+
+
+def test_batch_skips_empty_and_missing_columns(results):
+    """Test that all-null and unknown columns are skipped"""
+    results["recoveries"] = None
+
+    batch = MetricCalculator.calculate_financial_metrics_batch(
+        results, ["recoveries", "not_a_column"]
+    )
+
+    assert batch == {}
+
+
+def test_batch_single_row_std_dev():
+    """Test that std_dev is 0 for a single value"""
+    df = pd.DataFrame({"loan_amnt": [1000.0]})
+
+    batch = MetricCalculator.calculate_financial_metrics_batch(df, ["loan_amnt"])
+
+    assert batch["loan_amnt"]["std_dev"] == 0
+    assert batch["loan_amnt"]["count"] == 1
+
+
+def test_calculate_rate(results):
+    """Test default rate calculation"""
+    rate = MetricCalculator.calculate_rate(
+        results, "loan_status", ["Charged Off", "Default"]
+    )
+
+    assert rate == 50.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,55 @@
+"""
+Tests for the analytics API routes.
+"""
+import orjson
+import pandas as pd
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from src.api import routes
+from src.api.schemas import QueryResponse
+
+
+@pytest.mark.asyncio
+async def test_health_check_reuses_recent_probe():
+    """Test that probes within the TTL reuse the last database check."""
+    routes._health_cache["expires"] = 0.0
+
+    with patch.object(routes, "test_connection", AsyncMock(return_value=True)) as probe:
+        first = await routes.health_check()
+        second = await routes.health_check()
+
+    assert probe.call_count == 1
+    assert first.body == second.body
+    body = orjson.loads(first.body)
+    assert body["status"] == "healthy" and body["database"] == "connected"
+    routes._health_cache["expires"] = 0.0
+
+
+def test_query_response_encodes_workflow_result():
+    """Test that a workflow result is encoded with QueryResponse defaults."""
+    results = pd.DataFrame({"grade": ["A", "B"], "avg_rate": [7.5, float("nan")]})
+
+    response = routes.query_response("s-1", {"sql_query": "SELECT 1", "query_results": results, "result_count": 2})
+
+    body = orjson.loads(response.body)
+    assert body["session_id"] == "s-1"
+    assert body["query_results"] == [{"grade": "A", "avg_rate": 7.5}, {"grade": "B", "avg_rate": None}]
+    assert body["insights"] == [] and body["metrics"] is None
+    assert set(body) == set(QueryResponse.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_stream_query_response_yields_header_then_rows():
+    """Test that streamed results are a header line followed by one line per row."""
+    results = pd.DataFrame({"grade": ["A", "B", "C"], "loans": [3, 2, None]})
+
+    with patch.object(routes, "STREAM_CHUNK_ROWS", 2):
+        response = routes.stream_query_response("s-1", {"query_results": results, "result_count": 3})
+        body = b"".join([chunk async for chunk in response.body_iterator])
+
+    lines = [orjson.loads(line) for line in body.splitlines()]
+    assert lines[0]["session_id"] == "s-1" and lines[0]["result_count"] == 3
+    assert "query_results" not in lines[0]
+    assert lines[1:] == [{"grade": "A", "loans": 3.0}, {"grade": "B", "loans": 2.0}, {"grade": "C", "loans": None}]
+
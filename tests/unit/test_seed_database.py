@@ -0,0 +1,41 @@
+"""
+Unit tests for the loans seed script's Arrow conversion
+"""
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from scripts.seed_database import to_loans_arrow
+
+
+class TestLoansArrow:
+    """Test suite for to_loans_arrow"""
+
+    def test_columns_are_typed_like_the_table(self):
+        """Test that values are cast to the loans column types"""
+        df = pd.DataFrame({"loan_amnt": [1000.5, 2500.0], "open_acc": [7.0, 12.0]})
+
+        table = to_loans_arrow(df)
+
+        assert table.schema.field("loan_amnt").type == pa.decimal128(12, 2)
+        assert table.schema.field("open_acc").type == pa.int32()
+        assert table["open_acc"].to_pylist() == [7, 12]
+
+    def test_numeric_overflow_fails(self):
+        """Test that a value too large for NUMERIC(12, 2) is not stored as 0"""
+        df = pd.DataFrame({"loan_amnt": [123456789012.0]})
+
+        with pytest.raises(ValueError, match="loan_amnt"):
+            to_loans_arrow(df)
+
+    def test_fractional_integer_fails(self):
+        """Test that a fractional value is not truncated into an INTEGER column"""
+        df = pd.DataFrame({"open_acc": [7.5]})
+
+        with pytest.raises(ValueError, match="open_acc"):
+            to_loans_arrow(df)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
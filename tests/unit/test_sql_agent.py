@@ -2,6 +2,8 @@
 Unit tests for SQL Agent
 """
 import pytest
+from unittest.mock import patch
+
 from src.agents.sql_agent import SQLAgent
 from src.graph.state import create_initial_state
 
@@ -40,6 +42,31 @@ class TestSQLAgent:
         sql = agent._extract_sql(response)
         assert "SELECT" in sql
         assert "loans" in sql
+        
+        # Test with a preamble before the query
+        response = "Here is the query:\nselect grade from loans;"
+        assert agent._extract_sql(response) == "select grade from loans"
+        
+        # Test that long responses without a query are handled linearly
+        response = "Note: " + "SELECT" * 20000
+        assert agent._extract_sql(response) == response
+    
+    def test_extract_sql_keeps_cte(self, agent):
+        """Test that a CTE response is returned whole and passes validation"""
+        response = "```sql\nWITH g AS (SELECT grade, COUNT(*) AS n FROM loans GROUP BY grade)\nSELECT * FROM g;\n```"
+        sql = agent._extract_sql(response)
+        assert sql == "WITH g AS (SELECT grade, COUNT(*) AS n FROM loans GROUP BY grade)\nSELECT * FROM g"
+        assert agent._validate_sql(sql) == sql
+        
+        # With a preamble, the query still starts at WITH
+        assert agent._extract_sql("Here you go:\n" + sql) == sql
+    
+    def test_extract_sql_keeps_parenthesized_union(self, agent):
+        """Test that a parenthesized UNION is not cut at its first SELECT"""
+        response = "(SELECT grade FROM loans WHERE term = 36) UNION (SELECT grade FROM loans WHERE term = 60)"
+        assert agent._extract_sql(response) == response
+        assert agent._extract_sql("Query:\n" + response + ";") == response
+        assert agent._validate_sql(response) == response
     
     def test_validate_sql_allows_select(self, agent):
         """Test that SELECT queries are allowed"""
@@ -53,6 +80,14 @@ class TestSQLAgent:
         with pytest.raises(ValueError, match="Forbidden operation"):
             agent._validate_sql(sql)
     
+    def test_forbidden_operations_normalized(self, agent):
+        """Test that configured forbidden operations match case-insensitively"""
+        with patch.object(SQLAgent, '_load_config', return_value={'forbidden_operations': ['drop']}):
+            agent = SQLAgent()
+
+        with pytest.raises(ValueError, match="Forbidden operation detected: DROP"):
+            agent._validate_sql("DROP TABLE loans")
+
     def test_validate_sql_blocks_delete(self, agent):
         """Test that DELETE statements are blocked"""
         sql = "DELETE FROM loans WHERE grade = 'F'"
@@ -71,6 +106,105 @@ class TestSQLAgent:
         with pytest.raises(ValueError, match="Forbidden operation detected"):
             agent._validate_sql(sql)
 
+    def test_validate_sql_blocks_comments(self, agent):
+        """Test that SQL comments are blocked"""
+        sql = "SELECT * FROM loans /* hidden */ LIMIT 10"
+        with pytest.raises(ValueError, match="unsafe SQL pattern"):
+            agent._validate_sql(sql)
+
+    def test_validate_sql_blocks_cte_write(self, agent):
+        """Test that data-modifying CTEs are blocked"""
+        sql = "WITH d AS (DELETE FROM loans RETURNING *) SELECT * FROM d"
+        with pytest.raises(ValueError, match="Forbidden operation detected: DELETE"):
+            agent._validate_sql(sql)
+
+    def test_validate_sql_allows_keyword_lookalikes(self, agent):
+        """Test that keywords inside identifiers or literals are not flagged"""
+        sql = "SELECT updated_at, '--' AS sep FROM loans WHERE purpose = 'drop'"
+        assert agent._validate_sql(sql) == sql
+
+    def test_validate_sql_blocks_multiple_selects(self, agent):
+        """Test that only a single statement is allowed"""
+        with pytest.raises(ValueError, match="Only SELECT queries are allowed"):
+            agent._validate_sql("SELECT 1; SELECT 2")
+
+    async def test_prompt_prefix_is_stable(self, agent):
+        """Test that the static prompt prefix does not depend on the question"""
+        prefix_a, question_a = await agent._build_prompt("Average income by state")
+        prefix_b, question_b = await agent._build_prompt("Default rate by grade")
+
+        assert prefix_a == prefix_b
+        assert "Average income by state" not in prefix_a
+        assert question_a.endswith("Average income by state")
+
+    def test_prefix_cache_breakpoint_for_anthropic(self, monkeypatch):
+        """Test that the schema prefix is marked cacheable for Anthropic models"""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "dummy")
+        with patch.object(SQLAgent, '_load_config', return_value={'model': 'claude-3-5-haiku-latest'}):
+            agent = SQLAgent()
+
+        message = agent._build_messages("User Question: q", prefix="schema")[-1]
+
+        assert message.content[0]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in message.content[1]
+
+    async def test_repeated_question_skips_llm(self, agent):
+        """Test that a repeated question reuses the cached SQL"""
+        SQLAgent.invalidate_query_cache()
+        response = "SELECT grade, AVG(int_rate) FROM loans GROUP BY grade"
+
+        with patch.object(SQLAgent, 'ainvoke_llm', return_value=response) as llm:
+            first = await agent.process({"user_query": "Average rate by grade"})
+            second = await agent.process({"user_query": "  average RATE by grade "})
+
+        assert llm.call_count == 1
+        assert first["sql_query"] == second["sql_query"]
+        SQLAgent.invalidate_query_cache()
+
+    async def test_dynamic_schema_is_cached(self, agent):
+        """Test that customer schemas are loaded once until invalidated"""
+        connection_id = "00000000-0000-0000-0000-000000000001"
+        SQLAgent.invalidate_schema(connection_id)
+
+        with patch.object(SQLAgent, '_load_dynamic_schema', return_value=[("t", (("id", "integer"),))]) as load:
+            assert "Table: t" in await agent._get_dynamic_schema(connection_id)
+            assert "Table: t" in await agent._get_dynamic_schema(connection_id)
+            assert load.call_count == 1
+
+            SQLAgent.invalidate_schema(connection_id)
+            await agent._get_dynamic_schema(connection_id)
+            assert load.call_count == 2
+
+        SQLAgent.invalidate_schema(connection_id)
+
+    async def test_dynamic_schema_errors_not_cached(self, agent):
+        """Test that schema load failures are retried on the next call"""
+        connection_id = "00000000-0000-0000-0000-000000000002"
+
+        with patch.object(SQLAgent, '_load_dynamic_schema', side_effect=RuntimeError("db down")) as load:
+            assert "Error loading schema" in await agent._get_dynamic_schema(connection_id)
+            await agent._get_dynamic_schema(connection_id)
+            assert load.call_count == 2
+
+    def test_large_schema_keeps_relevant_tables(self, agent):
+        """Test that schemas over the token budget keep tables matching the question"""
+        filler = tuple((f"column_{i}", "text") for i in range(40))
+        tables = [(f"table_{i}", filler) for i in range(200)]
+        tables.append(("loan_payments", (("payment_amount", "numeric"),) + filler))
+
+        schema = agent._format_schema(tables, "Total payment amount for loan payments")
+
+        assert "Table: loan_payments" in schema
+        assert "  - payment_amount: numeric" in schema
+        assert "of 201" in schema
+        assert len(schema) < 201 * 40 * 20
+
+    def test_small_schema_is_question_independent(self, agent):
+        """Test that schemas within budget are rendered in full for any question"""
+        tables = [("loans", (("grade", "text"),)), ("payments", (("amount", "numeric"),))]
+
+        assert agent._format_schema(tables, "grades") == agent._format_schema(tables, "payments")
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,77 @@
+"""
+Unit tests for SQL Executor result handling
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pandas as pd
+
+from src.tools.sql_executor import SQLExecutor, frame_to_records
+
+
+class TestResultFrame:
+    """Test suite for columnar query results"""
+
+    def test_to_frame_casts_decimal_columns(self):
+        """Test that NUMERIC (Decimal) columns become float columns"""
+        rows = [("A", Decimal("1000.50")), ("B", None)]
+        df = SQLExecutor._to_frame(rows, ["grade", "loan_amnt"])
+
+        assert list(df.columns) == ["grade", "loan_amnt"]
+        assert df["loan_amnt"].dtype == float
+
+    def test_to_frame_empty_keeps_columns(self):
+        """Test that empty results still carry column names"""
+        df = SQLExecutor._to_frame([], ["grade", "loan_amnt"])
+
+        assert df.empty
+        assert list(df.columns) == ["grade", "loan_amnt"]
+
+    def test_frame_to_records_replaces_nan(self):
+        """Test that NaN values are returned as None"""
+        df = pd.DataFrame({"grade": ["A", None], "loan_amnt": [1000.0, float("nan")]})
+        records = frame_to_records(df)
+
+        assert records == [
+            {"grade": "A", "loan_amnt": 1000.0},
+            {"grade": None, "loan_amnt": None},
+        ]
+
+    def test_frame_to_records_none(self):
+        """Test that missing results stay None"""
+        assert frame_to_records(None) is None
+
+
+class TestQueryValidation:
+    """Test suite for the executor's SELECT-only check"""
+
+    @pytest.mark.parametrize("sql", [
+        "WITH g AS (SELECT 1 AS n) SELECT n FROM g",
+        "(SELECT 1 AS n) UNION (SELECT 2 AS n)",
+    ])
+    async def test_accepts_cte_and_parenthesized_union(self, sql):
+        """Test that queries not starting with SELECT still run"""
+        statement = MagicMock(fetch=AsyncMock(return_value=[(1,)]))
+        statement.get_attributes.return_value = [MagicMock()]
+        statement.get_attributes.return_value[0].name = "n"
+        conn = MagicMock(prepare=AsyncMock(return_value=statement))
+        pool = MagicMock()
+        pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+        pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+
+        executor = SQLExecutor(max_results=10)
+        executor._pool = pool
+        results, metadata = await executor.execute_query(sql)
+
+        assert results["n"].tolist() == [1]
+        assert metadata["query"] == f"{sql} LIMIT 10"
+
+    async def test_rejects_non_select(self):
+        """Test that data-modifying statements are refused before execution"""
+        with pytest.raises(ValueError, match="Only SELECT"):
+            await SQLExecutor().execute_query("DELETE FROM loans")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,59 @@
+"""
+Unit tests for Viz Agent
+"""
+import pytest
+import pandas as pd
+
+from src.agents.viz_agent import VizAgent
+
+
+class TestVizAgent:
+    """Test suite for Viz Agent"""
+
+    @pytest.fixture
+    def agent(self):
+        """Create Viz agent instance"""
+        return VizAgent()
+
+    def test_bar_chart_with_leading_null(self, agent):
+        """Test that a NULL in the first row does not hide a numeric column"""
+        results = pd.DataFrame({
+            "grade": ["A", "B", "C"],
+            "avg_rate": [None, 11.2, 14.8],
+        })
+
+        state = agent.process({"query_results": results, "user_query": "average rate by grade"})
+
+        assert state["chart_type"] == "bar"
+        bar = state["chart_config"]["data"][0]
+        assert list(bar["x"]) == ["A", "B", "C"]
+
+    def test_line_chart_uses_date_column(self, agent):
+        """Test that the line chart x-axis prefers a date-like column"""
+        results = pd.DataFrame({
+            "loans": [10, 12],
+            "Issue_Month": ["2024-01", "2024-02"],
+        })
+
+        chart = agent._generate_line_chart(results, "trend")
+
+        assert chart["layout"]["xaxis"]["title"]["text"] == "Issue_Month"
+
+    def test_empty_results_skip_chart(self, agent):
+        """Test that empty results skip visualization"""
+        state = agent.process({"query_results": pd.DataFrame(), "user_query": "anything"})
+
+        assert state["chart_config"] is None
+        assert state["current_step"] == "viz_skipped"
+
+    def test_generate_title_truncates_long_queries(self, agent):
+        """Test that long queries are capitalized and cut to 60 characters"""
+        title = agent._generate_title("x" * 500, "bar")
+
+        assert len(title) == 60
+        assert title.startswith("X") and title.endswith("...")
+        assert agent._generate_title("", "bar") == "Data Analysis"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])